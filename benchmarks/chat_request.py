@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Times building and serializing the request of a chat turn against the length of the history.
+
+    python benchmarks/chat_request.py
+
+Each turn sends the whole history, so the time grows with it. The two steps are timed together:
+depending on how the request was built, upb defers copying the contents until it's serialized.
+This doesn't call the API.
+"""
+from __future__ import annotations
+
+import os
+import time
+
+from google.generativeai import generative_models
+from google.generativeai import protos
+
+HISTORY_LENGTHS = (25, 50, 100, 200, 400)
+IMAGE_SIZE = 20_000
+REPEATS = 10
+
+
+def _turn(index: int) -> protos.Content:
+    return protos.Content(
+        role="user" if index % 2 == 0 else "model",
+        parts=[
+            protos.Part(text=f"Turn {index}. " * 20),
+            protos.Part(
+                inline_data=protos.Blob(mime_type="image/png", data=os.urandom(IMAGE_SIZE))
+            ),
+        ],
+    )
+
+
+def _time_ms(f) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        f()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main():
+    model = generative_models.GenerativeModel("gemini-1.5-flash")
+    history = [_turn(i) for i in range(max(HISTORY_LENGTHS))]
+
+    print(f"{'turns':>6} {'size (MB)':>10} {'per turn (ms)':>14} {'ms per MB':>10}")
+    for length in HISTORY_LENGTHS:
+        contents = history[:length]
+
+        def send():
+            request = model._prepare_request(
+                contents=contents, tools=model._tools, tool_config=None
+            )
+            # What the transport does with the request.
+            return protos.GenerateContentRequest.serialize(request)
+
+        size = len(send()) / 1e6
+        turn_ms = _time_ms(send)
+        print(f"{length:>6} {size:>10.1f} {turn_ms:>14.2f} {turn_ms / size:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Times each chunk of a streamed response against the length of the stream.
+
+    python benchmarks/stream_accumulation.py
+
+Prints the time per chunk in each quarter of the stream, for `GenerateContentResponse` and for
+re-merging the whole response with `_join_chunks` on each chunk. This doesn't call the API.
+"""
+from __future__ import annotations
+
+import time
+
+from google.generativeai import protos
+from google.generativeai.types import generation_types
+
+NUM_CHUNKS = 4000
+CHUNK_SIZE = 200
+
+
+def _chunks():
+    for _ in range(NUM_CHUNKS):
+        yield protos.GenerateContentResponse(
+            {"candidates": [{"content": {"parts": [{"text": "x" * CHUNK_SIZE}]}}]}
+        )
+
+
+def _quarters_us(iterable) -> list[float]:
+    """Returns the mean time per item in each quarter of `iterable`, in microseconds."""
+    quarter = NUM_CHUNKS // 4
+    timestamps = []
+    for n, _ in enumerate(iterable):
+        if n % quarter == 0:
+            timestamps.append(time.perf_counter())
+    timestamps.append(time.perf_counter())
+    return [(end - start) / quarter * 1e6 for start, end in zip(timestamps, timestamps[1:])]
+
+
+def _remerged():
+    result = None
+    for chunk in _chunks():
+        result = chunk if result is None else generation_types._join_chunks([result, chunk])
+        yield result
+
+
+def main():
+    accumulated = _quarters_us(generation_types.GenerateContentResponse.from_iterator(_chunks()))
+    remerged = _quarters_us(_remerged())
+
+    print(f"{NUM_CHUNKS} chunks of {CHUNK_SIZE} characters, microseconds per chunk:")
+    print(f"{'quarter':>8} {'accumulated':>12} {'remerged':>10}")
+    for n, (a, r) in enumerate(zip(accumulated, remerged), start=1):
+        print(f"{n:>8} {a:>12.1f} {r:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -43,15 +43,22 @@ from __future__ import annotations
 from google.generativeai import version
 
 from google.generativeai import caching
+from google.generativeai import embedding_cache
 from google.generativeai import protos
+from google.generativeai import response_cache
 from google.generativeai import types
+from google.generativeai import vector_index
 
 from google.generativeai.client import configure
 
 from google.generativeai.embedding import embed_content
 from google.generativeai.embedding import embed_content_async
+from google.generativeai.embedding import iter_embed_content
+from google.generativeai.embedding import iter_embed_content_async
 
 from google.generativeai.files import upload_file
+from google.generativeai.files import upload_file_async
+from google.generativeai.files import upload_files
 from google.generativeai.files import get_file
 from google.generativeai.files import list_files
 from google.generativeai.files import delete_file
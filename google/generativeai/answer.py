@@ -22,6 +22,7 @@ from typing_extensions import TypedDict
 
 import google.ai.generativelanguage as glm
 from google.generativeai import protos
+from google.generativeai import vector_index
 
 from google.generativeai.client import (
     get_default_generative_client,
@@ -75,6 +76,7 @@ GroundingPassageOptions = (
 GroundingPassagesOptions = Union[
     protos.GroundingPassages,
     Iterable[GroundingPassageOptions],
+    Iterable[vector_index.Hit],
     Mapping[str, content_types.ContentType],
 ]
 
@@ -105,6 +107,8 @@ def _make_grounding_passages(source: GroundingPassagesOptions) -> protos.Groundi
     for n, data in enumerate(source):
         if isinstance(data, protos.GroundingPassage):
             passages.append(data)
+        elif isinstance(data, vector_index.Hit):
+            passages.append(data.to_grounding_passage())
         elif isinstance(data, tuple):
             id, content = data  # tuple must have exactly 2 items.
             passages.append({"id": id, "content": content_types.to_content(content)})
@@ -19,9 +19,11 @@ import textwrap
 from typing import Iterable, Optional
 
 from google.generativeai import protos
+from google.generativeai import utils
 from google.generativeai.types import caching_types
 from google.generativeai.types import content_types
 from google.generativeai.client import get_default_cache_client
+from google.generativeai.client import get_default_cache_async_client
 
 from google.protobuf import field_mask_pb2
 
@@ -220,6 +222,37 @@ class CachedContent:
         result = CachedContent._from_obj(response)
         return result
 
+    @classmethod
+    async def create_async(
+        cls,
+        model: str,
+        *,
+        display_name: str | None = None,
+        system_instruction: Optional[content_types.ContentType] = None,
+        contents: Optional[content_types.ContentsType] = None,
+        tools: Optional[content_types.FunctionLibraryType] = None,
+        tool_config: Optional[content_types.ToolConfigType] = None,
+        ttl: Optional[caching_types.TTLTypes] = None,
+        expire_time: Optional[caching_types.ExpireTimeTypes] = None,
+    ) -> CachedContent:
+        """The async version of `CachedContent.create`."""
+        client = get_default_cache_async_client()
+
+        request = cls._prepare_create_request(
+            model=model,
+            display_name=display_name,
+            system_instruction=system_instruction,
+            contents=contents,
+            tools=tools,
+            tool_config=tool_config,
+            ttl=ttl,
+            expire_time=expire_time,
+        )
+
+        response = await client.create_cached_content(request)
+        result = CachedContent._from_obj(response)
+        return result
+
     @classmethod
     def get(cls, name: str) -> CachedContent:
         """Fetches required `CachedContent` resource.
@@ -241,12 +274,16 @@ class CachedContent:
         return result
 
     @classmethod
-    def list(cls, page_size: Optional[int] = 1) -> Iterable[CachedContent]:
+    def list(cls, page_size: Optional[int] = 1000, raw: bool = False) -> Iterable[CachedContent]:
         """Lists `CachedContent` objects associated with the project.
 
+        The next page is fetched in the background while the current one is consumed.
+
         Args:
-            page_size: The maximum number of permissions to return (per page).
-            The service may return fewer `CachedContent` objects.
+            page_size: The maximum number of `CachedContent` objects to return (per page), at
+                most 1000. The service may return fewer `CachedContent` objects.
+            raw: If True, yield the `protos.CachedContent` messages, skipping the conversion to
+                `CachedContent`.
 
         Returns:
             A paginated list of `CachedContent` objects.
@@ -254,8 +291,10 @@ class CachedContent:
         client = get_default_cache_client()
 
         request = protos.ListCachedContentsRequest(page_size=page_size)
-        for cached_content in client.list_cached_contents(request):
-            cached_content = CachedContent._from_obj(cached_content)
+        pager = client.list_cached_contents(request)
+        for cached_content in utils.iter_pager(pager, "cached_contents"):
+            if not raw:
+                cached_content = CachedContent._from_obj(cached_content)
             yield cached_content
 
     def delete(self) -> None:
@@ -266,22 +305,21 @@ class CachedContent:
         client.delete_cached_content(request)
         return
 
-    def update(
+    async def delete_async(self) -> None:
+        """The async version of `CachedContent.delete`."""
+        client = get_default_cache_async_client()
+
+        request = protos.DeleteCachedContentRequest(name=self.name)
+        await client.delete_cached_content(request)
+        return
+
+    def _prepare_update_request(
         self,
         *,
         ttl: Optional[caching_types.TTLTypes] = None,
         expire_time: Optional[caching_types.ExpireTimeTypes] = None,
-    ) -> None:
-        """Updates requested `CachedContent` resource.
-
-        Args:
-            ttl: TTL for cached resource (in seconds). Defaults to 1 hour.
-                 `ttl` and `expire_time` are exclusive arguments.
-            expire_time: Expiration time for cached resource.
-                         `ttl` and `expire_time` are exclusive arguments.
-        """
-        client = get_default_cache_client()
-
+    ) -> protos.UpdateCachedContentRequest:
+        """Prepares an UpdateCachedContentRequest."""
         if ttl and expire_time:
             raise ValueError(
                 "Exclusive arguments: Please provide either `ttl` or `expire_time`, not both."
@@ -307,8 +345,41 @@ class CachedContent:
                 f"Bad update name: Only `ttl`  or `expire_time` can be updated for `CachedContent`."
             )
 
-        request = protos.UpdateCachedContentRequest(cached_content=updates, update_mask=field_mask)
+        return protos.UpdateCachedContentRequest(cached_content=updates, update_mask=field_mask)
+
+    def update(
+        self,
+        *,
+        ttl: Optional[caching_types.TTLTypes] = None,
+        expire_time: Optional[caching_types.ExpireTimeTypes] = None,
+    ) -> None:
+        """Updates requested `CachedContent` resource.
+
+        Args:
+            ttl: TTL for cached resource (in seconds). Defaults to 1 hour.
+                 `ttl` and `expire_time` are exclusive arguments.
+            expire_time: Expiration time for cached resource.
+                         `ttl` and `expire_time` are exclusive arguments.
+        """
+        client = get_default_cache_client()
+
+        request = self._prepare_update_request(ttl=ttl, expire_time=expire_time)
         updated_cc = client.update_cached_content(request)
         self._update(updated_cc)
 
         return
+
+    async def update_async(
+        self,
+        *,
+        ttl: Optional[caching_types.TTLTypes] = None,
+        expire_time: Optional[caching_types.ExpireTimeTypes] = None,
+    ) -> None:
+        """The async version of `CachedContent.update`."""
+        client = get_default_cache_async_client()
+
+        request = self._prepare_update_request(ttl=ttl, expire_time=expire_time)
+        updated_cc = await client.update_cached_content(request)
+        self._update(updated_cc)
+
+        return
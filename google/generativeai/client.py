@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import contextlib
+import datetime
 import inspect
 import dataclasses
+import json
 import pathlib
 import threading
+import time
+import typing
 from typing import Any, cast
 from collections.abc import Sequence
 import httplib2
@@ -18,12 +23,21 @@ from google.auth import credentials as ga_credentials
 from google.auth import exceptions as ga_exceptions
 from google import auth
 from google.api_core import client_options as client_options_lib
+from google.api_core import exceptions as ga_api_exceptions
 from google.api_core import gapic_v1
 from google.api_core import operations_v1
 
 import googleapiclient.http
 import googleapiclient.discovery
 
+if typing.TYPE_CHECKING:
+    import aiohttp
+else:
+    try:
+        import aiohttp
+    except ImportError:
+        aiohttp = None
+
 try:
     from google.generativeai import version
 
@@ -48,6 +62,57 @@ USER_AGENT = "genai-py"
 #      through the file service.
 ##################
 GENAI_API_DISCOVERY_URL = "https://generativelanguage.googleapis.com/$discovery/rest"
+GENAI_API_DISCOVERY_VERSION = "v1beta"
+
+# The discovery document is cached on disk, so short-lived processes skip fetching it. Set
+# `DISCOVERY_CACHE_DIR` to `None` to disable the disk cache.
+DISCOVERY_CACHE_DIR: pathlib.Path | None = (
+    pathlib.Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "google-generativeai"
+)
+DISCOVERY_CACHE_TTL = datetime.timedelta(days=1)
+
+# One discovery api per API key, shared by all the `FileServiceClient`s of the process.
+_discovery_apis: dict[str, Any] = {}
+# Serializes building the discovery api of each API key, `_discovery_lock` guards both dicts.
+_discovery_key_locks: dict[str, threading.Lock] = {}
+_discovery_lock = threading.Lock()
+
+
+def _discovery_cache_path() -> pathlib.Path | None:
+    if DISCOVERY_CACHE_DIR is None:
+        return None
+    # The library version is part of the name, so upgrades don't reuse an older document.
+    return DISCOVERY_CACHE_DIR / f"discovery-{GENAI_API_DISCOVERY_VERSION}-{__version__}.json"
+
+
+def _read_cached_discovery_doc() -> str | None:
+    path = _discovery_cache_path()
+    if path is None:
+        return None
+    try:
+        if time.time() - path.stat().st_mtime >= DISCOVERY_CACHE_TTL.total_seconds():
+            return None
+        discovery_doc = path.read_text(encoding="utf-8")
+        json.loads(discovery_doc)
+    except (OSError, ValueError):
+        # Missing, unreadable or corrupt, fetch it again.
+        return None
+    return discovery_doc
+
+
+def _write_cached_discovery_doc(discovery_doc: str):
+    path = _discovery_cache_path()
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so readers never see a partial document.
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(discovery_doc, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        # The cache is an optimization, e.g. the home directory may be read-only.
+        pass
 
 
 @contextlib.contextmanager
@@ -75,19 +140,47 @@ class FileServiceClient(glm.FileServiceClient):
                 "Invalid operation: Uploading to the File API requires an API key. Please provide a valid API key."
             )
 
+        with _discovery_lock:
+            discovery_api = _discovery_apis.get(api_key)
+            key_lock = _discovery_key_locks.setdefault(api_key, threading.Lock())
+        if discovery_api is None:
+            # Only the clients of the same API key wait for the fetch.
+            with key_lock:
+                with _discovery_lock:
+                    discovery_api = _discovery_apis.get(api_key)
+                if discovery_api is None:
+                    discovery_doc = _read_cached_discovery_doc()
+                    if discovery_doc is None:
+                        discovery_doc = self._fetch_discovery_doc(api_key, metadata)
+                    discovery_api = googleapiclient.discovery.build_from_document(
+                        discovery_doc, developerKey=api_key
+                    )
+                    with _discovery_lock:
+                        _discovery_apis[api_key] = discovery_api
+        self._discovery_api = discovery_api
+
+    def _fetch_discovery_doc(self, api_key: str, metadata: dict | Sequence[tuple[str, str]]):
         request = googleapiclient.http.HttpRequest(
             http=httplib2.Http(),
             postproc=lambda resp, content: (resp, content),
-            uri=f"{GENAI_API_DISCOVERY_URL}?version=v1beta&key={api_key}",
+            uri=f"{GENAI_API_DISCOVERY_URL}?version={GENAI_API_DISCOVERY_VERSION}&key={api_key}",
             headers=dict(metadata),
         )
         response, content = request.execute()
         request.http.close()
 
         discovery_doc = content.decode("utf-8")
-        self._local.discovery_api = googleapiclient.discovery.build_from_document(
-            discovery_doc, developerKey=api_key
-        )
+        if response.status == 200:
+            _write_cached_discovery_doc(discovery_doc)
+        return discovery_doc
+
+    def _thread_http(self) -> httplib2.Http:
+        # `httplib2.Http` isn't thread safe, so each thread sends the requests built by the shared
+        # discovery api with its own.
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = googleapiclient.http.build_http()
+        return http
 
     def create_file(
         self,
@@ -117,19 +210,165 @@ class FileServiceClient(glm.FileServiceClient):
                 filename=path, mimetype=mime_type, resumable=resumable
             )
 
-        request = self._local.discovery_api.media().upload(body={"file": file}, media_body=media)
+        request = self._discovery_api.media().upload(body={"file": file}, media_body=media)
         for key, value in metadata:
             request.headers[key] = value
-        result = request.execute()
+        result = request.execute(http=self._thread_http())
 
         return self.get_file({"name": result["file"]["name"]})
 
 
+GENAI_API_UPLOAD_URL = "https://generativelanguage.googleapis.com/upload/v1beta/files"
+# Each request of a resumable upload sends this much of the file. The service requires a multiple
+# of 256 KiB.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_RETRIES = 5
+# Seconds, doubled after each consecutive failure.
+UPLOAD_RETRY_DELAY = 1.0
+# Request bodies are streamed from the file in blocks of this size.
+_UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+
+class _UploadInterrupted(Exception):
+    """Raised when a chunk of a resumable upload failed in a way that can be resumed."""
+
+
+async def _raise_for_status(response: aiohttp.ClientResponse):
+    if response.status >= 500 or response.status == 429:
+        raise _UploadInterrupted(f"{response.status}: {await response.text()}")
+    if response.status >= 400:
+        raise ga_api_exceptions.from_http_status(response.status, await response.text())
+
+
 class FileServiceAsyncClient(glm.FileServiceAsyncClient):
-    async def create_file(self, *args, **kwargs):
-        raise NotImplementedError(
-            "The `create_file` method is currently not supported for the asynchronous client."
-        )
+    async def create_file(
+        self,
+        path: str | pathlib.Path | os.PathLike | IOBase,
+        *,
+        mime_type: str | None = None,
+        name: str | None = None,
+        display_name: str | None = None,
+        resumable: bool = True,
+        metadata: Sequence[tuple[str, str]] = (),
+    ) -> protos.File:
+        """Uploads a file with the resumable upload protocol, streaming it from `path`.
+
+        The file is sent in requests of `UPLOAD_CHUNK_SIZE` bytes. When one fails with a network
+        or server error, the upload resumes from the last byte the service received, up to
+        `UPLOAD_MAX_RETRIES` consecutive times. With `resumable=False` the whole file is sent
+        in one request, and isn't retried.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "Async file uploads require `aiohttp`, install it with `pip install aiohttp`."
+            )
+        api_key = self._client._client_options.api_key
+        if api_key is None:
+            raise ValueError(
+                "Invalid operation: Uploading to the File API requires an API key. Please "
+                "provide a valid API key."
+            )
+
+        file = {}
+        if name is not None:
+            file["name"] = name
+        if display_name is not None:
+            file["displayName"] = display_name
+
+        with contextlib.ExitStack() as stack:
+            if isinstance(path, IOBase):
+                f = path
+                if not f.seekable():
+                    raise ValueError(
+                        "Invalid input: Async uploads of file-like objects require them to be "
+                        "seekable, to resume interrupted uploads."
+                    )
+            else:
+                f = stack.enter_context(open(path, "rb"))
+            start = f.tell()
+            size = f.seek(0, os.SEEK_END) - start
+
+            async with aiohttp.ClientSession(headers=dict(metadata)) as session:
+                upload_url = await self._start_upload(session, api_key, file, size, mime_type)
+                result = await self._upload(session, upload_url, f, start, size, resumable)
+
+        return await self.get_file({"name": result["file"]["name"]})
+
+    async def _start_upload(self, session, api_key, file, size, mime_type) -> str:
+        headers = {
+            "X-Goog-Upload-Protocol": "resumable",
+            "X-Goog-Upload-Command": "start",
+            "X-Goog-Upload-Header-Content-Length": str(size),
+        }
+        if mime_type is not None:
+            headers["X-Goog-Upload-Header-Content-Type"] = mime_type
+        async with session.post(
+            GENAI_API_UPLOAD_URL, params={"key": api_key}, json={"file": file}, headers=headers
+        ) as response:
+            if response.status >= 400:
+                raise ga_api_exceptions.from_http_status(response.status, await response.text())
+            return response.headers["X-Goog-Upload-URL"]
+
+    async def _upload(self, session, upload_url, f, start, size, resumable) -> dict:
+        chunk_size = UPLOAD_CHUNK_SIZE if resumable else max(size, 1)
+        offset = 0
+        failures = 0
+        interrupted = False
+        while True:
+            try:
+                if interrupted:
+                    offset, result = await self._query_upload(session, upload_url)
+                    interrupted = False
+                else:
+                    sent, result = await self._upload_chunk(
+                        session, upload_url, f, start, offset, min(chunk_size, size - offset), size
+                    )
+                    # Only an accepted chunk counts as progress, queries can succeed while every
+                    # chunk fails.
+                    if sent > offset:
+                        failures = 0
+                    offset = sent
+                if result is not None:
+                    return result
+            except (_UploadInterrupted, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                failures += 1
+                if not resumable or failures > UPLOAD_MAX_RETRIES:
+                    if isinstance(e, _UploadInterrupted):
+                        raise ga_api_exceptions.ServiceUnavailable(str(e)) from e
+                    raise
+                await asyncio.sleep(UPLOAD_RETRY_DELAY * 2 ** (failures - 1))
+                interrupted = True
+
+    async def _upload_chunk(self, session, upload_url, f, start, offset, length, size):
+        async def blocks():
+            f.seek(start + offset)
+            remaining = length
+            while remaining:
+                # Blocking reads run in a thread, so concurrent uploads don't stall the loop.
+                block = await asyncio.to_thread(f.read, min(_UPLOAD_BLOCK_SIZE, remaining))
+                if not block:
+                    raise ValueError("Invalid input: The file was truncated during the upload.")
+                remaining -= len(block)
+                yield block
+
+        finalize = offset + length == size
+        headers = {
+            "Content-Length": str(length),
+            "X-Goog-Upload-Command": "upload, finalize" if finalize else "upload",
+            "X-Goog-Upload-Offset": str(offset),
+        }
+        async with session.post(upload_url, data=blocks(), headers=headers) as response:
+            await _raise_for_status(response)
+            if finalize:
+                return size, await response.json()
+            return offset + length, None
+
+    async def _query_upload(self, session, upload_url):
+        async with session.post(upload_url, headers={"X-Goog-Upload-Command": "query"}) as response:
+            await _raise_for_status(response)
+            if response.headers.get("X-Goog-Upload-Status") == "final":
+                return None, await response.json()
+            return int(response.headers["X-Goog-Upload-Size-Received"]), None
 
 
 @dataclasses.dataclass
@@ -348,6 +587,10 @@ def get_default_cache_client() -> glm.CacheServiceClient:
     return _client_manager.get_default_client("cache")
 
 
+def get_default_cache_async_client() -> glm.CacheServiceAsyncClient:
+    return _client_manager.get_default_client("cache_async")
+
+
 def get_default_file_client() -> glm.FilesServiceClient:
     return _client_manager.get_default_client("file")
 
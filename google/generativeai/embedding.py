@@ -14,11 +14,32 @@
 # limitations under the License.
 from __future__ import annotations
 
+import dataclasses
+import hashlib
 import itertools
-from typing import Any, Iterable, overload, TypeVar, Union, Mapping
+import re
+import threading
+import typing
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Literal,
+    NamedTuple,
+    overload,
+    TypeVar,
+    Union,
+    Mapping,
+    Sized,
+)
 
 import google.ai.generativelanguage as glm
+import google.api_core.exceptions
+from google.generativeai import embedding_cache
 from google.generativeai import protos
+from google.generativeai import utils
 
 from google.generativeai.client import get_default_generative_client
 from google.generativeai.client import get_default_generative_async_client
@@ -28,9 +49,23 @@ from google.generativeai.types import model_types
 from google.generativeai.types import text_types
 from google.generativeai.types import content_types
 
+if typing.TYPE_CHECKING:
+    import numpy as np
+else:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
 DEFAULT_EMB_MODEL = "models/embedding-001"
 EMBEDDING_MAX_BATCH_SIZE = 100
 
+OutputFormatOptions = Literal["dict", "numpy"]
+
+BatchingStrategy = Callable[
+    [Iterable[protos.EmbedContentRequest]], Iterable[list[protos.EmbedContentRequest]]
+]
+
 EmbeddingTaskType = protos.TaskType
 
 EmbeddingTaskTypeOptions = Union[int, str, EmbeddingTaskType]
@@ -97,6 +132,481 @@ except AttributeError:
             yield batch
 
 
+def _estimate_tokens(request: protos.EmbedContentRequest) -> int:
+    parts = type(request).pb(request).content.parts
+    return sum(len(part.text) for part in parts) // 4 + 1
+
+
+@dataclasses.dataclass(frozen=True)
+class BudgetBatcher:
+    """A `BatchingStrategy` that packs requests by count, serialized size and estimated tokens.
+
+    Pass one as the `batching` argument of `embed_content` or `iter_embed_content`. A batch is
+    closed before it would exceed any of the limits that are set. A request that exceeds a limit
+    on its own is sent in a batch by itself.
+
+    Attributes:
+        max_requests: The maximum number of requests in a batch.
+        max_bytes: The maximum total serialized size of the requests in a batch.
+        max_tokens: The maximum total estimated token count of the requests in a batch.
+        estimate_tokens: Estimates the token count of a request, the default counts 4 characters
+            of text per token.
+    """
+
+    max_requests: int = EMBEDDING_MAX_BATCH_SIZE
+    max_bytes: int | None = None
+    max_tokens: int | None = None
+    estimate_tokens: Callable[[protos.EmbedContentRequest], int] = _estimate_tokens
+
+    def __post_init__(self):
+        for name in ("max_requests", "max_bytes", "max_tokens"):
+            value = getattr(self, name)
+            if value is not None and value < 1:
+                raise ValueError(
+                    f"Invalid input: `{name}` must be a positive integer. Received: {value}."
+                )
+
+    def __call__(
+        self, requests: Iterable[protos.EmbedContentRequest]
+    ) -> Iterator[list[protos.EmbedContentRequest]]:
+        if self.max_bytes is None and self.max_tokens is None:
+            yield from map(list, _batched(requests, self.max_requests))
+            return
+
+        batch = []
+        batch_bytes = 0
+        batch_tokens = 0
+        for request in requests:
+            request_bytes = type(request).pb(request).ByteSize() if self.max_bytes else 0
+            request_tokens = self.estimate_tokens(request) if self.max_tokens else 0
+            if batch and (
+                len(batch) == self.max_requests
+                or (self.max_bytes and batch_bytes + request_bytes > self.max_bytes)
+                or (self.max_tokens and batch_tokens + request_tokens > self.max_tokens)
+            ):
+                yield batch
+                batch = []
+                batch_bytes = 0
+                batch_tokens = 0
+            batch.append(request)
+            batch_bytes += request_bytes
+            batch_tokens += request_tokens
+
+        if batch:
+            yield batch
+
+
+_OVERSIZE_MESSAGE = re.compile(r"payload|too (large|long)|larger than|exceed", re.IGNORECASE)
+
+
+def _is_oversize_error(error: google.api_core.exceptions.GoogleAPICallError) -> bool:
+    """Checks if the server rejected a batch for being too large."""
+    if error.code == 413:
+        # HTTP "Payload Too Large"
+        return True
+    if isinstance(error, google.api_core.exceptions.BadRequest):
+        return bool(_OVERSIZE_MESSAGE.search(error.message))
+    if isinstance(error, google.api_core.exceptions.ResourceExhausted):
+        # gRPC rejects messages over its size limit before sending them.
+        return "larger than max" in error.message
+    return False
+
+
+class DeduplicationInfo(NamedTuple):
+    """Counts the inputs `embed_content` deduplicated, see `deduplication_info`."""
+
+    inputs: int
+    saved: int
+
+
+_deduplication_lock = threading.Lock()
+_deduplication_counts = [0, 0]
+
+
+def deduplication_info() -> DeduplicationInfo:
+    """Returns the number of inputs passed to `embed_content`, and the number of embedding requests
+    saved by sending duplicate inputs only once, since the process started or the last
+    `clear_deduplication_info`."""
+    with _deduplication_lock:
+        return DeduplicationInfo(*_deduplication_counts)
+
+
+def clear_deduplication_info():
+    """Resets the counts returned by `deduplication_info`."""
+    with _deduplication_lock:
+        _deduplication_counts[:] = [0, 0]
+
+
+def _deduplicate(
+    content: Iterable[content_types.ContentType],
+) -> tuple[list[protos.Content], list[int]]:
+    """Returns the unique contents, and the position in them of each item of `content`.
+
+    Items are compared by the serialization of their `protos.Content`, so `"hello"` and
+    `{"parts": [{"text": "hello"}]}` are duplicates.
+    """
+    unique = []
+    positions = []
+    seen: dict[bytes, int] = {}
+    for c in content:
+        c = content_types.to_content(c)
+        data = type(c).pb(c).SerializeToString(deterministic=True)
+        key = hashlib.sha256(data).digest()
+        position = seen.get(key)
+        if position is None:
+            position = seen[key] = len(unique)
+            unique.append(c)
+        positions.append(position)
+
+    with _deduplication_lock:
+        _deduplication_counts[0] += len(positions)
+        _deduplication_counts[1] += len(positions) - len(unique)
+    return unique, positions
+
+
+def _fan_out(
+    embeddings: list[list[float]] | np.ndarray, positions: list[int]
+) -> list[list[float]] | np.ndarray:
+    """Returns the embedding of each input from the embeddings of the unique inputs."""
+    if len(positions) == len(embeddings):
+        # No duplicates.
+        return embeddings
+    if not isinstance(embeddings, list):
+        return embeddings[positions]
+
+    result = []
+    used = set()
+    for position in positions:
+        embedding = embeddings[position]
+        if position in used:
+            # Don't share lists between the duplicates.
+            embedding = list(embedding)
+        used.add(position)
+        result.append(embedding)
+    return result
+
+
+def _check_args(
+    task_type: EmbeddingTaskTypeOptions | None,
+    title: str | None,
+    output_dimensionality: int | None,
+    output_format: OutputFormatOptions,
+):
+    if title and to_task_type(task_type) is not EmbeddingTaskType.RETRIEVAL_DOCUMENT:
+        raise ValueError(
+            f"Invalid task type: When a title is specified, the task must be of a 'retrieval document' type. Received task type: {task_type} and title: {title}."
+        )
+
+    if output_dimensionality and output_dimensionality < 0:
+        raise ValueError(
+            f"Invalid value: `output_dimensionality` must be a non-negative integer. Received: {output_dimensionality}."
+        )
+
+    if output_format not in ("dict", "numpy"):
+        raise ValueError(
+            f"Invalid input: `output_format` must be one of 'dict' or 'numpy'. Received: {output_format}."
+        )
+    if output_format == "numpy" and np is None:
+        raise ImportError(
+            "`output_format='numpy'` requires `numpy`, install it with `pip install numpy`."
+        )
+
+
+def _make_batches(
+    model: str,
+    content: Iterable[content_types.ContentType],
+    task_type: EmbeddingTaskType | None,
+    title: str | None,
+    output_dimensionality: int | None,
+    batching: BatchingStrategy,
+) -> Iterator[tuple[int, list[protos.EmbedContentRequest]]]:
+    """Lazily yields `(start_index, requests)` batches of `EmbedContentRequest`s."""
+    requests = (
+        protos.EmbedContentRequest(
+            model=model,
+            content=content_types.to_content(c),
+            task_type=task_type,
+            title=title,
+            output_dimensionality=output_dimensionality,
+        )
+        for c in content
+    )
+    start = 0
+    for batch in batching(requests):
+        yield start, batch
+        start += len(batch)
+
+
+def _fill_rows(
+    array: np.ndarray, rows: Iterable[int], embeddings: Iterable[protos.ContentEmbedding]
+):
+    """Copies the values of `embeddings` into `rows` of `array`."""
+    dim = array.shape[1]
+    for row, embedding in zip(rows, embeddings):
+        array[row] = np.fromiter(embedding.values, dtype=np.float32, count=dim)
+
+
+def _to_embeddings(
+    responses: list[protos.BatchEmbedContentsResponse], output_format: OutputFormatOptions
+) -> list[list[float]] | np.ndarray:
+    if output_format == "numpy":
+        # Read the values straight from the repeated fields, skipping the conversion to lists.
+        embeddings = [e for r in responses for e in type(r).pb(r).embeddings]
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        array = np.empty((len(embeddings), len(embeddings[0].values)), dtype=np.float32)
+        _fill_rows(array, range(len(embeddings)), embeddings)
+        return array
+
+    return [e["values"] for r in responses for e in type(r).to_dict(r)["embeddings"]]
+
+
+def _cache_lookup(
+    cache: embedding_cache.EmbeddingCache, requests: list[protos.EmbedContentRequest]
+) -> tuple[list[str], list[Any]]:
+    keys = [embedding_cache.embedding_key(request) for request in requests]
+    cached = []
+    for key in keys:
+        try:
+            cached.append(cache[key])
+        except KeyError:
+            cached.append(None)
+    return keys, cached
+
+
+def _cache_merge(
+    cache: embedding_cache.EmbeddingCache,
+    keys: list[str],
+    cached: list[Any],
+    responses: list[protos.BatchEmbedContentsResponse],
+    output_format: OutputFormatOptions,
+) -> list[list[float]] | np.ndarray:
+    """Stores the embeddings in `responses`, of the cache misses, and merges them with the hits."""
+    if output_format == "numpy":
+        fetched = [e for r in responses for e in type(r).pb(r).embeddings]
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        if fetched:
+            dim = len(fetched[0].values)
+        else:
+            dim = len(next(value for value in cached if value is not None))
+        # The fetched values are written straight into their rows of the result.
+        array = np.empty((len(keys), dim), dtype=np.float32)
+        _fill_rows(array, [row for row, value in enumerate(cached) if value is None], fetched)
+        for row, (key, value) in enumerate(zip(keys, cached)):
+            if value is None:
+                # Copy the row, so the cache doesn't keep the whole batch alive.
+                cache[key] = array[row].copy()
+            else:
+                array[row] = value
+        return array
+
+    fetched = iter(_to_embeddings(responses, output_format))
+    embeddings = []
+    for key, value in zip(keys, cached):
+        if value is None:
+            value = next(fetched)
+            cache[key] = value.copy()
+        embeddings.append(value)
+    return [e.tolist() if hasattr(e, "tolist") else list(e) for e in embeddings]
+
+
+class _EmbeddingArray:
+    """Copies per-batch embedding arrays into one contiguous `float32` array.
+
+    If `size` is known the array is allocated once, otherwise it grows as needed.
+    """
+
+    def __init__(self, size: int | None = None):
+        self._size = size
+        self._array = None
+        self._count = 0
+
+    def extend(self, batch: np.ndarray):
+        if self._array is None:
+            self._array = np.empty(
+                (max(self._size or 0, len(batch)), batch.shape[1]), dtype=np.float32
+            )
+        elif self._count + len(batch) > len(self._array):
+            grown = np.empty(
+                (max(2 * len(self._array), self._count + len(batch)), self._array.shape[1]),
+                dtype=np.float32,
+            )
+            grown[: self._count] = self._array[: self._count]
+            self._array = grown
+        self._array[self._count : self._count + len(batch)] = batch
+        self._count += len(batch)
+
+    def to_array(self) -> np.ndarray:
+        if self._array is None:
+            return np.empty((0, 0), dtype=np.float32)
+        if self._count < len(self._array):
+            return self._array[: self._count].copy()
+        return self._array
+
+
+def iter_embed_content(
+    model: model_types.BaseModelNameOptions,
+    content: Iterable[content_types.ContentType],
+    task_type: EmbeddingTaskTypeOptions | None = None,
+    title: str | None = None,
+    output_dimensionality: int | None = None,
+    client: glm.GenerativeServiceClient | None = None,
+    request_options: helper_types.RequestOptionsType | None = None,
+    max_concurrency: int = 1,
+    output_format: OutputFormatOptions = "dict",
+    batched: bool = False,
+    ordered: bool = True,
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+) -> Iterator[tuple[int, Any]]:
+    """Lazily embeds an iterable of content, yielding the embeddings as they arrive.
+
+    Unlike `embed_content`, this never holds more than `2 * max_concurrency` batches of
+    `EMBEDDING_MAX_BATCH_SIZE` in memory (`max_concurrency` with `ordered=False`), so `content`
+    can be an unbounded iterator:
+
+    >>> with open('corpus.jsonl') as f:
+    ...     texts = (json.loads(line)['text'] for line in f)
+    ...     for i, vector in genai.iter_embed_content('models/text-embedding-004', texts):
+    ...         store[i] = vector
+
+    Args:
+        model, content, task_type, title, output_dimensionality, client, request_options,
+        max_concurrency, output_format:
+            See `embed_content`.
+        batched:
+            If False, yields an `(index, embedding)` pair per item of `content`. If True, yields
+            a `(start_index, embeddings)` pair per batch, where `embeddings` is a list of lists,
+            or a 2D array when `output_format="numpy"`.
+        ordered:
+            If True, results are yielded in the order of `content`. Otherwise batches are yielded
+            as they complete, the indices still refer to positions in `content`.
+        batching, cache:
+            See `embed_content`.
+    """
+    model = model_types.make_model_name(model)
+
+    if request_options is None:
+        request_options = {}
+
+    if client is None:
+        client = get_default_generative_client()
+
+    _check_args(task_type, title, output_dimensionality, output_format)
+
+    if task_type:
+        task_type = to_task_type(task_type)
+
+    def embed_requests(requests):
+        embedding_request = protos.BatchEmbedContentsRequest(model=model, requests=requests)
+        try:
+            embedding_response = client.batch_embed_contents(
+                embedding_request,
+                **request_options,
+            )
+            return [embedding_response]
+        except google.api_core.exceptions.GoogleAPICallError as e:
+            if len(requests) == 1 or not _is_oversize_error(e):
+                raise
+        # The batch was rejected for its size, split it and retry.
+        half = len(requests) // 2
+        return embed_requests(requests[:half]) + embed_requests(requests[half:])
+
+    def embed_batch(batch):
+        start, requests = batch
+        if cache is None:
+            return start, _to_embeddings(embed_requests(requests), output_format)
+
+        keys, cached = _cache_lookup(cache, requests)
+        misses = [request for request, value in zip(requests, cached) if value is None]
+        responses = embed_requests(misses) if misses else []
+        return start, _cache_merge(cache, keys, cached, responses, output_format)
+
+    for _, (start, embeddings) in utils.concurrent_iter(
+        embed_batch,
+        _make_batches(
+            model, content, task_type, title, output_dimensionality, batching or BudgetBatcher()
+        ),
+        max_concurrency=max_concurrency,
+        ordered=ordered,
+    ):
+        if batched:
+            yield start, embeddings
+        else:
+            for index, embedding in enumerate(embeddings, start):
+                yield index, embedding
+
+
+async def iter_embed_content_async(
+    model: model_types.BaseModelNameOptions,
+    content: Iterable[content_types.ContentType],
+    task_type: EmbeddingTaskTypeOptions | None = None,
+    title: str | None = None,
+    output_dimensionality: int | None = None,
+    client: glm.GenerativeServiceAsyncClient | None = None,
+    request_options: helper_types.RequestOptionsType | None = None,
+    max_concurrency: int = 1,
+    output_format: OutputFormatOptions = "dict",
+    batched: bool = False,
+    ordered: bool = True,
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+) -> AsyncIterator[tuple[int, Any]]:
+    """The async version of `iter_embed_content`, running the batch requests as tasks."""
+    model = model_types.make_model_name(model)
+
+    if request_options is None:
+        request_options = {}
+
+    if client is None:
+        client = get_default_generative_async_client()
+
+    _check_args(task_type, title, output_dimensionality, output_format)
+
+    if task_type:
+        task_type = to_task_type(task_type)
+
+    async def embed_requests(requests):
+        embedding_request = protos.BatchEmbedContentsRequest(model=model, requests=requests)
+        try:
+            embedding_response = await client.batch_embed_contents(
+                embedding_request,
+                **request_options,
+            )
+            return [embedding_response]
+        except google.api_core.exceptions.GoogleAPICallError as e:
+            if len(requests) == 1 or not _is_oversize_error(e):
+                raise
+        # The batch was rejected for its size, split it and retry.
+        half = len(requests) // 2
+        return await embed_requests(requests[:half]) + await embed_requests(requests[half:])
+
+    async def embed_batch(batch):
+        start, requests = batch
+        if cache is None:
+            return start, _to_embeddings(await embed_requests(requests), output_format)
+
+        keys, cached = _cache_lookup(cache, requests)
+        misses = [request for request, value in zip(requests, cached) if value is None]
+        responses = await embed_requests(misses) if misses else []
+        return start, _cache_merge(cache, keys, cached, responses, output_format)
+
+    async for _, (start, embeddings) in utils.concurrent_aiter(
+        embed_batch,
+        _make_batches(
+            model, content, task_type, title, output_dimensionality, batching or BudgetBatcher()
+        ),
+        max_concurrency=max_concurrency,
+        ordered=ordered,
+    ):
+        if batched:
+            yield start, embeddings
+        else:
+            for index, embedding in enumerate(embeddings, start):
+                yield index, embedding
+
+
 @overload
 def embed_content(
     model: model_types.BaseModelNameOptions,
@@ -106,6 +616,11 @@ def embed_content(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    max_concurrency: int = 1,
+    output_format: Literal["dict"] = "dict",
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+    deduplicate: bool = True,
 ) -> text_types.EmbeddingDict: ...
 
 
@@ -118,9 +633,32 @@ def embed_content(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    max_concurrency: int = 1,
+    output_format: Literal["dict"] = "dict",
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+    deduplicate: bool = True,
 ) -> text_types.BatchEmbeddingDict: ...
 
 
+@overload
+def embed_content(
+    model: model_types.BaseModelNameOptions,
+    content: content_types.ContentType | Iterable[content_types.ContentType],
+    task_type: EmbeddingTaskTypeOptions | None = None,
+    title: str | None = None,
+    output_dimensionality: int | None = None,
+    client: glm.GenerativeServiceClient | None = None,
+    request_options: helper_types.RequestOptionsType | None = None,
+    max_concurrency: int = 1,
+    *,
+    output_format: Literal["numpy"],
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+    deduplicate: bool = True,
+) -> text_types.ArrayEmbeddingDict: ...
+
+
 def embed_content(
     model: model_types.BaseModelNameOptions,
     content: content_types.ContentType | Iterable[content_types.ContentType],
@@ -129,7 +667,12 @@ def embed_content(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceClient = None,
     request_options: helper_types.RequestOptionsType | None = None,
-) -> text_types.EmbeddingDict | text_types.BatchEmbeddingDict:
+    max_concurrency: int = 1,
+    output_format: OutputFormatOptions = "dict",
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+    deduplicate: bool = True,
+) -> text_types.EmbeddingDict | text_types.BatchEmbeddingDict | text_types.ArrayEmbeddingDict:
     """Calls the API to create embeddings for content passed in.
 
     Args:
@@ -156,6 +699,40 @@ def embed_content(
         request_options:
             Options for the request.
 
+        max_concurrency:
+            When `content` is an iterable, it is sent in batches of
+            `EMBEDDING_MAX_BATCH_SIZE`. This is the maximum number of batch
+            requests in flight at once, they are sent from a thread pool. The
+            embeddings are returned in the order of `content`.
+
+        output_format:
+            `"dict"` returns the embeddings as lists of floats. `"numpy"`
+            returns them as a `float32` `numpy.ndarray`, of shape `(dim,)` for
+            a single content or `(len(content), dim)` for an iterable. The
+            values are copied straight from the response protos, this is much
+            faster and smaller than building lists for large batches.
+
+        batching:
+            How `content` is split into batch requests when it is an iterable.
+            A callable that takes an iterable of `protos.EmbedContentRequest`
+            and yields lists of them. Defaults to batches of
+            `EMBEDDING_MAX_BATCH_SIZE` requests. Use a `BudgetBatcher` to also
+            limit the size of each batch, for inputs that mix short and very
+            long texts. A batch the server rejects as too large is split in
+            half and retried.
+
+        cache:
+            An optional `embedding_cache.EmbeddingCache`. Only the contents
+            that aren't in the cache are sent to the API, and their embeddings
+            are added to it.
+
+        deduplicate:
+            If True, identical items of `content` are only sent once, and the
+            result is copied to all their positions. See
+            `deduplication_info` for the number of requests this saved.
+
+    To embed a corpus too large to hold in memory, use `iter_embed_content`.
+
     Return:
         Dictionary containing the embedding (list of float values) for the
         input content.
@@ -168,40 +745,39 @@ def embed_content(
     if client is None:
         client = get_default_generative_client()
 
-    if title and to_task_type(task_type) is not EmbeddingTaskType.RETRIEVAL_DOCUMENT:
-        raise ValueError(
-            f"Invalid task type: When a title is specified, the task must be of a 'retrieval document' type. Received task type: {task_type} and title: {title}."
-        )
-
-    if output_dimensionality and output_dimensionality < 0:
-        raise ValueError(
-            f"Invalid value: `output_dimensionality` must be a non-negative integer. Received: {output_dimensionality}."
-        )
+    _check_args(task_type, title, output_dimensionality, output_format)
 
     if task_type:
         task_type = to_task_type(task_type)
 
     if isinstance(content, Iterable) and not isinstance(content, (str, Mapping)):
-        result = {"embedding": []}
-        requests = (
-            protos.EmbedContentRequest(
-                model=model,
-                content=content_types.to_content(c),
-                task_type=task_type,
-                title=title,
-                output_dimensionality=output_dimensionality,
-            )
-            for c in content
-        )
-        for batch in _batched(requests, EMBEDDING_MAX_BATCH_SIZE):
-            embedding_request = protos.BatchEmbedContentsRequest(model=model, requests=batch)
-            embedding_response = client.batch_embed_contents(
-                embedding_request,
-                **request_options,
-            )
-            embedding_dict = type(embedding_response).to_dict(embedding_response)
-            result["embedding"].extend(e["values"] for e in embedding_dict["embeddings"])
-        return result
+        positions = None
+        if deduplicate:
+            content, positions = _deduplicate(content)
+        if output_format == "numpy":
+            embeddings_out = _EmbeddingArray(len(content) if isinstance(content, Sized) else None)
+        else:
+            embeddings_out = []
+        for _, embeddings in iter_embed_content(
+            model,
+            content,
+            task_type=task_type,
+            title=title,
+            output_dimensionality=output_dimensionality,
+            client=client,
+            request_options=request_options,
+            max_concurrency=max_concurrency,
+            output_format=output_format,
+            batched=True,
+            batching=batching,
+            cache=cache,
+        ):
+            embeddings_out.extend(embeddings)
+        if output_format == "numpy":
+            embeddings_out = embeddings_out.to_array()
+        if positions is not None:
+            embeddings_out = _fan_out(embeddings_out, positions)
+        return {"embedding": embeddings_out}
     else:
         embedding_request = protos.EmbedContentRequest(
             model=model,
@@ -210,12 +786,24 @@ def embed_content(
             title=title,
             output_dimensionality=output_dimensionality,
         )
+        if cache is not None:
+            keys, cached = _cache_lookup(cache, [embedding_request])
+            if cached[0] is not None:
+                return {"embedding": _cache_merge(cache, keys, cached, [], output_format)[0]}
+
         embedding_response = client.embed_content(
             embedding_request,
             **request_options,
         )
-        embedding_dict = type(embedding_response).to_dict(embedding_response)
-        embedding_dict["embedding"] = embedding_dict["embedding"]["values"]
+        if output_format == "numpy":
+            values = type(embedding_response).pb(embedding_response).embedding.values
+            embedding_dict = {"embedding": np.fromiter(values, dtype=np.float32, count=len(values))}
+        else:
+            embedding_dict = type(embedding_response).to_dict(embedding_response)
+            embedding_dict["embedding"] = embedding_dict["embedding"]["values"]
+        if cache is not None:
+            # Copied, so the caller can't edit the cached vector through the result.
+            cache[keys[0]] = embedding_dict["embedding"].copy()
         return embedding_dict
 
 
@@ -228,6 +816,11 @@ async def embed_content_async(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceAsyncClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    max_concurrency: int = 1,
+    output_format: Literal["dict"] = "dict",
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+    deduplicate: bool = True,
 ) -> text_types.EmbeddingDict: ...
 
 
@@ -240,9 +833,32 @@ async def embed_content_async(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceAsyncClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    max_concurrency: int = 1,
+    output_format: Literal["dict"] = "dict",
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+    deduplicate: bool = True,
 ) -> text_types.BatchEmbeddingDict: ...
 
 
+@overload
+async def embed_content_async(
+    model: model_types.BaseModelNameOptions,
+    content: content_types.ContentType | Iterable[content_types.ContentType],
+    task_type: EmbeddingTaskTypeOptions | None = None,
+    title: str | None = None,
+    output_dimensionality: int | None = None,
+    client: glm.GenerativeServiceAsyncClient | None = None,
+    request_options: helper_types.RequestOptionsType | None = None,
+    max_concurrency: int = 1,
+    *,
+    output_format: Literal["numpy"],
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+    deduplicate: bool = True,
+) -> text_types.ArrayEmbeddingDict: ...
+
+
 async def embed_content_async(
     model: model_types.BaseModelNameOptions,
     content: content_types.ContentType | Iterable[content_types.ContentType],
@@ -251,8 +867,16 @@ async def embed_content_async(
     output_dimensionality: int | None = None,
     client: glm.GenerativeServiceAsyncClient = None,
     request_options: helper_types.RequestOptionsType | None = None,
-) -> text_types.EmbeddingDict | text_types.BatchEmbeddingDict:
-    """Calls the API to create async embeddings for content passed in."""
+    max_concurrency: int = 1,
+    output_format: OutputFormatOptions = "dict",
+    batching: BatchingStrategy | None = None,
+    cache: embedding_cache.EmbeddingCache | None = None,
+    deduplicate: bool = True,
+) -> text_types.EmbeddingDict | text_types.BatchEmbeddingDict | text_types.ArrayEmbeddingDict:
+    """Calls the API to create async embeddings for content passed in.
+
+    With `max_concurrency` greater than 1, the batch requests run as concurrent tasks.
+    """
 
     model = model_types.make_model_name(model)
 
@@ -262,39 +886,39 @@ async def embed_content_async(
     if client is None:
         client = get_default_generative_async_client()
 
-    if title and to_task_type(task_type) is not EmbeddingTaskType.RETRIEVAL_DOCUMENT:
-        raise ValueError(
-            f"Invalid task type: When a title is specified, the task must be of a 'retrieval document' type. Received task type: {task_type} and title: {title}."
-        )
-    if output_dimensionality and output_dimensionality < 0:
-        raise ValueError(
-            f"Invalid value: `output_dimensionality` must be a non-negative integer. Received: {output_dimensionality}."
-        )
+    _check_args(task_type, title, output_dimensionality, output_format)
 
     if task_type:
         task_type = to_task_type(task_type)
 
     if isinstance(content, Iterable) and not isinstance(content, (str, Mapping)):
-        result = {"embedding": []}
-        requests = (
-            protos.EmbedContentRequest(
-                model=model,
-                content=content_types.to_content(c),
-                task_type=task_type,
-                title=title,
-                output_dimensionality=output_dimensionality,
-            )
-            for c in content
-        )
-        for batch in _batched(requests, EMBEDDING_MAX_BATCH_SIZE):
-            embedding_request = protos.BatchEmbedContentsRequest(model=model, requests=batch)
-            embedding_response = await client.batch_embed_contents(
-                embedding_request,
-                **request_options,
-            )
-            embedding_dict = type(embedding_response).to_dict(embedding_response)
-            result["embedding"].extend(e["values"] for e in embedding_dict["embeddings"])
-        return result
+        positions = None
+        if deduplicate:
+            content, positions = _deduplicate(content)
+        if output_format == "numpy":
+            embeddings_out = _EmbeddingArray(len(content) if isinstance(content, Sized) else None)
+        else:
+            embeddings_out = []
+        async for _, embeddings in iter_embed_content_async(
+            model,
+            content,
+            task_type=task_type,
+            title=title,
+            output_dimensionality=output_dimensionality,
+            client=client,
+            request_options=request_options,
+            max_concurrency=max_concurrency,
+            output_format=output_format,
+            batched=True,
+            batching=batching,
+            cache=cache,
+        ):
+            embeddings_out.extend(embeddings)
+        if output_format == "numpy":
+            embeddings_out = embeddings_out.to_array()
+        if positions is not None:
+            embeddings_out = _fan_out(embeddings_out, positions)
+        return {"embedding": embeddings_out}
     else:
         embedding_request = protos.EmbedContentRequest(
             model=model,
@@ -303,10 +927,22 @@ async def embed_content_async(
             title=title,
             output_dimensionality=output_dimensionality,
         )
+        if cache is not None:
+            keys, cached = _cache_lookup(cache, [embedding_request])
+            if cached[0] is not None:
+                return {"embedding": _cache_merge(cache, keys, cached, [], output_format)[0]}
+
         embedding_response = await client.embed_content(
             embedding_request,
             **request_options,
         )
-        embedding_dict = type(embedding_response).to_dict(embedding_response)
-        embedding_dict["embedding"] = embedding_dict["embedding"]["values"]
+        if output_format == "numpy":
+            values = type(embedding_response).pb(embedding_response).embedding.values
+            embedding_dict = {"embedding": np.fromiter(values, dtype=np.float32, count=len(values))}
+        else:
+            embedding_dict = type(embedding_response).to_dict(embedding_response)
+            embedding_dict["embedding"] = embedding_dict["embedding"]["values"]
+        if cache is not None:
+            # Copied, so the caller can't edit the cached vector through the result.
+            cache[keys[0]] = embedding_dict["embedding"].copy()
         return embedding_dict
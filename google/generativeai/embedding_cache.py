@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Content-addressed caches for `embed_content` results.
+
+Pass a cache to `embed_content` to only send the contents that weren't embedded before:
+
+>>> cache = genai.embedding_cache.MemmapEmbeddingCache('/data/embedding-cache')
+>>> result = genai.embed_content('models/text-embedding-004', titles, cache=cache)
+
+Embeddings are keyed on a hash of the whole `protos.EmbedContentRequest`: the model, the task
+type, the title, the output dimensionality and the content.
+
+A cache is a mapping from `str` keys to vectors, see `EmbeddingCache`: besides the caches defined
+here, a `dict` can be used.
+"""
+from __future__ import annotations
+
+import collections.abc
+import hashlib
+import os
+import pathlib
+import sqlite3
+import threading
+import typing
+from typing import Protocol, Sequence
+
+from google.generativeai import protos
+from google.generativeai import utils
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+else:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+
+class EmbeddingCache(Protocol):
+    """The interface of an embedding cache, keys are produced by `embedding_key`."""
+
+    def __getitem__(self, key: str) -> Sequence[float]:
+        """Returns the vector stored for `key`, raises `KeyError` if there isn't one."""
+        ...
+
+    def __setitem__(self, key: str, value: Sequence[float]) -> None: ...
+
+
+def embedding_key(request: protos.EmbedContentRequest) -> str:
+    """Returns the cache key of a request: the sha256 of its deterministic serialization."""
+    data = type(request).pb(request).SerializeToString(deterministic=True)
+    return hashlib.sha256(data).hexdigest()
+
+
+class InMemoryEmbeddingCache(collections.abc.MutableMapping):
+    """A thread safe, in-memory embedding cache.
+
+    Holds at most `maxsize` vectors, evicting the least recently used ones.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self._entries = utils.LRUCache(maxsize=maxsize)
+
+    def __getitem__(self, key: str) -> Sequence[float]:
+        value = self._entries.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Sequence[float]) -> None:
+        self._entries.put(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if self._entries.pop(key) is None:
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._entries.keys())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MemmapEmbeddingCache(collections.abc.MutableMapping):
+    """An embedding cache stored on disk, shared between runs and processes.
+
+    The vectors are appended to a file of fixed-width `float32` rows, `vectors.f32`, and the row of
+    each key is stored in a SQLite index, `index.sqlite`, both in `directory`. Lookups return
+    read-only views of a memory map of the vectors file, so any number of processes can read a
+    warm cache without copying it. The most recently used `memory_cache_size` vectors are also
+    kept in memory, to skip the index lookups.
+
+    All the vectors in a cache must have the same dimension, use a separate directory for each
+    model and `output_dimensionality`. Deleting a key removes it from the index, the space in the
+    vectors file is not reclaimed.
+    """
+
+    def __init__(self, directory: str | os.PathLike, memory_cache_size: int = 4096):
+        if np is None:
+            raise ImportError(
+                "`MemmapEmbeddingCache` requires `numpy`, install it with `pip install numpy`."
+            )
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = directory / "vectors.f32"
+        self._vectors_path.touch()
+
+        self._lock = threading.Lock()
+        # Transactions are managed explicitly, `BEGIN IMMEDIATE` serializes writers across
+        # processes.
+        self._connection = sqlite3.connect(
+            directory / "index.sqlite", check_same_thread=False, isolation_level=None, timeout=60
+        )
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, row INTEGER NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+
+        self._memory = utils.LRUCache(memory_cache_size) if memory_cache_size else None
+        self._dim: int | None = None
+        self._map: np.memmap | None = None
+
+    @property
+    def dim(self) -> int | None:
+        """The dimension of the vectors, `None` until the first one is stored."""
+        if self._dim is None:
+            row = self._connection.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+            if row is not None:
+                self._dim = row[0]
+        return self._dim
+
+    def _vector(self, row: int) -> np.ndarray:
+        if self._map is None or row >= len(self._map):
+            # The file has grown since it was mapped.
+            rows = self._vectors_path.stat().st_size // (4 * self.dim)
+            self._map = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+            )
+        return self._map[row]
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        if self._memory is not None:
+            value = self._memory.get(key)
+            if value is not None:
+                return value
+
+        with self._lock:
+            found = self._connection.execute(
+                "SELECT row FROM vectors WHERE key = ?", (key,)
+            ).fetchone()
+            if found is None:
+                raise KeyError(key)
+            value = self._vector(found[0])
+
+        if self._memory is not None:
+            self._memory.put(key, value)
+        return value
+
+    def __setitem__(self, key: str, value: Sequence[float]) -> None:
+        vector = np.asarray(value, dtype=np.float32).ravel()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                dim = self.dim
+                if dim is None:
+                    dim = self._dim = len(vector)
+                    self._connection.execute(
+                        "INSERT INTO meta (name, value) VALUES ('dim', ?)", (dim,)
+                    )
+                elif len(vector) != dim:
+                    raise ValueError(
+                        f"Invalid input: All the vectors in a `MemmapEmbeddingCache` must have the "
+                        f"same dimension. Expected: {dim}, received: {len(vector)}."
+                    )
+
+                if self._connection.execute(
+                    "SELECT 1 FROM vectors WHERE key = ?", (key,)
+                ).fetchone():
+                    # Keys are content addressed, the stored vector is the same.
+                    self._connection.execute("COMMIT")
+                    return
+
+                # Rows are only appended, deleted rows are never reused.
+                row = self._vectors_path.stat().st_size // (4 * dim)
+                # Write the vector before it's indexed, so readers never see a partial row.
+                with open(self._vectors_path, "r+b") as f:
+                    f.seek(row * dim * 4)
+                    f.write(vector.tobytes())
+                self._connection.execute("INSERT INTO vectors (key, row) VALUES (?, ?)", (key, row))
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def __delitem__(self, key: str) -> None:
+        if self._memory is not None:
+            self._memory.pop(key)
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM vectors WHERE key = ?", (key,))
+        if not cursor.rowcount:
+            raise KeyError(key)
+
+    def __iter__(self):
+        with self._lock:
+            keys = self._connection.execute("SELECT key FROM vectors").fetchall()
+        return (key for (key,) in keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def close(self):
+        """Closes the index and unmaps the vectors file."""
+        with self._lock:
+            self._connection.close()
+            self._map = None
@@ -14,20 +14,31 @@
 # limitations under the License.
 from __future__ import annotations
 
+import hashlib
 import os
 import pathlib
 import mimetypes
-from typing import Iterable
+import time
+from typing import Callable, Iterable
 import logging
 from google.generativeai import protos
+from google.generativeai import utils
 from itertools import islice
 from io import IOBase
 
 from google.generativeai.types import file_types
 
 from google.generativeai.client import get_default_file_client
+from google.generativeai.client import get_default_file_async_client
 
-__all__ = ["upload_file", "get_file", "list_files", "delete_file"]
+__all__ = [
+    "upload_file",
+    "upload_file_async",
+    "upload_files",
+    "get_file",
+    "list_files",
+    "delete_file",
+]
 
 mimetypes.add_type("image/webp", ".webp")
 
@@ -58,6 +69,36 @@ def upload_file(
     """
     client = get_default_file_client()
 
+    path, mime_type, name, display_name = _prepare_upload(path, mime_type, name, display_name)
+    response = client.create_file(
+        path=path, mime_type=mime_type, name=name, display_name=display_name, resumable=resumable
+    )
+    return file_types.File(response)
+
+
+async def upload_file_async(
+    path: str | pathlib.Path | os.PathLike | IOBase,
+    *,
+    mime_type: str | None = None,
+    name: str | None = None,
+    display_name: str | None = None,
+    resumable: bool = True,
+) -> file_types.File:
+    """This is the async version of `upload_file`.
+
+    The file is streamed from disk in chunks, and interrupted uploads are resumed. Requires
+    `aiohttp`.
+    """
+    client = get_default_file_async_client()
+
+    path, mime_type, name, display_name = _prepare_upload(path, mime_type, name, display_name)
+    response = await client.create_file(
+        path=path, mime_type=mime_type, name=name, display_name=display_name, resumable=resumable
+    )
+    return file_types.File(response)
+
+
+def _prepare_upload(path, mime_type, name, display_name):
     if isinstance(path, IOBase):
         if mime_type is None:
             raise ValueError(
@@ -82,19 +123,109 @@ def upload_file(
     if name is not None and "/" not in name:
         name = f"files/{name}"
 
-    response = client.create_file(
-        path=path, mime_type=mime_type, name=name, display_name=display_name, resumable=resumable
-    )
-    return file_types.File(response)
+    return path, mime_type, name, display_name
+
+
+def _sha256(path: pathlib.Path) -> bytes:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(block)
+    return sha256.digest()
+
+
+def upload_files(
+    paths: Iterable[str | pathlib.Path | os.PathLike],
+    *,
+    max_concurrency: int = 8,
+    skip_existing: bool = True,
+    resumable: bool = True,
+    progress: Callable[[file_types.UploadProgress], None] | None = None,
+) -> list[file_types.File | Exception]:
+    """Uploads many files, in parallel.
+
+    ```
+    paths = sorted(pathlib.Path('frames').glob('*.jpg'))
+    results = genai.upload_files(
+        paths, progress=lambda p: print(f'{p.files_done}/{p.files_total}', p.error or ''))
+    failed = [path for path, r in zip(paths, results) if isinstance(r, Exception)]
+    ```
 
+    Each file is uploaded as by `upload_file`, with its mime type inferred from its extension and
+    its name as the display name.
 
-def list_files(page_size=100) -> Iterable[file_types.File]:
-    """Calls the API to list files using a supported file service."""
+    Args:
+        paths: The paths of the files to upload.
+        max_concurrency: The maximum number of uploads in flight at once.
+        skip_existing: If True, files whose sha256 hash matches a file already in the File API
+            aren't uploaded again, the existing `File` is returned instead.
+        resumable: Whether to use the resumable upload protocol.
+        progress: Called with an `UploadProgress` after each file is handled.
+
+    Returns:
+        A list with an entry per path, in order: the `File`, or the exception raised uploading it.
+    """
+    paths = [pathlib.Path(os.fspath(path)) for path in paths]
+
+    existing = {}
+    if skip_existing:
+        for proto in list_files(raw=True):
+            if proto.sha256_hash and proto.state != protos.File.State.FAILED:
+                existing[proto.sha256_hash] = proto
+
+    def upload(path):
+        size = 0
+        try:
+            size = path.stat().st_size
+            if existing:
+                digest = _sha256(path)
+                # Match both the raw digest and its hex encoding.
+                proto = existing.get(digest) or existing.get(digest.hex().encode())
+                if proto is not None:
+                    return file_types.File(proto), True, size
+            return upload_file(path, resumable=resumable), False, size
+        except Exception as e:
+            return e, False, size
+
+    start = time.monotonic()
+    results: dict[int, file_types.File | Exception] = {}
+    files_done = 0
+    bytes_done = 0
+    for index, (result, skipped, size) in utils.concurrent_iter(
+        upload, paths, max_concurrency=max_concurrency, ordered=False
+    ):
+        results[index] = result
+        files_done += 1
+        if not isinstance(result, Exception):
+            bytes_done += size
+        if progress is not None:
+            progress(
+                file_types.UploadProgress(
+                    path=paths[index],
+                    skipped=skipped,
+                    error=result if isinstance(result, Exception) else None,
+                    size=size,
+                    files_done=files_done,
+                    files_total=len(paths),
+                    bytes_done=bytes_done,
+                    elapsed=time.monotonic() - start,
+                )
+            )
+
+    return [results[index] for index in range(len(paths))]
+
+
+def list_files(page_size=100, raw: bool = False) -> Iterable[file_types.File]:
+    """Calls the API to list files using a supported file service.
+
+    The next page is fetched in the background while the current one is consumed. With
+    `raw=True` the `protos.File` messages are yielded as they are, instead of `File` objects.
+    """
     client = get_default_file_client()
 
     response = client.list_files(protos.ListFilesRequest(page_size=page_size))
-    for proto in response:
-        yield file_types.File(proto)
+    for proto in utils.iter_pager(response, "files"):
+        yield proto if raw else file_types.File(proto)
 
 
 def get_file(name: str) -> file_types.File:
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import AsyncIterable, Awaitable, Callable, Iterable
+import datetime
+import functools
+import logging
 import textwrap
+import threading
 from typing import Any, Union, overload
 import reprlib
 
@@ -13,6 +17,8 @@ import reprlib
 import google.api_core.exceptions
 from google.generativeai import protos
 from google.generativeai import client
+from google.generativeai import response_cache as response_cache_lib
+from google.generativeai import utils
 
 from google.generativeai import caching
 from google.generativeai.types import content_types
@@ -23,6 +29,26 @@ from google.generativeai.types import safety_types
 _USER_ROLE = "user"
 _MODEL_ROLE = "model"
 
+_logger = logging.getLogger(__name__)
+
+# The defaults for `auto_cache`: the stable prefix of a chat is cached once it reaches
+# `AUTO_CACHE_MIN_TOKENS` tokens, the cache is kept alive for `AUTO_CACHE_TTL` after its last use.
+AUTO_CACHE_MIN_TOKENS = 32768
+AUTO_CACHE_TTL = datetime.timedelta(hours=1)
+
+# Errors the API returns when a request refers to a `CachedContent` that expired or was deleted.
+_CACHE_EXPIRED_ERRORS = (
+    google.api_core.exceptions.NotFound,
+    google.api_core.exceptions.PermissionDenied,
+)
+
+# Errors `CachedContent.create` fails with when the model, or the tier, doesn't support caching.
+# `BadRequest` includes `InvalidArgument` and `FailedPrecondition`.
+_CACHE_UNSUPPORTED_ERRORS = (
+    google.api_core.exceptions.BadRequest,
+    google.api_core.exceptions.NotFound,
+)
+
 
 class GenerativeModel:
     """
@@ -68,6 +94,11 @@ class GenerativeModel:
              by the api before being returned.
          generation_config: A `genai.GenerationConfig` setting the default generation parameters to
              use.
+         auto_cache: The default `auto_cache` setting of the chats started with
+             `GenerativeModel.start_chat`, see `ChatSession`.
+         response_cache: A `genai.response_cache.ResponseCache`. If set, non-streaming
+             `generate_content` calls return the cached response of an identical earlier request,
+             without calling the API.
     """
 
     def __init__(
@@ -78,6 +109,8 @@ class GenerativeModel:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         system_instruction: content_types.ContentType | None = None,
+        auto_cache: bool = False,
+        response_cache: response_cache_lib.ResponseCache | None = None,
     ):
         if "/" not in model_name:
             model_name = "models/" + model_name
@@ -96,8 +129,15 @@ class GenerativeModel:
         else:
             self._system_instruction = content_types.to_content(system_instruction)
 
+        self._auto_cache = auto_cache
+        self._response_cache = response_cache
+        self._response_cache_lock = threading.Lock()
+        self._response_cache_hits = 0
+        self._response_cache_misses = 0
+
         self._client = None
         self._async_client = None
+        self._request_template = None
 
     @property
     def cached_content(self) -> str:
@@ -127,16 +167,38 @@ class GenerativeModel:
 
     __repr__ = __str__
 
-    def _prepare_request(
+    def compile_request(
         self,
         *,
-        contents: content_types.ContentsType,
         generation_config: generation_types.GenerationConfigType | None = None,
         safety_settings: safety_types.SafetySettingOptions | None = None,
-        tools: content_types.FunctionLibraryType | None,
-        tool_config: content_types.ToolConfigType | None,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
     ) -> protos.GenerateContentRequest:
-        """Creates a `protos.GenerateContentRequest` from raw inputs."""
+        """Builds the parts of a `protos.GenerateContentRequest` that don't depend on the `contents`.
+
+        Converting the `tools`, `tool_config`, `generation_config` and `safety_settings` to protos
+        is repeated on every call. When the same overrides are used for many calls, build the
+        request template once, and pass it to `GenerativeModel.generate_content`, which then only
+        adds the `contents`:
+
+        >>> model = genai.GenerativeModel('models/gemini-1.5-flash')
+        >>> template = model.compile_request(tools=tools, generation_config={'temperature': 0})
+        >>> for prompt in prompts:
+        ...   response = model.generate_content(prompt, request_template=template)
+
+        The template is shared between calls, don't modify it. Calls that don't pass any overrides
+        always reuse a template built from the model's own settings.
+
+        Arguments:
+            generation_config: Overrides for the model's generation config.
+            safety_settings: Overrides for the model's safety settings.
+            tools: `protos.Tools` more info coming soon.
+            tool_config: Overrides for the model's tool config.
+
+        Returns:
+            A `protos.GenerateContentRequest` without `contents`.
+        """
         if hasattr(self, "_cached_content") and any([self._system_instruction, tools, tool_config]):
             raise ValueError(
                 "`tools`, `tool_config`, `system_instruction` cannot be set on a model instantiated with `cached_content` as its context."
@@ -151,8 +213,6 @@ class GenerativeModel:
         else:
             tool_config = content_types.to_tool_config(tool_config)
 
-        contents = content_types.to_contents(contents)
-
         generation_config = generation_types.to_generation_config_dict(generation_config)
         merged_gc = self._generation_config.copy()
         merged_gc.update(generation_config)
@@ -164,7 +224,6 @@ class GenerativeModel:
 
         return protos.GenerateContentRequest(
             model=self._model_name,
-            contents=contents,
             generation_config=merged_gc,
             safety_settings=merged_ss,
             tools=tools_lib,
@@ -173,6 +232,80 @@ class GenerativeModel:
             cached_content=self.cached_content,
         )
 
+    def _prepare_request(
+        self,
+        *,
+        contents: content_types.ContentsType,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        tools: content_types.FunctionLibraryType | None,
+        tool_config: content_types.ToolConfigType | None,
+        request_template: protos.GenerateContentRequest | None = None,
+    ) -> protos.GenerateContentRequest:
+        """Creates a `protos.GenerateContentRequest` from raw inputs."""
+        # `ChatSession` passes the model's own tools, and an empty `generation_config`.
+        has_overrides = bool(
+            generation_config
+            or safety_settings
+            or tool_config is not None
+            or (tools is not None and tools is not self._tools)
+        )
+
+        if request_template is not None:
+            if has_overrides:
+                raise ValueError(
+                    "Invalid configuration: `request_template` already contains the `generation_config`, "
+                    "`safety_settings`, `tools` and `tool_config`, they cannot be passed along with it."
+                )
+        elif has_overrides:
+            request_template = self.compile_request(
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                tools=tools,
+                tool_config=tool_config,
+            )
+        else:
+            if self._request_template is None:
+                self._request_template = self.compile_request()
+            request_template = self._request_template
+
+        request = protos.GenerateContentRequest()
+        protos.GenerateContentRequest.copy_from(request, request_template)
+        request.contents = content_types.to_contents(contents)
+        return request
+
+    def response_cache_info(self) -> response_cache_lib.CacheInfo:
+        """Returns the number of hits and misses of the model's `response_cache`."""
+        with self._response_cache_lock:
+            return response_cache_lib.CacheInfo(
+                self._response_cache_hits, self._response_cache_misses
+            )
+
+    def _get_cached_response(
+        self, request: protos.GenerateContentRequest
+    ) -> protos.GenerateContentResponse | None:
+        if self._response_cache is None:
+            return None
+
+        try:
+            data = self._response_cache[response_cache_lib.request_key(request)]
+        except KeyError:
+            with self._response_cache_lock:
+                self._response_cache_misses += 1
+            return None
+
+        with self._response_cache_lock:
+            self._response_cache_hits += 1
+        return protos.GenerateContentResponse.deserialize(data)
+
+    def _cache_response(
+        self, request: protos.GenerateContentRequest, response: protos.GenerateContentResponse
+    ):
+        if self._response_cache is None:
+            return
+        key = response_cache_lib.request_key(request)
+        self._response_cache[key] = protos.GenerateContentResponse.serialize(response)
+
     def _get_tools_lib(
         self, tools: content_types.FunctionLibraryType
     ) -> content_types.FunctionLibrary | None:
@@ -244,6 +377,8 @@ class GenerativeModel:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        keep_chunks: bool = True,
+        request_template: protos.GenerateContentRequest | None = None,
     ) -> generation_types.GenerateContentResponse:
         """A multipurpose function to generate responses from the model.
 
@@ -263,6 +398,10 @@ class GenerativeModel:
         >>> for chunk in response:
         ...   print(chunk.text)
 
+        By default the response keeps every chunk, so it can be iterated over again. Pass
+        `keep_chunks=False` to drop each chunk once it has been yielded, so the response only holds
+        the accumulated result. The chunks can then only be iterated over once.
+
         ### Multi-turn
 
         This method supports multi-turn chats but is **stateless**: the entire conversation history needs to be sent with each
@@ -298,6 +437,9 @@ class GenerativeModel:
             stream: If True, yield response chunks as they are generated.
             tools: `protos.Tools` more info coming soon.
             request_options: Options for the request.
+            keep_chunks: With `stream=True`, if False, drop each chunk once it has been yielded.
+            request_template: A request built by `GenerativeModel.compile_request`, used instead
+                of the other overrides.
         """
         if not contents:
             raise TypeError("contents must not be empty")
@@ -308,6 +450,7 @@ class GenerativeModel:
             safety_settings=safety_settings,
             tools=tools,
             tool_config=tool_config,
+            request_template=request_template,
         )
 
         if request.contents and not request.contents[-1].role:
@@ -326,12 +469,16 @@ class GenerativeModel:
                         request,
                         **request_options,
                     )
-                return generation_types.GenerateContentResponse.from_iterator(iterator)
-            else:
-                response = self._client.generate_content(
-                    request,
-                    **request_options,
+                return generation_types.GenerateContentResponse.from_iterator(
+                    iterator, keep_chunks=keep_chunks
                 )
+            else:
+                if (response := self._get_cached_response(request)) is None:
+                    response = self._client.generate_content(
+                        request,
+                        **request_options,
+                    )
+                    self._cache_response(request, response)
                 return generation_types.GenerateContentResponse.from_response(response)
         except google.api_core.exceptions.InvalidArgument as e:
             if e.message.startswith("Request payload size exceeds the limit:"):
@@ -351,6 +498,8 @@ class GenerativeModel:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        keep_chunks: bool = True,
+        request_template: protos.GenerateContentRequest | None = None,
     ) -> generation_types.AsyncGenerateContentResponse:
         """The async version of `GenerativeModel.generate_content`."""
         if not contents:
@@ -362,6 +511,7 @@ class GenerativeModel:
             safety_settings=safety_settings,
             tools=tools,
             tool_config=tool_config,
+            request_template=request_template,
         )
 
         if request.contents and not request.contents[-1].role:
@@ -380,12 +530,16 @@ class GenerativeModel:
                         request,
                         **request_options,
                     )
-                return await generation_types.AsyncGenerateContentResponse.from_aiterator(iterator)
-            else:
-                response = await self._async_client.generate_content(
-                    request,
-                    **request_options,
+                return await generation_types.AsyncGenerateContentResponse.from_aiterator(
+                    iterator, keep_chunks=keep_chunks
                 )
+            else:
+                if (response := self._get_cached_response(request)) is None:
+                    response = await self._async_client.generate_content(
+                        request,
+                        **request_options,
+                    )
+                    self._cache_response(request, response)
                 return generation_types.AsyncGenerateContentResponse.from_response(response)
         except google.api_core.exceptions.InvalidArgument as e:
             if e.message.startswith("Request payload size exceeds the limit:"):
@@ -395,6 +549,110 @@ class GenerativeModel:
                 )
             raise
 
+    def generate_content_batch(
+        self,
+        contents: Iterable[content_types.ContentsType],
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        request_options: helper_types.RequestOptionsType | None = None,
+        max_concurrency: int = 8,
+        ordered: bool = True,
+    ) -> Iterable[tuple[int, generation_types.GenerateContentResponse | Exception]]:
+        """Runs `GenerativeModel.generate_content` over many prompts concurrently.
+
+        Each item of `contents` is sent as a separate request, using a thread pool that keeps at most
+        `max_concurrency` requests in flight. `contents` is consumed lazily, so it can be a generator.
+
+        The results are yielded as `(index, result)` pairs, where `index` is the position of the
+        prompt in `contents`. A request that fails doesn't stop the batch: its `result` is the
+        exception that was raised, instead of a `GenerateContentResponse`.
+
+        >>> model = genai.GenerativeModel('models/gemini-1.5-flash')
+        >>> prompts = ['Tell me a joke', 'Tell me a story', 'Tell me a secret']
+        >>> for index, result in model.generate_content_batch(prompts, max_concurrency=2):
+        ...   if isinstance(result, Exception):
+        ...     print(index, 'failed:', result)
+        ...   else:
+        ...     print(index, result.text)
+
+        Arguments:
+            contents: An iterable, each item is the `contents` for one `generate_content` call.
+            generation_config: Overrides for the model's generation config.
+            safety_settings: Overrides for the model's safety settings.
+            tools: `protos.Tools` more info coming soon.
+            tool_config: Overrides for the model's tool config.
+            request_options: Options for the requests.
+            max_concurrency: The maximum number of requests in flight at once.
+            ordered: If True, yield results in the order of `contents`, otherwise yield them as
+                they complete. In order, one slow request holds back the results behind it: new
+                requests keep starting while it runs, but only until `2 * max_concurrency`
+                requests, running or finished, are waiting for it. Use `ordered=False` for the
+                best throughput, the `index` tells you which prompt each result belongs to.
+        """
+        if self._client is None:
+            self._client = client.get_default_generative_client()
+
+        def generate(item):
+            try:
+                return self.generate_content(
+                    item,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings,
+                    tools=tools,
+                    tool_config=tool_config,
+                    request_options=request_options,
+                )
+            except Exception as e:
+                return e
+
+        for index, result in utils.concurrent_iter(
+            generate, contents, max_concurrency=max_concurrency, ordered=ordered
+        ):
+            yield index, result
+
+    async def generate_content_batch_async(
+        self,
+        contents: Iterable[content_types.ContentsType],
+        *,
+        generation_config: generation_types.GenerationConfigType | None = None,
+        safety_settings: safety_types.SafetySettingOptions | None = None,
+        tools: content_types.FunctionLibraryType | None = None,
+        tool_config: content_types.ToolConfigType | None = None,
+        request_options: helper_types.RequestOptionsType | None = None,
+        max_concurrency: int = 8,
+        ordered: bool = True,
+    ) -> AsyncIterable[tuple[int, generation_types.AsyncGenerateContentResponse | Exception]]:
+        """The async version of `GenerativeModel.generate_content_batch`.
+
+        The requests run as `asyncio` tasks on the current event loop.
+
+        >>> async for index, result in model.generate_content_batch_async(prompts):
+        ...   print(index, result)
+        """
+        if self._async_client is None:
+            self._async_client = client.get_default_generative_async_client()
+
+        async def generate(item):
+            try:
+                return await self.generate_content_async(
+                    item,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings,
+                    tools=tools,
+                    tool_config=tool_config,
+                    request_options=request_options,
+                )
+            except Exception as e:
+                return e
+
+        async for index, result in utils.concurrent_aiter(
+            generate, contents, max_concurrency=max_concurrency, ordered=ordered
+        ):
+            yield index, result
+
     # fmt: off
     def count_tokens(
         self,
@@ -457,6 +715,9 @@ class GenerativeModel:
         *,
         history: Iterable[content_types.StrictContentType] | None = None,
         enable_automatic_function_calling: bool = False,
+        parallel_function_calls: bool = False,
+        max_function_call_workers: int = 8,
+        auto_cache: bool | None = None,
     ) -> ChatSession:
         """Returns a `genai.ChatSession` attached to this model.
 
@@ -466,6 +727,11 @@ class GenerativeModel:
 
         Arguments:
             history: An iterable of `protos.Content` objects, or equivalents to initialize the session.
+            enable_automatic_function_calling: If True, run the functions the model calls.
+            parallel_function_calls: If True, run the function calls of a turn concurrently.
+            max_function_call_workers: The maximum number of function calls run at once.
+            auto_cache: If True, cache the stable prefix of the chat history, see `ChatSession`.
+                Defaults to the model's `auto_cache` setting.
         """
         if self._generation_config.get("candidate_count", 1) > 1:
             raise ValueError(
@@ -475,9 +741,230 @@ class GenerativeModel:
             model=self,
             history=history,
             enable_automatic_function_calling=enable_automatic_function_calling,
+            parallel_function_calls=parallel_function_calls,
+            max_function_call_workers=max_function_call_workers,
+            auto_cache=self._auto_cache if auto_cache is None else auto_cache,
         )
 
 
+def _without_function_calls(
+    chunk: protos.GenerateContentResponse,
+) -> protos.GenerateContentResponse | None:
+    """Returns `chunk` without its `function_call` parts, or None if no other parts are left."""
+    chunk_pb = type(chunk).pb(chunk)
+    if not any(
+        part.HasField("function_call") for c in chunk_pb.candidates for part in c.content.parts
+    ):
+        return chunk
+
+    stripped = type(chunk_pb)()
+    stripped.CopyFrom(chunk_pb)
+    has_parts = False
+    for candidate in stripped.candidates:
+        parts = [part for part in candidate.content.parts if not part.HasField("function_call")]
+        del candidate.content.parts[:]
+        candidate.content.parts.extend(parts)
+        has_parts = has_parts or bool(parts)
+
+    if not has_parts:
+        return None
+    return protos.GenerateContentResponse.wrap(stripped)
+
+
+def _function_calls_chunk(
+    function_calls: Iterable[protos.FunctionCall],
+) -> protos.GenerateContentResponse:
+    return protos.GenerateContentResponse(
+        candidates=[
+            protos.Candidate(
+                content=protos.Content(
+                    role=_MODEL_ROLE,
+                    parts=[protos.Part(function_call=fc) for fc in function_calls],
+                )
+            )
+        ]
+    )
+
+
+class _ContextCache:
+    """Keeps the stable prefix of a `ChatSession` history in a `caching.CachedContent`.
+
+    See `ChatSession` `auto_cache`.
+    """
+
+    def __init__(self, model: GenerativeModel, *, min_tokens: int, ttl: datetime.timedelta):
+        self.model = model
+        self.min_tokens = min_tokens
+        self.ttl = ttl
+        # Set once creating a cache failed in a way that retrying won't fix.
+        self.disabled = False
+        self.drop()
+
+    def drop(self):
+        """Forgets the cache, without deleting it."""
+        self.cached_content: caching.CachedContent | None = None
+        self.cached_model: GenerativeModel | None = None
+        self.prefix: list[protos.Content] = []
+        self.tokens = 0
+
+    def _is_valid(self, prefix: list[protos.Content]) -> bool:
+        if len(prefix) < len(self.prefix):
+            return False
+        return all(a is b for a, b in zip(self.prefix, prefix))
+
+    def _needs_refresh(self) -> bool:
+        remaining = self.cached_content.expire_time - datetime.datetime.now(datetime.timezone.utc)
+        return remaining < self.ttl / 2
+
+    def use(
+        self, history: list[protos.Content], *, tokens: int | None
+    ) -> tuple[GenerativeModel, list[protos.Content]]:
+        """Returns the model to send `history` to, and the part of `history` to send.
+
+        Creates, replaces or refreshes the cache first, as needed. `tokens` is the number of
+        tokens in `history[:-1]`, it is counted if unknown.
+        """
+        if self.disabled:
+            return self.model, history
+
+        prefix = history[:-1]
+        if self.cached_content is not None and not self._is_valid(prefix):
+            self.delete()
+
+        if tokens is None:
+            tokens = 0
+            if prefix:
+                response = self.model.count_tokens(prefix)
+                tokens = response.total_tokens
+
+        if tokens - self.tokens >= self.min_tokens:
+            self.create(prefix, tokens=tokens)
+        elif self.cached_content is not None and self._needs_refresh():
+            self.refresh()
+
+        if self.cached_content is None:
+            return self.model, history
+        return self.cached_model, history[len(self.prefix) :]
+
+    def create(self, prefix: list[protos.Content], *, tokens: int):
+        try:
+            cached_content = caching.CachedContent.create(
+                self.model.model_name,
+                system_instruction=self.model._system_instruction,
+                contents=prefix,
+                tools=self.model._tools,
+                tool_config=self.model._tool_config,
+                ttl=self.ttl,
+            )
+        except _CACHE_UNSUPPORTED_ERRORS as e:
+            # Don't pay for a failing request with every message, keep sending the whole history.
+            _logger.warning("Disabled automatic context caching for this chat session: %s", e)
+            self.disabled = True
+            self.delete()
+            return
+        except google.api_core.exceptions.GoogleAPICallError:
+            # For example a transient error, try again with the next message.
+            return
+
+        self.delete()
+        self.cached_content = cached_content
+        self.cached_model = GenerativeModel.from_cached_content(
+            cached_content,
+            generation_config=self.model._generation_config,
+            safety_settings=self.model._safety_settings,
+        )
+        self.prefix = prefix
+        self.tokens = tokens
+
+    def refresh(self):
+        try:
+            self.cached_content.update(ttl=self.ttl)
+        except _CACHE_EXPIRED_ERRORS:
+            self.drop()
+
+    def delete(self):
+        if self.cached_content is None:
+            return
+        try:
+            self.cached_content.delete()
+        except google.api_core.exceptions.GoogleAPICallError:
+            # It expires anyway.
+            pass
+        self.drop()
+
+    async def use_async(
+        self, history: list[protos.Content], *, tokens: int | None
+    ) -> tuple[GenerativeModel, list[protos.Content]]:
+        """The async version of `_ContextCache.use`."""
+        if self.disabled:
+            return self.model, history
+
+        prefix = history[:-1]
+        if self.cached_content is not None and not self._is_valid(prefix):
+            await self.delete_async()
+
+        if tokens is None:
+            tokens = 0
+            if prefix:
+                response = await self.model.count_tokens_async(prefix)
+                tokens = response.total_tokens
+
+        if tokens - self.tokens >= self.min_tokens:
+            await self.create_async(prefix, tokens=tokens)
+        elif self.cached_content is not None and self._needs_refresh():
+            await self.refresh_async()
+
+        if self.cached_content is None:
+            return self.model, history
+        return self.cached_model, history[len(self.prefix) :]
+
+    async def create_async(self, prefix: list[protos.Content], *, tokens: int):
+        try:
+            cached_content = await caching.CachedContent.create_async(
+                self.model.model_name,
+                system_instruction=self.model._system_instruction,
+                contents=prefix,
+                tools=self.model._tools,
+                tool_config=self.model._tool_config,
+                ttl=self.ttl,
+            )
+        except _CACHE_UNSUPPORTED_ERRORS as e:
+            # Don't pay for a failing request with every message, keep sending the whole history.
+            _logger.warning("Disabled automatic context caching for this chat session: %s", e)
+            self.disabled = True
+            await self.delete_async()
+            return
+        except google.api_core.exceptions.GoogleAPICallError:
+            # For example a transient error, try again with the next message.
+            return
+
+        await self.delete_async()
+        self.cached_content = cached_content
+        self.cached_model = GenerativeModel.from_cached_content(
+            cached_content,
+            generation_config=self.model._generation_config,
+            safety_settings=self.model._safety_settings,
+        )
+        self.prefix = prefix
+        self.tokens = tokens
+
+    async def refresh_async(self):
+        try:
+            await self.cached_content.update_async(ttl=self.ttl)
+        except _CACHE_EXPIRED_ERRORS:
+            self.drop()
+
+    async def delete_async(self):
+        if self.cached_content is None:
+            return
+        try:
+            await self.cached_content.delete_async()
+        except google.api_core.exceptions.GoogleAPICallError:
+            # It expires anyway.
+            pass
+        self.drop()
+
+
 class ChatSession:
     """Contains an ongoing conversation with the model.
 
@@ -492,9 +979,30 @@ class ChatSession:
     This `ChatSession` object collects the messages sent and received, in its
     `ChatSession.history` attribute.
 
+    With `enable_automatic_function_calling=True`, the `FunctionCall`s the model returns are run,
+    and their results sent back to the model, until it returns a response without any calls.
+    When the model returns several calls in one turn, they are run one after the other, unless
+    `parallel_function_calls=True`: then `send_message` runs them in a thread pool, and
+    `send_message_async` runs them concurrently on the event loop (in worker threads, unless the
+    functions are coroutine functions). Otherwise `send_message_async` calls regular functions in
+    the event loop's thread.
+
     Arguments:
         model: The model to use in the chat.
         history: A chat history to initialize the object with.
+        enable_automatic_function_calling: If True, run the functions the model calls.
+        parallel_function_calls: If True, run the function calls of a turn concurrently.
+        max_function_call_workers: The maximum number of function calls run at once, with
+            `parallel_function_calls=True`.
+        auto_cache: If True, once the history sent with each message reaches
+            `auto_cache_min_tokens` tokens, it is stored in a `caching.CachedContent`, along with
+            the model's `system_instruction`, `tools` and `tool_config`. Following messages only
+            send the turns added after it. The cache's TTL is extended while the chat is in use,
+            and the cache is replaced when the uncached turns reach `auto_cache_min_tokens` again,
+            or when the cached turns are edited. If the cache has expired, the whole history is
+            sent instead. Messages sent with `tools` or `tool_config` overrides don't use the cache.
+        auto_cache_min_tokens: The number of tokens that triggers caching, see `auto_cache`.
+        auto_cache_ttl: The TTL of the cache, see `auto_cache`.
     """
 
     def __init__(
@@ -502,12 +1010,46 @@ class ChatSession:
         model: GenerativeModel,
         history: Iterable[content_types.StrictContentType] | None = None,
         enable_automatic_function_calling: bool = False,
+        parallel_function_calls: bool = False,
+        max_function_call_workers: int = 8,
+        auto_cache: bool = False,
+        auto_cache_min_tokens: int = AUTO_CACHE_MIN_TOKENS,
+        auto_cache_ttl: datetime.timedelta = AUTO_CACHE_TTL,
     ):
         self.model: GenerativeModel = model
         self._history: list[protos.Content] = content_types.to_contents(history)
         self._last_sent: protos.Content | None = None
         self._last_received: generation_types.BaseGenerateContentResponse | None = None
+        # The contents received while streaming `_last_received` with automatic function calling.
+        self._last_received_turns: list[protos.Content] | None = None
         self.enable_automatic_function_calling = enable_automatic_function_calling
+        self.parallel_function_calls = parallel_function_calls
+        self.max_function_call_workers = max_function_call_workers
+
+        # The number of tokens in the history, if known.
+        self._history_tokens: int | None = None if self._history else 0
+        self._context_cache: _ContextCache | None = None
+        if auto_cache:
+            self._context_cache = _ContextCache(
+                model, min_tokens=auto_cache_min_tokens, ttl=auto_cache_ttl
+            )
+
+    @property
+    def _function_call_concurrency(self) -> int:
+        if self.parallel_function_calls:
+            return self.max_function_call_workers
+        return 1
+
+    @property
+    def _function_caller(self) -> Callable[..., protos.Part | None]:
+        return content_types.FunctionLibrary.call
+
+    @property
+    def _function_caller_async(self) -> Callable[..., Awaitable[protos.Part | None]]:
+        # Regular functions only leave the event loop's thread when the calls run concurrently.
+        if self.parallel_function_calls:
+            return content_types.FunctionLibrary.call_in_thread_async
+        return content_types.FunctionLibrary.call_async
 
     def send_message(
         self,
@@ -519,6 +1061,7 @@ class ChatSession:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        keep_chunks: bool = True,
     ) -> generation_types.GenerateContentResponse:
         """Sends the conversation history with the added message and returns the model's response.
 
@@ -542,6 +1085,11 @@ class ChatSession:
         Once iteration over chunks is complete, the `response` and `ChatSession` are in states identical to the
         `stream=False` case. Some properties are not available until iteration is complete.
 
+        With `enable_automatic_function_calling=True` the chunks of all the rounds of function calling
+        are streamed: `function_call` parts are not yielded, the functions are called once the model has
+        finished its turn, and iteration continues with the model's next response. The `response` collects
+        the text of all the rounds, the intermediate turns are added to the `ChatSession.history`.
+
         Like `GenerativeModel.generate_content` this method lets you override the model's `generation_config` and
         `safety_settings`.
 
@@ -550,15 +1098,11 @@ class ChatSession:
              generation_config: Overrides for the model's generation config.
              safety_settings: Overrides for the model's safety settings.
              stream: If True, yield response chunks as they are generated.
+             keep_chunks: With `stream=True`, if False, drop each chunk once it has been yielded.
         """
         if request_options is None:
             request_options = {}
 
-        if self.enable_automatic_function_calling and stream:
-            raise NotImplementedError(
-                "Unsupported configuration: The `google.generativeai` SDK currently does not support the combination of `stream=True` and `enable_automatic_function_calling=True`."
-            )
-
         tools_lib = self.model._get_tools_lib(tools)
 
         content = content_types.to_content(content)
@@ -566,7 +1110,7 @@ class ChatSession:
         if not content.role:
             content.role = _USER_ROLE
 
-        history = self.history[:]
+        history = self._commit_history()[:]
         history.append(content)
 
         generation_config = generation_types.to_generation_config_dict(generation_config)
@@ -575,20 +1119,22 @@ class ChatSession:
                 "Invalid configuration: The chat functionality does not support `candidate_count` greater than 1."
             )
 
-        response = self.model.generate_content(
-            contents=history,
+        response = self._generate_content(
+            history,
+            tokens=self._history_tokens,
             generation_config=generation_config,
             safety_settings=safety_settings,
             stream=stream,
             tools=tools_lib,
             tool_config=tool_config,
             request_options=request_options,
+            keep_chunks=keep_chunks,
         )
 
         self._check_response(response=response, stream=stream)
 
         if self.enable_automatic_function_calling and tools_lib is not None:
-            self.history, content, response = self._handle_afc(
+            self._history, content, response = self._handle_afc(
                 response=response,
                 history=history,
                 generation_config=generation_config,
@@ -596,13 +1142,63 @@ class ChatSession:
                 stream=stream,
                 tools_lib=tools_lib,
                 request_options=request_options,
+                keep_chunks=keep_chunks,
             )
+            self._history_tokens = None
 
         self._last_sent = content
         self._last_received = response
 
         return response
 
+    def _generate_content(
+        self,
+        history,
+        *,
+        tokens,
+        generation_config,
+        safety_settings,
+        stream,
+        tools,
+        tool_config=None,
+        request_options,
+        keep_chunks=True,
+    ) -> generation_types.GenerateContentResponse:
+        """Calls the model with `history`, using the context cache if `auto_cache` is enabled.
+
+        `tokens` is the number of tokens in `history[:-1]`, if known.
+        """
+        model, contents = self.model, history
+        if self._context_cache is not None and tools is self.model._tools and tool_config is None:
+            model, contents = self._context_cache.use(history, tokens=tokens)
+
+        try:
+            return model.generate_content(
+                contents=contents,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                stream=stream,
+                tools=None if model is not self.model else tools,
+                tool_config=tool_config,
+                request_options=request_options,
+                keep_chunks=keep_chunks,
+            )
+        except _CACHE_EXPIRED_ERRORS:
+            if model is self.model:
+                raise
+            # The cache expired, or was deleted, fall back to sending the whole history.
+            self._context_cache.drop()
+            return self.model.generate_content(
+                contents=history,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                stream=stream,
+                tools=tools,
+                tool_config=tool_config,
+                request_options=request_options,
+                keep_chunks=keep_chunks,
+            )
+
     def _check_response(self, *, response, stream):
         if response.prompt_feedback.block_reason:
             raise generation_types.BlockedPromptException(response.prompt_feedback)
@@ -635,27 +1231,40 @@ class ChatSession:
         stream,
         tools_lib,
         request_options,
+        keep_chunks=True,
     ) -> tuple[list[protos.Content], protos.Content, generation_types.BaseGenerateContentResponse]:
 
+        if stream:
+            *prefix, content = history
+            self._last_received_turns = []
+            # Created without waiting for the first chunk: if the first round only contains
+            # function calls, they're called as the caller iterates, not before this returns.
+            response = generation_types.GenerateContentResponse(
+                done=False,
+                iterator=self._stream_afc(
+                    response=response,
+                    history=history,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings,
+                    tools_lib=tools_lib,
+                    request_options=request_options,
+                    turns=self._last_received_turns,
+                ),
+                result=protos.GenerateContentResponse(prompt_feedback=response.prompt_feedback),
+                chunks=[],
+                keep_chunks=keep_chunks,
+            )
+            return prefix, content, response
+
         while function_calls := self._get_function_calls(response):
             if not all(callable(tools_lib[fc]) for fc in function_calls):
                 break
             history.append(response.candidates[0].content)
+            history.append(self._call_functions(tools_lib, function_calls))
 
-            function_response_parts: list[protos.Part] = []
-            for fc in function_calls:
-                fr = tools_lib(fc)
-                assert fr is not None, (
-                    "Unexpected state: The function reference (fr) should never be None. It should only return None if the declaration "
-                    "is not callable, which is checked earlier in the code."
-                )
-                function_response_parts.append(fr)
-
-            send = protos.Content(role=_USER_ROLE, parts=function_response_parts)
-            history.append(send)
-
-            response = self.model.generate_content(
-                contents=history,
+            response = self._generate_content(
+                history,
+                tokens=response.usage_metadata.total_token_count,
                 generation_config=generation_config,
                 safety_settings=safety_settings,
                 stream=stream,
@@ -668,6 +1277,70 @@ class ChatSession:
         *history, content = history
         return history, content, response
 
+    def _stream_afc(
+        self,
+        *,
+        response,
+        history,
+        generation_config,
+        safety_settings,
+        tools_lib,
+        request_options,
+        turns,
+    ) -> Iterable[protos.GenerateContentResponse]:
+        """Streams the chunks of each round of automatic function calling.
+
+        `function_call` parts are held back, once a round is complete the functions are called and
+        the next round is streamed. The contents of the rounds are added to `turns`.
+        """
+        while True:
+            for chunk in response._iter_chunks():
+                if chunk := _without_function_calls(chunk):
+                    yield chunk
+
+            if not response.candidates:
+                # An empty round, there's nothing to call. The history reports the broken turn.
+                return
+
+            function_calls = self._get_function_calls(response)
+            if not function_calls or not all(callable(tools_lib[fc]) for fc in function_calls):
+                if function_calls:
+                    yield _function_calls_chunk(function_calls)
+                break
+            history.append(response.candidates[0].content)
+            history.append(self._call_functions(tools_lib, function_calls))
+            turns.extend(history[-2:])
+
+            response = self._generate_content(
+                history,
+                tokens=response.usage_metadata.total_token_count,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                stream=True,
+                tools=tools_lib,
+                request_options=request_options,
+                keep_chunks=False,
+            )
+
+            self._check_response(response=response, stream=True)
+
+        turns.append(response.candidates[0].content)
+
+    def _call_functions(self, tools_lib, function_calls) -> protos.Content:
+        function_response_parts: list[protos.Part] = []
+        for _, fr in utils.concurrent_iter(
+            functools.partial(self._function_caller, tools_lib),
+            function_calls,
+            max_concurrency=self._function_call_concurrency,
+        ):
+            assert fr is not None, (
+                "Unexpected state: The function reference (fr) should never be None. It should only return None if the declaration "
+                "is not callable, which is checked earlier in the code."
+            )
+            function_response_parts.append(fr)
+
+        return protos.Content(role=_USER_ROLE, parts=function_response_parts)
+
     async def send_message_async(
         self,
         content: content_types.ContentType,
@@ -678,16 +1351,12 @@ class ChatSession:
         tools: content_types.FunctionLibraryType | None = None,
         tool_config: content_types.ToolConfigType | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        keep_chunks: bool = True,
     ) -> generation_types.AsyncGenerateContentResponse:
         """The async version of `ChatSession.send_message`."""
         if request_options is None:
             request_options = {}
 
-        if self.enable_automatic_function_calling and stream:
-            raise NotImplementedError(
-                "Unsupported configuration: The `google.generativeai` SDK currently does not support the combination of `stream=True` and `enable_automatic_function_calling=True`."
-            )
-
         tools_lib = self.model._get_tools_lib(tools)
 
         content = content_types.to_content(content)
@@ -695,7 +1364,7 @@ class ChatSession:
         if not content.role:
             content.role = _USER_ROLE
 
-        history = self.history[:]
+        history = self._commit_history()[:]
         history.append(content)
 
         generation_config = generation_types.to_generation_config_dict(generation_config)
@@ -704,20 +1373,22 @@ class ChatSession:
                 "Invalid configuration: The chat functionality does not support `candidate_count` greater than 1."
             )
 
-        response = await self.model.generate_content_async(
-            contents=history,
+        response = await self._generate_content_async(
+            history,
+            tokens=self._history_tokens,
             generation_config=generation_config,
             safety_settings=safety_settings,
             stream=stream,
             tools=tools_lib,
             tool_config=tool_config,
             request_options=request_options,
+            keep_chunks=keep_chunks,
         )
 
         self._check_response(response=response, stream=stream)
 
         if self.enable_automatic_function_calling and tools_lib is not None:
-            self.history, content, response = await self._handle_afc_async(
+            self._history, content, response = await self._handle_afc_async(
                 response=response,
                 history=history,
                 generation_config=generation_config,
@@ -725,13 +1396,60 @@ class ChatSession:
                 stream=stream,
                 tools_lib=tools_lib,
                 request_options=request_options,
+                keep_chunks=keep_chunks,
             )
+            self._history_tokens = None
 
         self._last_sent = content
         self._last_received = response
 
         return response
 
+    async def _generate_content_async(
+        self,
+        history,
+        *,
+        tokens,
+        generation_config,
+        safety_settings,
+        stream,
+        tools,
+        tool_config=None,
+        request_options,
+        keep_chunks=True,
+    ) -> generation_types.AsyncGenerateContentResponse:
+        """The async version of `ChatSession._generate_content`."""
+        model, contents = self.model, history
+        if self._context_cache is not None and tools is self.model._tools and tool_config is None:
+            model, contents = await self._context_cache.use_async(history, tokens=tokens)
+
+        try:
+            return await model.generate_content_async(
+                contents=contents,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                stream=stream,
+                tools=None if model is not self.model else tools,
+                tool_config=tool_config,
+                request_options=request_options,
+                keep_chunks=keep_chunks,
+            )
+        except _CACHE_EXPIRED_ERRORS:
+            if model is self.model:
+                raise
+            # The cache expired, or was deleted, fall back to sending the whole history.
+            self._context_cache.drop()
+            return await self.model.generate_content_async(
+                contents=history,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                stream=stream,
+                tools=tools,
+                tool_config=tool_config,
+                request_options=request_options,
+                keep_chunks=keep_chunks,
+            )
+
     async def _handle_afc_async(
         self,
         *,
@@ -742,27 +1460,40 @@ class ChatSession:
         stream,
         tools_lib,
         request_options,
+        keep_chunks=True,
     ) -> tuple[list[protos.Content], protos.Content, generation_types.BaseGenerateContentResponse]:
 
+        if stream:
+            *prefix, content = history
+            self._last_received_turns = []
+            # Created without waiting for the first chunk: if the first round only contains
+            # function calls, they're called as the caller iterates, not before this returns.
+            response = generation_types.AsyncGenerateContentResponse(
+                done=False,
+                iterator=self._stream_afc_async(
+                    response=response,
+                    history=history,
+                    generation_config=generation_config,
+                    safety_settings=safety_settings,
+                    tools_lib=tools_lib,
+                    request_options=request_options,
+                    turns=self._last_received_turns,
+                ),
+                result=protos.GenerateContentResponse(prompt_feedback=response.prompt_feedback),
+                chunks=[],
+                keep_chunks=keep_chunks,
+            )
+            return prefix, content, response
+
         while function_calls := self._get_function_calls(response):
             if not all(callable(tools_lib[fc]) for fc in function_calls):
                 break
             history.append(response.candidates[0].content)
+            history.append(await self._call_functions_async(tools_lib, function_calls))
 
-            function_response_parts: list[protos.Part] = []
-            for fc in function_calls:
-                fr = tools_lib(fc)
-                assert fr is not None, (
-                    "Unexpected state: The function reference (fr) should never be None. It should only return None if the declaration "
-                    "is not callable, which is checked earlier in the code."
-                )
-                function_response_parts.append(fr)
-
-            send = protos.Content(role=_USER_ROLE, parts=function_response_parts)
-            history.append(send)
-
-            response = await self.model.generate_content_async(
-                contents=history,
+            response = await self._generate_content_async(
+                history,
+                tokens=response.usage_metadata.total_token_count,
                 generation_config=generation_config,
                 safety_settings=safety_settings,
                 stream=stream,
@@ -775,22 +1506,86 @@ class ChatSession:
         *history, content = history
         return history, content, response
 
+    async def _stream_afc_async(
+        self,
+        *,
+        response,
+        history,
+        generation_config,
+        safety_settings,
+        tools_lib,
+        request_options,
+        turns,
+    ) -> AsyncIterable[protos.GenerateContentResponse]:
+        """The async version of `ChatSession._stream_afc`."""
+        while True:
+            async for chunk in response._aiter_chunks():
+                if chunk := _without_function_calls(chunk):
+                    yield chunk
+
+            if not response.candidates:
+                # An empty round, there's nothing to call. The history reports the broken turn.
+                return
+
+            function_calls = self._get_function_calls(response)
+            if not function_calls or not all(callable(tools_lib[fc]) for fc in function_calls):
+                if function_calls:
+                    yield _function_calls_chunk(function_calls)
+                break
+            history.append(response.candidates[0].content)
+            history.append(await self._call_functions_async(tools_lib, function_calls))
+            turns.extend(history[-2:])
+
+            response = await self._generate_content_async(
+                history,
+                tokens=response.usage_metadata.total_token_count,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                stream=True,
+                tools=tools_lib,
+                request_options=request_options,
+                keep_chunks=False,
+            )
+
+            self._check_response(response=response, stream=True)
+
+        turns.append(response.candidates[0].content)
+
+    async def _call_functions_async(self, tools_lib, function_calls) -> protos.Content:
+        function_response_parts: list[protos.Part] = []
+        async for _, fr in utils.concurrent_aiter(
+            functools.partial(self._function_caller_async, tools_lib),
+            function_calls,
+            max_concurrency=self._function_call_concurrency,
+        ):
+            assert fr is not None, (
+                "Unexpected state: The function reference (fr) should never be None. It should only return None if the declaration "
+                "is not callable, which is checked earlier in the code."
+            )
+            function_response_parts.append(fr)
+
+        return protos.Content(role=_USER_ROLE, parts=function_response_parts)
+
     def __copy__(self):
         return ChatSession(
             model=self.model,
             # Be sure the copy doesn't share the history.
-            history=list(self.history),
+            history=list(self._commit_history()),
         )
 
     def rewind(self) -> tuple[protos.Content, protos.Content]:
         """Removes the last request/response pair from the chat history."""
+        self._history_tokens = None
         if self._last_received is None:
             result = self._history.pop(-2), self._history.pop()
             return result
         else:
-            result = self._last_sent, self._last_received.candidates[0].content
+            candidates = self._last_received.candidates
+            received = candidates[0].content if candidates else protos.Content(role=_MODEL_ROLE)
+            result = self._last_sent, received
             self._last_sent = None
             self._last_received = None
+            self._last_received_turns = None
             return result
 
     @property
@@ -801,18 +1596,42 @@ class ChatSession:
     @property
     def history(self) -> list[protos.Content]:
         """The chat history."""
+        return self._commit_history()
+
+    @history.setter
+    def history(self, history):
+        self._history = content_types.to_contents(history)
+        self._history_tokens = None if self._history else 0
+        self._last_sent = None
+        self._last_received = None
+
+    def _commit_history(self) -> list[protos.Content]:
+        """Adds the last request/response pair to the history, and returns the history."""
         last = self._last_received
         if last is None:
+            # Drop the turns of a streamed response that was replaced or rewound.
+            self._last_received_turns = None
             return self._history
 
-        if last.candidates[0].finish_reason not in (
+        candidates = last.candidates
+        if candidates and candidates[0].finish_reason not in (
             protos.Candidate.FinishReason.FINISH_REASON_UNSPECIFIED,
             protos.Candidate.FinishReason.STOP,
             protos.Candidate.FinishReason.MAX_TOKENS,
         ):
-            error = generation_types.StopCandidateException(last.candidates[0])
+            error = generation_types.StopCandidateException(candidates[0])
             last._error = error
 
+        if self._last_received_turns is None:
+            received = [candidates[0].content] if candidates else []
+        else:
+            received = self._last_received_turns
+        if last._error is None and (not received or received[-1].role == _USER_ROLE):
+            # For example the stream was empty.
+            last._error = ValueError(
+                "Invalid response: The stream ended before the model's turn was received."
+            )
+
         if last._error is not None:
             raise generation_types.BrokenResponseError(
                 "Unable to build a coherent chat history due to a broken streaming response. "
@@ -823,22 +1642,18 @@ class ChatSession:
             ) from last._error
 
         sent = self._last_sent
-        received = last.candidates[0].content
-        if not received.role:
-            received.role = _MODEL_ROLE
-        self._history.extend([sent, received])
+        for content in received:
+            if not content.role:
+                content.role = _MODEL_ROLE
+        self._history.extend([sent, *received])
+        self._history_tokens = last.usage_metadata.total_token_count or None
 
         self._last_sent = None
         self._last_received = None
+        self._last_received_turns = None
 
         return self._history
 
-    @history.setter
-    def history(self, history):
-        self._history = content_types.to_contents(history)
-        self._last_sent = None
-        self._last_received = None
-
     def __repr__(self) -> str:
         _dict_repr = reprlib.Repr()
         _model = str(self.model).replace("\n", "\n" + " " * 4)
@@ -847,7 +1662,7 @@ class ChatSession:
             return f"protos.Content({_dict_repr.repr(type(x).to_dict(x))})"
 
         try:
-            history = list(self.history)
+            history = list(self._commit_history())
         except (generation_types.BrokenResponseError, generation_types.IncompleteIterationError):
             history = list(self._history)
 
@@ -21,6 +21,7 @@ import google.ai.generativelanguage as glm
 
 from google.generativeai import protos
 from google.generativeai import operations
+from google.generativeai import utils
 from google.generativeai.client import get_default_model_client
 from google.generativeai.types import model_types
 from google.generativeai.types import helper_types
@@ -174,9 +175,10 @@ def get_base_model_name(
 
 def list_models(
     *,
-    page_size: int | None = 50,
+    page_size: int | None = 1000,
     client: glm.ModelServiceClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    raw: bool = False,
 ) -> model_types.ModelsIterable:
     """Calls the API to list all available models.
 
@@ -186,10 +188,13 @@ def list_models(
         pprint.pprint(model)
     ```
 
+    The next page is fetched in the background while the current one is consumed.
+
     Args:
-        page_size: How many `types.Models` to fetch per page (api call).
+        page_size: How many `types.Models` to fetch per page (api call), at most 1000.
         client: You may pass a `glm.ModelServiceClient` instead of using the default client.
         request_options: Options for the request.
+        raw: If True, yield the `protos.Model` messages, skipping the conversion to `types.Model`.
 
     Yields:
         `types.Model` objects.
@@ -201,16 +206,21 @@ def list_models(
     if client is None:
         client = get_default_model_client()
 
-    for model in client.list_models(page_size=page_size, **request_options):
-        model = type(model).to_dict(model)
-        yield model_types.Model(**model)
+    pager = client.list_models(page_size=page_size, **request_options)
+    for model in utils.iter_pager(pager, "models"):
+        if raw:
+            yield model
+        else:
+            model = type(model).to_dict(model)
+            yield model_types.Model(**model)
 
 
 def list_tuned_models(
     *,
-    page_size: int | None = 50,
+    page_size: int | None = 1000,
     client: glm.ModelServiceClient | None = None,
     request_options: helper_types.RequestOptionsType | None = None,
+    raw: bool = False,
 ) -> model_types.TunedModelsIterable:
     """Calls the API to list all tuned models.
 
@@ -220,10 +230,14 @@ def list_tuned_models(
         pprint.pprint(model)
     ```
 
+    The next page is fetched in the background while the current one is consumed.
+
     Args:
-        page_size: How many `types.Models` to fetch per page (api call).
+        page_size: How many `types.Models` to fetch per page (api call), at most 1000.
         client: You may pass a `glm.ModelServiceClient` instead of using the default client.
         request_options: Options for the request.
+        raw: If True, yield the `protos.TunedModel` messages, skipping the conversion to
+            `types.TunedModel`.
 
     Yields:
         `types.TunedModel` objects.
@@ -234,12 +248,16 @@ def list_tuned_models(
     if client is None:
         client = get_default_model_client()
 
-    for model in client.list_tuned_models(
+    pager = client.list_tuned_models(
         page_size=page_size,
         **request_options,
-    ):
-        model = type(model).to_dict(model)
-        yield model_types.decode_tuned_model(model)
+    )
+    for model in utils.iter_pager(pager, "tuned_models"):
+        if raw:
+            yield model
+        else:
+            model = type(model).to_dict(model)
+            yield model_types.decode_tuned_model(model)
 
 
 def create_tuned_model(
@@ -23,6 +23,7 @@ from typing_extensions import TypedDict
 import pydantic
 
 from google.generativeai import protos
+from google.generativeai import utils
 
 Type = protos.Type
 
@@ -66,6 +67,7 @@ def to_type(x: TypeOptions) -> Type:
     return _TYPE_TYPE[x]
 
 
+@utils.cache_function_schema
 def _generate_schema(
     f: Callable[..., Any],
     *,
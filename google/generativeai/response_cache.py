@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Local caches for `GenerativeModel.generate_content` responses.
+
+Pass a cache to a `GenerativeModel` to answer repeated requests without calling the API:
+
+>>> cache = genai.response_cache.InMemoryResponseCache(maxsize=10_000)
+>>> model = genai.GenerativeModel(
+...     'models/gemini-1.5-flash', generation_config={'temperature': 0}, response_cache=cache)
+>>> response = model.generate_content('Is this review positive? "Great product!"')
+>>> response = model.generate_content('Is this review positive? "Great product!"')
+>>> model.response_cache_info()
+CacheInfo(hits=1, misses=1)
+
+Responses are keyed on a hash of the whole `protos.GenerateContentRequest`, so any change to the
+contents, the model, or the settings is a miss. Streaming requests are not cached.
+
+A cache is a mapping from `str` keys to `bytes` values, see `ResponseCache`: besides the caches
+defined here, a `dict`, or a `shelve.Shelf` can be used.
+"""
+from __future__ import annotations
+
+import collections.abc
+import datetime
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Protocol, Union
+
+from google.generativeai import protos
+from google.generativeai import utils
+
+TTLTypes = Union[float, datetime.timedelta, None]
+
+
+class ResponseCache(Protocol):
+    """The interface of a response cache, keys and values are produced by `GenerativeModel`."""
+
+    def __getitem__(self, key: str) -> bytes:
+        """Returns the value stored for `key`, raises `KeyError` if there isn't one."""
+        ...
+
+    def __setitem__(self, key: str, value: bytes) -> None: ...
+
+
+class CacheInfo(NamedTuple):
+    """Response cache statistics, see `GenerativeModel.response_cache_info`."""
+
+    hits: int
+    misses: int
+
+
+def request_key(request: protos.GenerateContentRequest) -> str:
+    """Returns the cache key of a request: the sha256 of its deterministic serialization."""
+    data = type(request).pb(request).SerializeToString(deterministic=True)
+    return hashlib.sha256(data).hexdigest()
+
+
+def _to_seconds(ttl: TTLTypes) -> float | None:
+    if isinstance(ttl, datetime.timedelta):
+        ttl = ttl.total_seconds()
+    if ttl is not None and ttl <= 0:
+        raise ValueError(f"Invalid input: `ttl` must be positive. Received: {ttl}.")
+    return ttl
+
+
+class InMemoryResponseCache(collections.abc.MutableMapping):
+    """A thread safe, in-memory response cache.
+
+    Holds at most `maxsize` responses, evicting the least recently used ones. With a `ttl`,
+    responses older than `ttl` (seconds, or a `datetime.timedelta`) are dropped when they're next
+    looked up.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: TTLTypes = None):
+        self._entries = utils.LRUCache(maxsize=maxsize)
+        self._ttl = _to_seconds(ttl)
+
+    def __getitem__(self, key: str) -> bytes:
+        entry = self._entries.get(key)
+        if entry is None:
+            raise KeyError(key)
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            self._entries.pop(key)
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: bytes) -> None:
+        expires_at = None if self._ttl is None else time.monotonic() + self._ttl
+        self._entries.put(key, (expires_at, value))
+
+    def __delitem__(self, key: str) -> None:
+        if self._entries.pop(key) is None:
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._entries.keys())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(collections.abc.MutableMapping):
+    """A response cache stored in a SQLite database, shared between runs and processes.
+
+    With a `ttl`, responses older than `ttl` (seconds, or a `datetime.timedelta`) are deleted when
+    they're next looked up.
+    """
+
+    def __init__(self, path: str | os.PathLike, ttl: TTLTypes = None):
+        self._ttl = _to_seconds(ttl)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(os.fspath(path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    def __getitem__(self, key: str) -> bytes:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(key)
+
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                with self._connection:
+                    self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                raise KeyError(key)
+            return value
+
+    def __setitem__(self, key: str, value: bytes) -> None:
+        expires_at = None if self._ttl is None else time.time() + self._ttl
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock, self._connection:
+            cursor = self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+        if not cursor.rowcount:
+            raise KeyError(key)
+
+    def __iter__(self):
+        with self._lock:
+            keys = self._connection.execute("SELECT key FROM responses").fetchall()
+        return (key for (key,) in keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -15,7 +15,8 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable, Mapping, Sequence
+import asyncio
+from collections.abc import Awaitable, Iterable, Mapping, Sequence
 import io
 import inspect
 import mimetypes
@@ -28,6 +29,7 @@ import pydantic
 
 from google.generativeai.types import file_types
 from google.generativeai import protos
+from google.generativeai import utils
 
 if typing.TYPE_CHECKING:
     import PIL.Image
@@ -70,6 +72,7 @@ __all__ = [
     "ToolsType",
     "FunctionLibrary",
     "FunctionLibraryType",
+    "clear_function_schema_cache",
 ]
 
 Mode = protos.DynamicRetrievalConfig.Mode
@@ -334,11 +337,15 @@ def to_contents(contents: ContentsType) -> list[protos.Content]:
     return contents
 
 
+clear_function_schema_cache = utils.clear_function_schema_cache
+
+
 def _schema_for_class(cls: TypedDict) -> dict[str, Any]:
     schema = _build_schema("dummy", {"dummy": (cls, pydantic.Field())})
     return schema["properties"]["dummy"]
 
 
+@utils.cache_function_schema
 def _schema_for_function(
     f: Callable[..., Any],
     *,
@@ -592,6 +599,10 @@ class FunctionDeclaration:
 
         This method does not yet build a schema for `TypedDict`, that would allow you to specify the dictionary
         contents. But you can build these manually.
+
+        The generated schema is cached per function, without keeping the function alive. If you
+        change a function's signature or docstring after passing it here, call
+        `clear_function_schema_cache(function)` so the next call sees the change.
         """
 
         if descriptions is None:
@@ -623,12 +634,38 @@ class CallableFunctionDeclaration(FunctionDeclaration):
         super().__init__(name=name, description=description, parameters=parameters)
         self.function = function
 
-    def __call__(self, fc: protos.FunctionCall) -> protos.FunctionResponse:
+    @property
+    def function_async(self) -> Callable[..., Awaitable[Any]]:
+        """The `function` as a coroutine function.
+
+        If `function` is a regular function, it is called in the event loop's thread, and blocks
+        the loop while it runs. Use `FunctionLibrary.call_in_thread_async` to run it in a worker
+        thread instead.
+        """
+        if inspect.iscoroutinefunction(self.function):
+            return self.function
+
+        async def run_inline(*args, **kwargs):
+            return self.function(*args, **kwargs)
+
+        return run_inline
+
+    def call(self, fc: protos.FunctionCall) -> protos.FunctionResponse:
         result = self.function(**fc.args)
         if not isinstance(result, dict):
             result = {"result": result}
         return protos.FunctionResponse(name=fc.name, response=result)
 
+    async def call_async(self, fc: protos.FunctionCall) -> protos.FunctionResponse:
+        """The async version of `CallableFunctionDeclaration.call`, supports coroutine functions."""
+        result = await self.function_async(**fc.args)
+        if not isinstance(result, dict):
+            result = {"result": result}
+        return protos.FunctionResponse(name=fc.name, response=result)
+
+    def __call__(self, fc: protos.FunctionCall) -> protos.FunctionResponse:
+        return self.call(fc)
+
 
 FunctionDeclarationType = Union[
     FunctionDeclaration,
@@ -859,14 +896,42 @@ class FunctionLibrary:
 
         return self._index[name]
 
-    def __call__(self, fc: protos.FunctionCall) -> protos.Part | None:
+    def call(self, fc: protos.FunctionCall) -> protos.Part | None:
+        declaration = self[fc]
+        if not callable(declaration):
+            return None
+
+        response = declaration.call(fc)
+        return protos.Part(function_response=response)
+
+    async def call_async(self, fc: protos.FunctionCall) -> protos.Part | None:
+        """The async version of `FunctionLibrary.call`, supports coroutine functions.
+
+        Regular functions are called in the event loop's thread, see `call_in_thread_async`.
+        """
         declaration = self[fc]
         if not callable(declaration):
             return None
 
-        response = declaration(fc)
+        response = await declaration.call_async(fc)
         return protos.Part(function_response=response)
 
+    async def call_in_thread_async(self, fc: protos.FunctionCall) -> protos.Part | None:
+        """Like `call_async`, but runs regular functions in a worker thread.
+
+        They don't block the event loop while they run, so several calls can overlap. Coroutine
+        functions are awaited as in `call_async`.
+        """
+        declaration = self[fc]
+        if isinstance(declaration, CallableFunctionDeclaration) and not inspect.iscoroutinefunction(
+            declaration.function
+        ):
+            return await asyncio.to_thread(self.call, fc)
+        return await self.call_async(fc)
+
+    def __call__(self, fc: protos.FunctionCall) -> protos.Part | None:
+        return self.call(fc)
+
     def to_proto(self):
         return [tool.to_proto() for tool in self._tools]
 
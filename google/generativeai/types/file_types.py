@@ -14,7 +14,9 @@
 # limitations under the License.
 from __future__ import annotations
 
+import dataclasses
 import datetime
+import pathlib
 from typing import Any, Union
 from typing_extensions import TypedDict
 
@@ -109,6 +111,35 @@ class File:
         client.delete_file(name=self.name)
 
 
+@dataclasses.dataclass
+class UploadProgress:
+    """The progress of an `upload_files` call, reported after each file.
+
+    Attributes:
+        path: The file that was just handled.
+        skipped: True if the file was already uploaded, so it wasn't sent again.
+        error: The exception raised handling the file, if any.
+        size: The size of the file, 0 if it couldn't be read.
+        files_done: The number of files handled so far, including failures.
+        files_total: The number of files to handle.
+        bytes_done: The size of the files handled so far.
+        elapsed: Seconds since the call started.
+    """
+
+    path: pathlib.Path
+    skipped: bool
+    error: Exception | None
+    size: int
+    files_done: int
+    files_total: int
+    bytes_done: int
+    elapsed: float
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_done / self.elapsed if self.elapsed else 0.0
+
+
 class FileDataDict(TypedDict):
     mime_type: str
     file_uri: str
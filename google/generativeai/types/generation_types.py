@@ -372,10 +372,158 @@ def _join_chunks(chunks: Iterable[protos.GenerateContentResponse]):
     )
 
 
+class _PartAccumulator:
+    """Collects the fragments of one merged `protos.Part` of a streamed candidate."""
+
+    def __init__(self, part: protos.Part):
+        self.part = part
+        if "text" in part:
+            self.kind = "text"
+            self.fragments = [part.text]
+        elif "executable_code" in part:
+            self.kind = "executable_code"
+            self.fragments = [part.executable_code.code]
+        elif "code_execution_result" in part:
+            self.kind = "code_execution_result"
+            self.fragments = [part.code_execution_result.output]
+        else:
+            self.kind = None
+            self.fragments = []
+
+    def merge(self, part: protos.Part) -> bool:
+        """Appends `part` to this one if they can be merged, returns False otherwise."""
+        if self.kind is None or self.kind not in part:
+            return False
+
+        if self.kind == "text":
+            self.fragments.append(part.text)
+        elif self.kind == "executable_code":
+            self.fragments.append(part.executable_code.code)
+        else:
+            self.fragments.append(part.code_execution_result.output)
+            self.outcome = part.code_execution_result.outcome
+        return True
+
+    def to_proto(self) -> protos.Part:
+        if len(self.fragments) <= 1:
+            return self.part
+
+        joined = "".join(self.fragments)
+        if self.kind == "text":
+            return protos.Part(text=joined)
+        elif self.kind == "executable_code":
+            return protos.Part(
+                executable_code=protos.ExecutableCode(
+                    language=self.part.executable_code.language, code=joined
+                )
+            )
+        else:
+            return protos.Part(
+                code_execution_result=protos.CodeExecutionResult(
+                    outcome=self.outcome, output=joined
+                )
+            )
+
+
+class _CandidateAccumulator:
+    """Collects the chunks of a single streamed candidate, see `_StreamAccumulator`."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.role = ""
+        self.parts: list[_PartAccumulator] = []
+        self.safety_ratings: dict[int, tuple[int, bool]] = {}
+        self.finish_reason = None
+        self.citation_metadata = None
+        self.token_count = None
+
+    def add(self, candidate: protos.Candidate):
+        content = candidate.content
+        if not self.role:
+            self.role = content.role
+
+        for part in content.parts:
+            if not (self.parts and self.parts[-1].merge(part)):
+                self.parts.append(_PartAccumulator(part))
+
+        for rating in candidate.safety_ratings:
+            _, blocked = self.safety_ratings.get(rating.category, (None, False))
+            self.safety_ratings[rating.category] = (rating.probability, blocked or rating.blocked)
+
+        self.finish_reason = candidate.finish_reason
+        self.citation_metadata = candidate.citation_metadata
+        self.token_count = candidate.token_count
+
+    def to_proto(self) -> protos.Candidate:
+        return protos.Candidate(
+            index=self.index,
+            content=protos.Content(role=self.role, parts=[p.to_proto() for p in self.parts]),
+            finish_reason=self.finish_reason,
+            safety_ratings=[
+                protos.SafetyRating(category=category, probability=probability, blocked=blocked)
+                for category, (probability, blocked) in self.safety_ratings.items()
+            ],
+            citation_metadata=self.citation_metadata,
+            token_count=self.token_count,
+        )
+
+
+class _StreamAccumulator:
+    """Incrementally merges the chunks of a streamed `protos.GenerateContentResponse`.
+
+    Re-running `_join_chunks([result, chunk])` for each chunk rebuilds the whole merged response
+    every time, which is quadratic in the length of the stream. This keeps the fragments in lists
+    instead, so `add_chunk` is amortized O(1), and only builds the merged response when `result` is
+    read. The merged response is the same as the one `_join_chunks` produces.
+    """
+
+    def __init__(self, first: protos.GenerateContentResponse):
+        self._first = first
+        self._last = first
+        self._result: protos.GenerateContentResponse | None = first
+        self._candidates: dict[int, _CandidateAccumulator] = {}
+        self._add_candidates(first)
+
+    def _add_candidates(self, chunk: protos.GenerateContentResponse):
+        for candidate in chunk.candidates:
+            accumulator = self._candidates.get(candidate.index)
+            if accumulator is None:
+                accumulator = _CandidateAccumulator(candidate.index)
+                self._candidates[candidate.index] = accumulator
+            accumulator.add(candidate)
+
+    def add_chunk(self, chunk: protos.GenerateContentResponse):
+        self._add_candidates(chunk)
+        self._last = chunk
+        self._result = None
+
+    @property
+    def prompt_feedback(self) -> protos.GenerateContentResponse.PromptFeedback:
+        # Always the first prompt feedback, like `_join_prompt_feedbacks`.
+        return self._first.prompt_feedback
+
+    @property
+    def result(self) -> protos.GenerateContentResponse:
+        if self._result is None:
+            last = self._last
+            self._result = protos.GenerateContentResponse(
+                candidates=[c.to_proto() for _, c in sorted(self._candidates.items())],
+                prompt_feedback=self._first.prompt_feedback,
+                usage_metadata=last.usage_metadata if "usage_metadata" in last else None,
+                model_version=last.model_version if "model_version" in last else None,
+            )
+        return self._result
+
+
 _INCOMPLETE_ITERATION_MESSAGE = """\
 Please let the response complete iteration before accessing the final accumulated
 attributes (or call `response.resolve()`)"""
 
+_DROPPED_CHUNKS_MESSAGE = """\
+Invalid operation: This response was streamed with `keep_chunks=False`, so each chunk is dropped
+once it has been yielded, and the chunks can only be iterated over once. The accumulated
+attributes (`.text`, `.candidates`, ...) are still available."""
+
 
 class BaseGenerateContentResponse:
     def __init__(
@@ -388,19 +536,28 @@ class BaseGenerateContentResponse:
         ),
         result: protos.GenerateContentResponse,
         chunks: Iterable[protos.GenerateContentResponse] | None = None,
+        keep_chunks: bool = True,
     ):
         self._done = done
         self._iterator = iterator
-        self._result = result
+        self._accumulator = _StreamAccumulator(result)
         if chunks is None:
             self._chunks = [result]
         else:
             self._chunks = list(chunks)
+        # With `keep_chunks=False` the chunks are dropped once yielded, `_chunks` then only holds
+        # the ones not yielded yet, and `_num_dropped_chunks` is the index of `_chunks[0]`.
+        self._keep_chunks = keep_chunks
+        self._num_dropped_chunks = 0
         if result.prompt_feedback.block_reason:
             self._error = BlockedPromptException(result)
         else:
             self._error = None
 
+    @property
+    def _result(self) -> protos.GenerateContentResponse:
+        return self._accumulator.result
+
     def to_dict(self):
         """Returns the result as a JSON-compatible dict.
 
@@ -539,7 +696,7 @@ class BaseGenerateContentResponse:
 
     @property
     def prompt_feedback(self):
-        return self._result.prompt_feedback
+        return self._accumulator.prompt_feedback
 
     @property
     def usage_metadata(self):
@@ -585,6 +742,23 @@ class BaseGenerateContentResponse:
     __repr__ = __str__
 
 
+def _chunk_text(chunk: protos.GenerateContentResponse) -> str:
+    """Returns the text parts of a streamed chunk, joined.
+
+    This reads the underlying protobuf message directly, skipping the `proto-plus` wrappers.
+    """
+    candidates = type(chunk).pb(chunk).candidates
+    if len(candidates) > 1:
+        raise ValueError(
+            "Invalid operation: Iterating over the text of a response requires a single candidate, "
+            f"but this chunk contains {len(candidates)} candidates. Please iterate over the "
+            "chunks and use `chunk.candidates[index].content.parts` instead."
+        )
+    if not candidates:
+        return ""
+    return "".join(part.text for part in candidates[0].content.parts)
+
+
 @contextlib.contextmanager
 def rewrite_stream_error():
     try:
@@ -615,6 +789,13 @@ GENERATE_CONTENT_RESPONSE_DOC = """Instances of this class manage the response o
       print(chunk.text)
     ```
 
+    To only receive the text of each chunk, use `GenerateContentResponse.iter_text`:
+
+    ```
+    for text in response.iter_text():
+      print(text, end='')
+    ```
+
     `GenerateContentResponse.prompt_feedback` is available immediately but
     `GenerateContentResponse.candidates`, and all the attributes derived from them (`.text`, `.parts`),
     are only available after the iteration is complete.
@@ -628,15 +809,24 @@ ASYNC_GENERATE_CONTENT_RESPONSE_DOC = (
 @string_utils.set_doc(GENERATE_CONTENT_RESPONSE_DOC)
 class GenerateContentResponse(BaseGenerateContentResponse):
     @classmethod
-    def from_iterator(cls, iterator: Iterable[protos.GenerateContentResponse]):
+    def from_iterator(
+        cls, iterator: Iterable[protos.GenerateContentResponse], keep_chunks: bool = True
+    ):
         iterator = iter(iterator)
         with rewrite_stream_error():
-            response = next(iterator)
+            try:
+                response = next(iterator)
+            except StopIteration:
+                # An empty stream.
+                return cls(
+                    done=True, iterator=None, result=protos.GenerateContentResponse(), chunks=[]
+                )
 
         return cls(
             done=False,
             iterator=iterator,
             result=response,
+            keep_chunks=keep_chunks,
         )
 
     @classmethod
@@ -647,22 +837,33 @@ class GenerateContentResponse(BaseGenerateContentResponse):
             result=response,
         )
 
-    def __iter__(self):
+    def _iter_chunks(self) -> Iterable[protos.GenerateContentResponse]:
         # This is not thread safe.
+        if self._done and self._num_dropped_chunks:
+            raise ValueError(_DROPPED_CHUNKS_MESSAGE)
+
         if self._done:
             for chunk in self._chunks:
-                yield GenerateContentResponse.from_response(chunk)
+                yield chunk
             return
 
-        # Always have the next chunk available.
+        # Always have the next chunk available. The chunks are only empty for a response created
+        # before its first chunk was received.
         if len(self._chunks) == 0:
-            self._chunks.append(next(self._iterator))
-
-        for n in itertools.count():
+            try:
+                item = next(self._iterator)
+            except StopIteration:
+                self._done = True
+                return
+            self._chunks.append(item)
+            self._accumulator.add_chunk(item)
+
+        # With `keep_chunks=False` a new iterator continues from the first chunk not yielded yet.
+        for n in itertools.count(self._num_dropped_chunks):
             if self._error:
                 raise self._error
 
-            if n >= len(self._chunks) - 1:
+            if n >= self._num_dropped_chunks + len(self._chunks) - 1:
                 # Look ahead for a new item, so that you know the stream is done
                 # when you yield the last item.
                 if self._done:
@@ -677,13 +878,41 @@ class GenerateContentResponse(BaseGenerateContentResponse):
                     self._done = True
                 else:
                     self._chunks.append(item)
-                    self._result = _join_chunks([self._result, item])
+                    self._accumulator.add_chunk(item)
 
-            item = self._chunks[n]
+            if n < self._num_dropped_chunks:
+                raise ValueError(_DROPPED_CHUNKS_MESSAGE)
+            item = self._chunks[n - self._num_dropped_chunks]
+            if not self._keep_chunks and n == self._num_dropped_chunks:
+                del self._chunks[0]
+                self._num_dropped_chunks += 1
 
-            item = GenerateContentResponse.from_response(item)
             yield item
 
+    def __iter__(self):
+        for chunk in self._iter_chunks():
+            yield GenerateContentResponse.from_response(chunk)
+
+    def iter_text(self) -> Iterable[str]:
+        """Iterates over the text of the response chunks, as they are generated.
+
+        This is a lighter alternative to iterating over the response and reading `chunk.text`:
+        the text is read straight from the streamed protos, without wrapping each chunk in a
+        `GenerateContentResponse`. The accumulated result is still updated.
+
+        >>> response = model.generate_content('Tell me a story', stream=True)
+        >>> for text in response.iter_text():
+        ...   print(text, end='')
+
+        Only `text` parts are included, chunks without any text are skipped.
+
+        Raises:
+            ValueError: If a chunk contains more than one candidate.
+        """
+        for chunk in self._iter_chunks():
+            if text := _chunk_text(chunk):
+                yield text
+
     def resolve(self):
         if self._done:
             return
@@ -695,15 +924,24 @@ class GenerateContentResponse(BaseGenerateContentResponse):
 @string_utils.set_doc(ASYNC_GENERATE_CONTENT_RESPONSE_DOC)
 class AsyncGenerateContentResponse(BaseGenerateContentResponse):
     @classmethod
-    async def from_aiterator(cls, iterator: AsyncIterable[protos.GenerateContentResponse]):
+    async def from_aiterator(
+        cls, iterator: AsyncIterable[protos.GenerateContentResponse], keep_chunks: bool = True
+    ):
         iterator = aiter(iterator)  # type: ignore
         with rewrite_stream_error():
-            response = await anext(iterator)  # type: ignore
+            try:
+                response = await anext(iterator)  # type: ignore
+            except StopAsyncIteration:
+                # An empty stream.
+                return cls(
+                    done=True, iterator=None, result=protos.GenerateContentResponse(), chunks=[]
+                )
 
         return cls(
             done=False,
             iterator=iterator,
             result=response,
+            keep_chunks=keep_chunks,
         )
 
     @classmethod
@@ -714,22 +952,33 @@ class AsyncGenerateContentResponse(BaseGenerateContentResponse):
             result=response,
         )
 
-    async def __aiter__(self):
+    async def _aiter_chunks(self) -> AsyncIterable[protos.GenerateContentResponse]:
         # This is not thread safe.
+        if self._done and self._num_dropped_chunks:
+            raise ValueError(_DROPPED_CHUNKS_MESSAGE)
+
         if self._done:
             for chunk in self._chunks:
-                yield GenerateContentResponse.from_response(chunk)
+                yield chunk
             return
 
-        # Always have the next chunk available.
+        # Always have the next chunk available. The chunks are only empty for a response created
+        # before its first chunk was received.
         if len(self._chunks) == 0:
-            self._chunks.append(await anext(self._iterator))  # type: ignore
-
-        for n in itertools.count():
+            try:
+                item = await anext(self._iterator)  # type: ignore
+            except StopAsyncIteration:
+                self._done = True
+                return
+            self._chunks.append(item)
+            self._accumulator.add_chunk(item)
+
+        # With `keep_chunks=False` a new iterator continues from the first chunk not yielded yet.
+        for n in itertools.count(self._num_dropped_chunks):
             if self._error:
                 raise self._error
 
-            if n >= len(self._chunks) - 1:
+            if n >= self._num_dropped_chunks + len(self._chunks) - 1:
                 # Look ahead for a new item, so that you know the stream is done
                 # when you yield the last item.
                 if self._done:
@@ -744,13 +993,32 @@ class AsyncGenerateContentResponse(BaseGenerateContentResponse):
                     self._done = True
                 else:
                     self._chunks.append(item)
-                    self._result = _join_chunks([self._result, item])
+                    self._accumulator.add_chunk(item)
 
-            item = self._chunks[n]
+            if n < self._num_dropped_chunks:
+                raise ValueError(_DROPPED_CHUNKS_MESSAGE)
+            item = self._chunks[n - self._num_dropped_chunks]
+            if not self._keep_chunks and n == self._num_dropped_chunks:
+                del self._chunks[0]
+                self._num_dropped_chunks += 1
 
-            item = GenerateContentResponse.from_response(item)
             yield item
 
+    async def __aiter__(self):
+        async for chunk in self._aiter_chunks():
+            yield GenerateContentResponse.from_response(chunk)
+
+    async def aiter_text(self) -> AsyncIterable[str]:
+        """The async version of `GenerateContentResponse.iter_text`.
+
+        >>> response = await model.generate_content_async('Tell me a story', stream=True)
+        >>> async for text in response.aiter_text():
+        ...   print(text, end='')
+        """
+        async for chunk in self._aiter_chunks():
+            if text := _chunk_text(chunk):
+                yield text
+
     async def resolve(self):
         if self._done:
             return
@@ -27,6 +27,7 @@ from google.generativeai.client import get_default_permission_client
 from google.generativeai.client import get_default_permission_async_client
 from google.generativeai.utils import flatten_update_paths
 from google.generativeai import string_utils
+from google.generativeai import utils
 
 __all__ = ["Permission", "Permissions"]
 
@@ -369,15 +370,17 @@ class Permissions:
 
     def list(
         self,
-        page_size: Optional[int] = None,
+        page_size: Optional[int] = 1000,
         client: glm.PermissionServiceClient | None = None,
+        raw: bool = False,
     ) -> Iterable[Permission]:
         """
         List `Permission`s enforced on a resource (self).
 
         Args:
             parent: The resource name of the parent resource in which the permission will be listed.
-            page_size: The maximum number of permissions to return (per page). The service may return fewer permissions.
+            page_size: The maximum number of permissions to return (per page), at most 1000. The service may return fewer permissions.
+            raw: If True, yield the `protos.Permission` messages, skipping the conversion to `Permission`.
 
         Returns:
             Paginated list of `Permission` objects.
@@ -388,17 +391,22 @@ class Permissions:
         request = protos.ListPermissionsRequest(
             parent=self.parent, page_size=page_size  # pytype: disable=attribute-error
         )
-        for permission in client.list_permissions(request):
-            permission = type(permission).to_dict(permission)
-            yield Permission(**permission)
+        pager = client.list_permissions(request)
+        for permission in utils.iter_pager(pager, "permissions"):
+            if raw:
+                yield permission
+            else:
+                permission = type(permission).to_dict(permission)
+                yield Permission(**permission)
 
     def __iter__(self):
         return self.list()
 
     async def list_async(
         self,
-        page_size: Optional[int] = None,
+        page_size: Optional[int] = 1000,
         client: glm.PermissionServiceAsyncClient | None = None,
+        raw: bool = False,
     ) -> AsyncIterable[Permission]:
         """
         This is the async version of `PermissionAdapter.list_permissions`.
@@ -409,9 +417,13 @@ class Permissions:
         request = protos.ListPermissionsRequest(
             parent=self.parent, page_size=page_size  # pytype: disable=attribute-error
         )
-        async for permission in await client.list_permissions(request):
-            permission = type(permission).to_dict(permission)
-            yield Permission(**permission)
+        pager = await client.list_permissions(request)
+        async for permission in utils.aiter_pager(pager, "permissions"):
+            if raw:
+                yield permission
+            else:
+                permission = type(permission).to_dict(permission)
+                yield Permission(**permission)
 
     async def __aiter__(self):
         return self.list_async()
@@ -14,25 +14,33 @@
 # limitations under the License.
 from __future__ import annotations
 
+import copy
 import datetime
 import re
 import abc
 import dataclasses
-from typing import Any, AsyncIterable, Optional, Union, Iterable, Mapping
+import itertools
+import time
+from typing import Any, AsyncIterable, Callable, Optional, Union, Iterable, Mapping
 from typing_extensions import deprecated  # type: ignore
 
 import google.ai.generativelanguage as glm
+import google.api_core.exceptions
+import google.api_core.retry
+import google.api_core.retry_async
 from google.generativeai import protos
 
 from google.protobuf import field_mask_pb2
 from google.generativeai.client import get_default_retriever_client
 from google.generativeai.client import get_default_retriever_async_client
 from google.generativeai import string_utils
+from google.generativeai import utils
 from google.generativeai.types import helper_types
 
 from google.generativeai.types import permission_types
 from google.generativeai.types.model_types import idecode_time
 from google.generativeai.utils import flatten_update_paths
+from google.generativeai.utils import LRUCache
 
 _VALID_NAME = r"[a-z0-9]([a-z0-9-]{0,38}[a-z0-9])$"
 NAME_ERROR_MSG = """The `name` must consist of alphanumeric characters (or -) and be 40 or fewer characters; or be empty. The name you entered:
@@ -45,6 +53,63 @@ def valid_name(name):
     return re.match(_VALID_NAME, name) and len(name) < 40
 
 
+QUERY_CACHE_SIZE = 1024
+
+# Maps `(resource name, serialized query request)` to `(time stored, relevant chunks)`.
+_query_cache = LRUCache(maxsize=QUERY_CACHE_SIZE)
+
+
+def _query_cache_key(request: protos.QueryCorpusRequest | protos.QueryDocumentRequest):
+    return (request.name, type(request).pb(request).SerializeToString(deterministic=True))
+
+
+def _cached_query_result(request, cache_ttl: float | datetime.timedelta | None):
+    if cache_ttl is None:
+        return None
+    if isinstance(cache_ttl, datetime.timedelta):
+        cache_ttl = cache_ttl.total_seconds()
+    if cache_ttl <= 0:
+        raise ValueError(f"Invalid input: `cache_ttl` must be positive. Received: {cache_ttl}.")
+
+    entry = _query_cache.get(_query_cache_key(request))
+    if entry is None:
+        return None
+    stored_at, relevant_chunks = entry
+    if time.monotonic() - stored_at > cache_ttl:
+        return None
+    # The chunks are mutable, don't hand out the cached objects.
+    return copy.deepcopy(relevant_chunks)
+
+
+def _store_query_result(request, cache_ttl, relevant_chunks: list[RelevantChunk]):
+    if cache_ttl is None:
+        return
+    _query_cache.put(_query_cache_key(request), (time.monotonic(), copy.deepcopy(relevant_chunks)))
+
+
+def _invalidate_queries(name: str):
+    """Drops the cached queries that could see a change to the resource `name`.
+
+    That's the queries of the resource itself, of its parents (a `Corpus` query searches all its
+    `Document`s) and of its children.
+    """
+    for key in _query_cache.keys():
+        if not isinstance(key, tuple):
+            continue
+        cached_name = key[0]
+        if (
+            cached_name == name
+            or name.startswith(cached_name + "/")
+            or cached_name.startswith(name + "/")
+        ):
+            _query_cache.pop(key)
+
+
+def clear_query_cache():
+    """Drops all the results cached by `Corpus.query` and `Document.query`."""
+    _query_cache.clear()
+
+
 Operator = protos.Condition.Operator
 State = protos.Chunk.State
 
@@ -240,6 +305,46 @@ def make_custom_metadata(cm: CustomMetadataOptions) -> CustomMetadata:
         )
 
 
+# The maximum number of chunks in a `BatchCreateChunksRequest`.
+CHUNK_MAX_BATCH_SIZE = 100
+
+
+def _is_retryable_bulk_create_error(exception: Exception) -> bool:
+    # A retried batch that fails with `AlreadyExists` is reconciled with the existing chunks
+    # instead, retrying it again would fail the same way.
+    if isinstance(exception, google.api_core.exceptions.AlreadyExists):
+        return False
+    return google.api_core.retry.if_transient_error(exception)
+
+
+BULK_CREATE_RETRY = google.api_core.retry.Retry(
+    predicate=_is_retryable_bulk_create_error, timeout=600.0
+)
+BULK_CREATE_ASYNC_RETRY = google.api_core.retry_async.AsyncRetry(
+    predicate=_is_retryable_bulk_create_error, timeout=600.0
+)
+
+
+@string_utils.prettyprint
+@dataclasses.dataclass
+class BulkCreateProgress:
+    """The progress of a `Document.bulk_create_chunks` call.
+
+    Attributes:
+        chunks_created: The number of chunks created so far.
+        batches_created: The number of batches created so far.
+        elapsed: Seconds since the call started.
+    """
+
+    chunks_created: int
+    batches_created: int
+    elapsed: float
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks_created / self.elapsed if self.elapsed else 0.0
+
+
 @string_utils.prettyprint
 @dataclasses.dataclass
 class ChunkData:
@@ -482,6 +587,7 @@ class Corpus:
         results_count: int | None = None,
         client: glm.RetrieverServiceClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        cache_ttl: float | datetime.timedelta | None = None,
     ) -> Iterable[RelevantChunk]:
         """
         Query a corpus for information.
@@ -491,6 +597,9 @@ class Corpus:
             metadata_filters: Filter for `Chunk` metadata.
             results_count: The maximum number of `Chunk`s to return; must be less than 100.
             request_options: Options for the request.
+            cache_ttl: If set, reuse the result of an identical query made in the last `cache_ttl`
+                seconds (or `datetime.timedelta`) by this process. Creating, updating or deleting
+                `Chunk`s through this library drops the affected results.
 
         Returns:
             List of relevant chunks.
@@ -518,6 +627,10 @@ class Corpus:
             metadata_filters=m_f_,
             results_count=results_count,
         )
+        cached = _cached_query_result(request, cache_ttl)
+        if cached is not None:
+            return cached
+
         response = client.query_corpus(request, **request_options)
         response = type(response).to_dict(response)
 
@@ -529,6 +642,7 @@ class Corpus:
             )
             relevant_chunks.append(rc)
 
+        _store_query_result(request, cache_ttl, relevant_chunks)
         return relevant_chunks
 
     async def query_async(
@@ -538,6 +652,7 @@ class Corpus:
         results_count: int | None = None,
         client: glm.RetrieverServiceAsyncClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        cache_ttl: float | datetime.timedelta | None = None,
     ) -> Iterable[RelevantChunk]:
         """This is the async version of `Corpus.query`."""
         if request_options is None:
@@ -563,6 +678,10 @@ class Corpus:
             metadata_filters=m_f_,
             results_count=results_count,
         )
+        cached = _cached_query_result(request, cache_ttl)
+        if cached is not None:
+            return cached
+
         response = await client.query_corpus(request, **request_options)
         response = type(response).to_dict(response)
 
@@ -574,6 +693,7 @@ class Corpus:
             )
             relevant_chunks.append(rc)
 
+        _store_query_result(request, cache_ttl, relevant_chunks)
         return relevant_chunks
 
     def delete_document(
@@ -602,6 +722,7 @@ class Corpus:
 
         request = protos.DeleteDocumentRequest(name=name, force=bool(force))
         client.delete_document(request, **request_options)
+        _invalidate_queries(name)
 
     async def delete_document_async(
         self,
@@ -622,20 +743,23 @@ class Corpus:
 
         request = protos.DeleteDocumentRequest(name=name, force=bool(force))
         await client.delete_document(request, **request_options)
+        _invalidate_queries(name)
 
     def list_documents(
         self,
-        page_size: int | None = None,
+        page_size: int | None = 20,
         client: glm.RetrieverServiceClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        raw: bool = False,
     ) -> Iterable[Document]:
         """
         List documents in corpus.
 
         Args:
             name: The name of the `Corpus` containing `Document`s.
-            page_size: The maximum number of `Document`s to return (per page). The service may return fewer `Document`s.
+            page_size: The maximum number of `Document`s to return (per page), at most 20. The service may return fewer `Document`s.
             request_options: Options for the request.
+            raw: If True, yield the `protos.Document` messages, skipping the conversion to `Document`.
 
         Return:
             Paginated list of `Document`s.
@@ -650,14 +774,16 @@ class Corpus:
             parent=self.name,
             page_size=page_size,
         )
-        for doc in client.list_documents(request, **request_options):
-            yield decode_document(doc)
+        pager = client.list_documents(request, **request_options)
+        for doc in utils.iter_pager(pager, "documents"):
+            yield doc if raw else decode_document(doc)
 
     async def list_documents_async(
         self,
-        page_size: int | None = None,
+        page_size: int | None = 20,
         client: glm.RetrieverServiceAsyncClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        raw: bool = False,
     ) -> AsyncIterable[Document]:
         """This is the async version of `Corpus.list_documents`."""
         if request_options is None:
@@ -670,8 +796,9 @@ class Corpus:
             parent=self.name,
             page_size=page_size,
         )
-        async for doc in await client.list_documents(request, **request_options):
-            yield decode_document(doc)
+        pager = await client.list_documents(request, **request_options)
+        async for doc in utils.aiter_pager(pager, "documents"):
+            yield doc if raw else decode_document(doc)
 
     # PERMISSIONS STUBS: ..deprecated:: >0.5.2
     @deprecated(
@@ -810,6 +937,7 @@ class Document(abc.ABC):
 
         request = protos.CreateChunkRequest(parent=self.name, chunk=chunk)
         response = client.create_chunk(request, **request_options)
+        _invalidate_queries(self.name)
         return decode_chunk(response)
 
     async def create_chunk_async(
@@ -854,6 +982,7 @@ class Document(abc.ABC):
 
         request = protos.CreateChunkRequest(parent=self.name, chunk=chunk)
         response = await client.create_chunk(request, **request_options)
+        _invalidate_queries(self.name)
         return decode_chunk(response)
 
     def _make_chunk(self, chunk: ChunkOptions) -> protos.Chunk:
@@ -895,6 +1024,12 @@ class Document(abc.ABC):
         if isinstance(chunks, protos.BatchCreateChunksRequest):
             return chunks
 
+        requests = list(self._make_create_chunk_requests(chunks))
+        return protos.BatchCreateChunksRequest(parent=self.name, requests=requests)
+
+    def _make_create_chunk_requests(
+        self, chunks: Mapping[str, Any] | Iterable[ChunkOptions]
+    ) -> Iterable[protos.CreateChunkRequest]:
         if isinstance(chunks, Mapping):
             chunks = chunks.items()
             chunks = (
@@ -903,7 +1038,6 @@ class Document(abc.ABC):
                 for key, value in chunks
             )
 
-        requests = []
         for i, chunk in enumerate(chunks):
             chunk = self._make_chunk(chunk)
             if chunk.name == "":
@@ -911,9 +1045,7 @@ class Document(abc.ABC):
 
             chunk.name = f"{self.name}/chunks/{chunk.name}"
 
-            requests.append(protos.CreateChunkRequest(parent=self.name, chunk=chunk))
-
-        return protos.BatchCreateChunksRequest(parent=self.name, requests=requests)
+            yield protos.CreateChunkRequest(parent=self.name, chunk=chunk)
 
     def batch_create_chunks(
         self,
@@ -939,6 +1071,7 @@ class Document(abc.ABC):
 
         request = self._make_batch_create_chunk_request(chunks)
         response = client.batch_create_chunks(request, **request_options)
+        _invalidate_queries(self.name)
         return [decode_chunk(chunk) for chunk in response.chunks]
 
     async def batch_create_chunks_async(
@@ -956,8 +1089,210 @@ class Document(abc.ABC):
 
         request = self._make_batch_create_chunk_request(chunks)
         response = await client.batch_create_chunks(request, **request_options)
+        _invalidate_queries(self.name)
         return [decode_chunk(chunk) for chunk in response.chunks]
 
+    def bulk_create_chunks(
+        self,
+        chunks: Mapping[str, Any] | Iterable[ChunkOptions],
+        batch_size: int = CHUNK_MAX_BATCH_SIZE,
+        max_concurrency: int = 4,
+        retry: google.api_core.retry.Retry | None = BULK_CREATE_RETRY,
+        progress: Callable[[BulkCreateProgress], None] | None = None,
+        client: glm.RetrieverServiceClient | None = None,
+        request_options: helper_types.RequestOptionsType | None = None,
+    ) -> list[Chunk]:
+        """
+        Create any number of chunks within the given document.
+
+        `chunks` are consumed lazily, so they can be a generator, and sent in
+        `BatchCreateChunksRequest`s of `batch_size` chunks, with up to `max_concurrency` batches
+        in flight at once.
+
+        >>> doc.bulk_create_chunks(
+        ...     read_paragraphs('book.txt'),
+        ...     progress=lambda p: print(f'{p.chunks_created} chunks, {p.chunks_per_second:.0f}/s'))
+
+        Args:
+            chunks: `Chunks` to create, accepts the same formats as `batch_create_chunks`. Chunks
+                without a name are named after their position in `chunks`.
+            batch_size: The number of chunks per request, at most `CHUNK_MAX_BATCH_SIZE`.
+            max_concurrency: The maximum number of requests in flight at once.
+            retry: How to retry the batches that fail with a transient error. By default they
+                are retried with an exponential backoff, for up to 10 minutes. Pass `None` to
+                not retry. A retried batch can fail with `AlreadyExists` when an earlier attempt
+                created it, e.g. after a client-side timeout: then its chunks are fetched, and it
+                counts as created if they all exist with the requested data.
+            progress: Called with a `BulkCreateProgress` after each batch is created.
+            request_options: Options for the request.
+
+        Return:
+            The created chunks, in the order of `chunks`.
+        """
+        if request_options is None:
+            request_options = {}
+
+        if client is None:
+            client = get_default_retriever_client()
+
+        if batch_size < 1 or batch_size > CHUNK_MAX_BATCH_SIZE:
+            raise ValueError(
+                f"Invalid input: `batch_size` must be between 1 and {CHUNK_MAX_BATCH_SIZE}. "
+                f"Received: {batch_size}."
+            )
+
+        def create_batch(batch):
+            request = protos.BatchCreateChunksRequest(parent=self.name, requests=batch)
+            attempts = 0
+
+            def create():
+                nonlocal attempts
+                attempts += 1
+                return client.batch_create_chunks(request, **request_options)
+
+            attempt = create if retry is None else retry(create)
+            try:
+                response = attempt()
+            except google.api_core.exceptions.AlreadyExists as e:
+                if attempts == 1:
+                    raise
+                chunks = self._reconcile_chunks(batch, e, client, request_options)
+            else:
+                chunks = [decode_chunk(chunk) for chunk in response.chunks]
+            _invalidate_queries(self.name)
+            return chunks
+
+        requests = self._make_create_chunk_requests(chunks)
+        batches = iter(lambda: list(itertools.islice(requests, batch_size)), [])
+
+        start = time.monotonic()
+        created = {}
+        status = BulkCreateProgress(chunks_created=0, batches_created=0, elapsed=0.0)
+        for index, batch_chunks in utils.concurrent_iter(
+            create_batch, batches, max_concurrency=max_concurrency, ordered=False
+        ):
+            created[index] = batch_chunks
+            status = BulkCreateProgress(
+                chunks_created=status.chunks_created + len(batch_chunks),
+                batches_created=status.batches_created + 1,
+                elapsed=time.monotonic() - start,
+            )
+            if progress is not None:
+                progress(status)
+
+        return [chunk for index in sorted(created) for chunk in created[index]]
+
+    async def bulk_create_chunks_async(
+        self,
+        chunks: Mapping[str, Any] | Iterable[ChunkOptions],
+        batch_size: int = CHUNK_MAX_BATCH_SIZE,
+        max_concurrency: int = 4,
+        retry: google.api_core.retry_async.AsyncRetry | None = BULK_CREATE_ASYNC_RETRY,
+        progress: Callable[[BulkCreateProgress], None] | None = None,
+        client: glm.RetrieverServiceAsyncClient | None = None,
+        request_options: helper_types.RequestOptionsType | None = None,
+    ) -> list[Chunk]:
+        """This is the async version of `Document.bulk_create_chunks`."""
+        if request_options is None:
+            request_options = {}
+
+        if client is None:
+            client = get_default_retriever_async_client()
+
+        if batch_size < 1 or batch_size > CHUNK_MAX_BATCH_SIZE:
+            raise ValueError(
+                f"Invalid input: `batch_size` must be between 1 and {CHUNK_MAX_BATCH_SIZE}. "
+                f"Received: {batch_size}."
+            )
+
+        async def create_batch(batch):
+            request = protos.BatchCreateChunksRequest(parent=self.name, requests=batch)
+            attempts = 0
+
+            async def create():
+                nonlocal attempts
+                attempts += 1
+                return await client.batch_create_chunks(request, **request_options)
+
+            attempt = create if retry is None else retry(create)
+            try:
+                response = await attempt()
+            except google.api_core.exceptions.AlreadyExists as e:
+                if attempts == 1:
+                    raise
+                chunks = await self._reconcile_chunks_async(batch, e, client, request_options)
+            else:
+                chunks = [decode_chunk(chunk) for chunk in response.chunks]
+            _invalidate_queries(self.name)
+            return chunks
+
+        requests = self._make_create_chunk_requests(chunks)
+        batches = iter(lambda: list(itertools.islice(requests, batch_size)), [])
+
+        start = time.monotonic()
+        created = {}
+        status = BulkCreateProgress(chunks_created=0, batches_created=0, elapsed=0.0)
+        async for index, batch_chunks in utils.concurrent_aiter(
+            create_batch, batches, max_concurrency=max_concurrency, ordered=False
+        ):
+            created[index] = batch_chunks
+            status = BulkCreateProgress(
+                chunks_created=status.chunks_created + len(batch_chunks),
+                batches_created=status.batches_created + 1,
+                elapsed=time.monotonic() - start,
+            )
+            if progress is not None:
+                progress(status)
+
+        return [chunk for index in sorted(created) for chunk in created[index]]
+
+    def _reconcile_chunks(
+        self,
+        requests: list[protos.CreateChunkRequest],
+        error: google.api_core.exceptions.AlreadyExists,
+        client: glm.RetrieverServiceClient,
+        request_options: helper_types.RequestOptionsType,
+    ) -> list[Chunk]:
+        """Returns the chunks of a retried batch that failed with `AlreadyExists`.
+
+        The batch was created by an earlier attempt whose response was lost, e.g. to a client-side
+        timeout, if all its chunks exist with the requested data. Otherwise the chunks conflict
+        with chunks created by someone else, and `error` is raised.
+        """
+        chunks = []
+        for request in requests:
+            try:
+                chunk = client.get_chunk(
+                    protos.GetChunkRequest(name=request.chunk.name), **request_options
+                )
+            except google.api_core.exceptions.NotFound:
+                raise error from None
+            if chunk.data != request.chunk.data:
+                raise error
+            chunks.append(decode_chunk(chunk))
+        return chunks
+
+    async def _reconcile_chunks_async(
+        self,
+        requests: list[protos.CreateChunkRequest],
+        error: google.api_core.exceptions.AlreadyExists,
+        client: glm.RetrieverServiceAsyncClient,
+        request_options: helper_types.RequestOptionsType,
+    ) -> list[Chunk]:
+        """This is the async version of `Document._reconcile_chunks`."""
+        chunks = []
+        for request in requests:
+            try:
+                chunk = await client.get_chunk(
+                    protos.GetChunkRequest(name=request.chunk.name), **request_options
+                )
+            except google.api_core.exceptions.NotFound:
+                raise error from None
+            if chunk.data != request.chunk.data:
+                raise error
+            chunks.append(decode_chunk(chunk))
+        return chunks
+
     def get_chunk(
         self,
         name: str,
@@ -1009,16 +1344,18 @@ class Document(abc.ABC):
 
     def list_chunks(
         self,
-        page_size: int | None = None,
+        page_size: int | None = 100,
         client: glm.RetrieverServiceClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        raw: bool = False,
     ) -> Iterable[Chunk]:
         """
         List chunks of a document.
 
         Args:
-            page_size: Maximum number of `Chunk`s to request.
+            page_size: Maximum number of `Chunk`s to request (per page), at most 100.
             request_options: Options for the request.
+            raw: If True, yield the `protos.Chunk` messages, skipping the conversion to `Chunk`.
 
         Return:
             List of chunks in the document.
@@ -1030,14 +1367,16 @@ class Document(abc.ABC):
             client = get_default_retriever_client()
 
         request = protos.ListChunksRequest(parent=self.name, page_size=page_size)
-        for chunk in client.list_chunks(request, **request_options):
-            yield decode_chunk(chunk)
+        pager = client.list_chunks(request, **request_options)
+        for chunk in utils.iter_pager(pager, "chunks"):
+            yield chunk if raw else decode_chunk(chunk)
 
     async def list_chunks_async(
         self,
-        page_size: int | None = None,
-        client: glm.RetrieverServiceClient | None = None,
+        page_size: int | None = 100,
+        client: glm.RetrieverServiceAsyncClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        raw: bool = False,
     ) -> AsyncIterable[Chunk]:
         """This is the async version of `Document.list_chunks`."""
         if request_options is None:
@@ -1047,8 +1386,9 @@ class Document(abc.ABC):
             client = get_default_retriever_async_client()
 
         request = protos.ListChunksRequest(parent=self.name, page_size=page_size)
-        async for chunk in await client.list_chunks(request, **request_options):
-            yield decode_chunk(chunk)
+        pager = await client.list_chunks(request, **request_options)
+        async for chunk in utils.aiter_pager(pager, "chunks"):
+            yield chunk if raw else decode_chunk(chunk)
 
     def query(
         self,
@@ -1057,6 +1397,7 @@ class Document(abc.ABC):
         results_count: int | None = None,
         client: glm.RetrieverServiceClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        cache_ttl: float | datetime.timedelta | None = None,
     ) -> list[RelevantChunk]:
         """
         Query a `Document` in the `Corpus` for information.
@@ -1065,6 +1406,9 @@ class Document(abc.ABC):
             query: Query string to perform semantic search.
             metadata_filters: Filter for `Chunk` metadata.
             results_count: The maximum number of `Chunk`s to return.
+            cache_ttl: If set, reuse the result of an identical query made in the last `cache_ttl`
+                seconds (or `datetime.timedelta`) by this process. Creating, updating or deleting
+                `Chunk`s through this library drops the affected results.
 
         Returns:
             List of relevant chunks.
@@ -1092,6 +1436,10 @@ class Document(abc.ABC):
             metadata_filters=m_f_,
             results_count=results_count,
         )
+        cached = _cached_query_result(request, cache_ttl)
+        if cached is not None:
+            return cached
+
         response = client.query_document(request, **request_options)
         response = type(response).to_dict(response)
 
@@ -1103,6 +1451,7 @@ class Document(abc.ABC):
             )
             relevant_chunks.append(rc)
 
+        _store_query_result(request, cache_ttl, relevant_chunks)
         return relevant_chunks
 
     async def query_async(
@@ -1112,6 +1461,7 @@ class Document(abc.ABC):
         results_count: int | None = None,
         client: glm.RetrieverServiceAsyncClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        cache_ttl: float | datetime.timedelta | None = None,
     ) -> list[RelevantChunk]:
         """This is the async version of `Document.query`."""
         if request_options is None:
@@ -1137,6 +1487,10 @@ class Document(abc.ABC):
             metadata_filters=m_f_,
             results_count=results_count,
         )
+        cached = _cached_query_result(request, cache_ttl)
+        if cached is not None:
+            return cached
+
         response = await client.query_document(request, **request_options)
         response = type(response).to_dict(response)
 
@@ -1148,6 +1502,7 @@ class Document(abc.ABC):
             )
             relevant_chunks.append(rc)
 
+        _store_query_result(request, cache_ttl, relevant_chunks)
         return relevant_chunks
 
     def _apply_update(self, path, value):
@@ -1225,18 +1580,77 @@ class Document(abc.ABC):
         await client.update_document(request, **request_options)
         return self
 
+    def _chunk_name(self, name: str) -> str:
+        if "/" not in name:
+            name = f"{self.name}/chunks/{name}"
+        return name
+
+    def _parse_chunk_updates(
+        self, chunks: BatchUpdateChunksOptions
+    ) -> list[protos.UpdateChunkRequest | tuple[str, dict[str, Any]]]:
+        """Converts each update to either an `UpdateChunkRequest` or a `(name, flat updates)` pair."""
+        updates = []
+        if isinstance(chunks, Mapping):
+            # Key is name of chunk, value is a dictionary of updates
+            for key, value in chunks.items():
+                flat_updates = flatten_update_paths(value)
+                # At this time, only `data` can be updated
+                for item in flat_updates:
+                    if item != "data.string_value":
+                        raise ValueError(
+                            f"Invalid operation: Currently, only the 'data' attribute can be updated for a 'Chunk'. Attempted to update '{item}'."
+                        )
+                updates.append((self._chunk_name(key), flat_updates))
+        elif isinstance(chunks, Iterable):
+            for chunk in chunks:
+                if isinstance(chunk, protos.UpdateChunkRequest):
+                    updates.append(chunk)
+                elif isinstance(chunk, tuple):
+                    # First element is name of chunk, second element contains updates
+                    updates.append((self._chunk_name(chunk[0]), flatten_update_paths(chunk[1])))
+                else:
+                    raise TypeError(
+                        "Invalid input: The 'chunks' parameter must be a list of 'protos.UpdateChunkRequests', "
+                        "dictionaries, or tuples of dictionaries."
+                    )
+        else:
+            raise TypeError(
+                "Invalid input: The 'chunks' parameter must be a list of 'protos.UpdateChunkRequests', "
+                "dictionaries, or tuples of dictionaries."
+            )
+        return updates
+
+    def _make_update_chunk_request(
+        self, name: str, updates: dict[str, Any], chunk: Chunk | None
+    ) -> protos.UpdateChunkRequest:
+        if chunk is None:
+            # The service only reads the fields in the mask, no need to fetch the others.
+            chunk = Chunk(name=name, data="", custom_metadata=None, state=State.STATE_UNSPECIFIED)
+
+        field_mask = field_mask_pb2.FieldMask()
+        for path in updates.keys():
+            field_mask.paths.append(path)
+        for path, value in updates.items():
+            chunk._apply_update(path, value)
+        return protos.UpdateChunkRequest(chunk=chunk.to_dict(), update_mask=field_mask)
+
     def batch_update_chunks(
         self,
         chunks: BatchUpdateChunksOptions,
         client: glm.RetrieverServiceClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        max_concurrency: int = 8,
     ):
         """
         Update multiple chunks within the same document.
 
+        Updates that only set `data.string_value` are sent as they are. Other updates need the
+        current `Chunk`, those are read first, with up to `max_concurrency` reads in flight.
+
         Args:
             chunks: Data structure specifying which `Chunk`s to update and what the required updates are.
             request_options: Options for the request.
+            max_concurrency: The maximum number of `Chunk`s read at once.
 
         Return:
             Updated `Chunk`s.
@@ -1249,86 +1663,44 @@ class Document(abc.ABC):
 
         if isinstance(chunks, protos.BatchUpdateChunksRequest):
             response = client.batch_update_chunks(chunks)
+            _invalidate_queries(self.name)
             response = type(response).to_dict(response)
             return response
 
-        _requests = []
-        if isinstance(chunks, Mapping):
-            # Key is name of chunk, value is a dictionary of updates
-            for key, value in chunks.items():
-                chunk_to_update = self.get_chunk(name=key)
-
-                # Handle the custom_metadata parameter
-                c_data = []
-                if chunk_to_update.custom_metadata:
-                    for cm in chunk_to_update.custom_metadata:
-                        c_data.append(cm._to_proto())
-
-                # When handling updates, use to the _to_proto result of the custom_metadata
-                chunk_to_update.custom_metadata = c_data
-
-                updates = flatten_update_paths(value)
-                # At this time, only `data` can be updated
-                for item in updates:
-                    if item != "data.string_value":
-                        raise ValueError(
-                            f"Invalid operation: Currently, only the 'data' attribute can be updated for a 'Chunk'. Attempted to update '{item}'."
-                        )
-                field_mask = field_mask_pb2.FieldMask()
-                for path in updates.keys():
-                    field_mask.paths.append(path)
-                for path, value in updates.items():
-                    chunk_to_update._apply_update(path, value)
-                _requests.append(
-                    protos.UpdateChunkRequest(
-                        chunk=chunk_to_update.to_dict(), update_mask=field_mask
-                    )
-                )
-            request = protos.BatchUpdateChunksRequest(parent=self.name, requests=_requests)
-            response = client.batch_update_chunks(request, **request_options)
-            response = type(response).to_dict(response)
-            return response
-        if isinstance(chunks, Iterable) and not isinstance(chunks, Mapping):
-            for chunk in chunks:
-                if isinstance(chunk, protos.UpdateChunkRequest):
-                    _requests.append(chunk)
-                elif isinstance(chunk, tuple):
-                    # First element is name of chunk, second element contains updates
-                    chunk_to_update = self.get_chunk(name=chunk[0])
-
-                    # Handle the custom_metadata parameter
-                    c_data = []
-                    if chunk_to_update.custom_metadata:
-                        for cm in chunk_to_update.custom_metadata:
-                            c_data.append(cm._to_proto())
-
-                    # When handling updates, use to the _to_proto result of the custom_metadata
-                    chunk_to_update.custom_metadata = c_data
-
-                    updates = flatten_update_paths(chunk[1])
-                    field_mask = field_mask_pb2.FieldMask()
-                    for path in updates.keys():
-                        field_mask.paths.append(path)
-                    for path, value in updates.items():
-                        chunk_to_update._apply_update(path, value)
-                    _requests.append(
-                        {"chunk": chunk_to_update.to_dict(), "update_mask": field_mask}
-                    )
-                else:
-                    raise TypeError(
-                        "Invalid input: The 'chunks' parameter must be a list of 'protos.UpdateChunkRequests',"
-                        " dictionaries, or tuples of dictionaries."
-                    )
-            request = protos.BatchUpdateChunksRequest(parent=self.name, requests=_requests)
-            response = client.batch_update_chunks(request, **request_options)
-            response = type(response).to_dict(response)
-            return response
+        updates = self._parse_chunk_updates(chunks)
+        to_read = [
+            update[0]
+            for update in updates
+            if isinstance(update, tuple) and not set(update[1]) <= {"data.string_value"}
+        ]
+        current = {}
+        for index, chunk in utils.concurrent_iter(
+            lambda name: self.get_chunk(name=name, client=client),
+            to_read,
+            max_concurrency=max_concurrency,
+        ):
+            current[to_read[index]] = chunk
+
+        _requests = [
+            (
+                update
+                if isinstance(update, protos.UpdateChunkRequest)
+                else self._make_update_chunk_request(*update, current.get(update[0]))
+            )
+            for update in updates
+        ]
+        request = protos.BatchUpdateChunksRequest(parent=self.name, requests=_requests)
+        response = client.batch_update_chunks(request, **request_options)
+        _invalidate_queries(self.name)
+        response = type(response).to_dict(response)
+        return response
 
     async def batch_update_chunks_async(
         self,
         chunks: BatchUpdateChunksOptions,
         client: glm.RetrieverServiceAsyncClient | None = None,
         request_options: helper_types.RequestOptionsType | None = None,
+        max_concurrency: int = 8,
     ):
         """This is the async version of `Document.batch_update_chunks`."""
         if request_options is None:
@@ -1338,81 +1710,38 @@ class Document(abc.ABC):
             client = get_default_retriever_async_client()
 
         if isinstance(chunks, protos.BatchUpdateChunksRequest):
-            response = client.batch_update_chunks(chunks)
+            response = await client.batch_update_chunks(chunks)
+            _invalidate_queries(self.name)
             response = type(response).to_dict(response)
             return response
 
-        _requests = []
-        if isinstance(chunks, Mapping):
-            # Key is name of chunk, value is a dictionary of updates
-            for key, value in chunks.items():
-                chunk_to_update = self.get_chunk(name=key)
-
-                # Handle the custom_metadata parameter
-                c_data = []
-                if chunk_to_update.custom_metadata:
-                    for cm in chunk_to_update.custom_metadata:
-                        c_data.append(cm._to_proto())
-
-                # When handling updates, use to the _to_proto result of the custom_metadata
-                chunk_to_update.custom_metadata = c_data
-
-                updates = flatten_update_paths(value)
-                # At this time, only `data` can be updated
-                for item in updates:
-                    if item != "data.string_value":
-                        raise ValueError(
-                            f"Invalid operation: Currently, only the 'data' attribute can be updated for a 'Chunk'. Attempted to update '{item}'."
-                        )
-                field_mask = field_mask_pb2.FieldMask()
-                for path in updates.keys():
-                    field_mask.paths.append(path)
-                for path, value in updates.items():
-                    chunk_to_update._apply_update(path, value)
-                _requests.append(
-                    protos.UpdateChunkRequest(
-                        chunk=chunk_to_update.to_dict(), update_mask=field_mask
-                    )
-                )
-            request = protos.BatchUpdateChunksRequest(parent=self.name, requests=_requests)
-            response = await client.batch_update_chunks(request, **request_options)
-            response = type(response).to_dict(response)
-            return response
-        if isinstance(chunks, Iterable) and not isinstance(chunks, Mapping):
-            for chunk in chunks:
-                if isinstance(chunk, protos.UpdateChunkRequest):
-                    _requests.append(chunk)
-                elif isinstance(chunk, tuple):
-                    # First element is name of chunk, second element contains updates
-                    chunk_to_update = self.get_chunk(name=chunk[0])
-
-                    # Handle the custom_metadata parameter
-                    c_data = []
-                    if chunk_to_update.custom_metadata:
-                        for cm in chunk_to_update.custom_metadata:
-                            c_data.append(cm._to_proto())
-
-                    # When handling updates, use to the _to_proto result of the custom_metadata
-                    chunk_to_update.custom_metadata = c_data
-
-                    updates = flatten_update_paths(chunk[1])
-                    field_mask = field_mask_pb2.FieldMask()
-                    for path in updates.keys():
-                        field_mask.paths.append(path)
-                    for path, value in updates.items():
-                        chunk_to_update._apply_update(path, value)
-                    _requests.append(
-                        {"chunk": chunk_to_update.to_dict(), "update_mask": field_mask}
-                    )
-                else:
-                    raise TypeError(
-                        "Invalid input: The 'chunks' parameter must be a list of 'protos.UpdateChunkRequests', "
-                        "dictionaries, or tuples of dictionaries."
-                    )
-            request = protos.BatchUpdateChunksRequest(parent=self.name, requests=_requests)
-            response = await client.batch_update_chunks(request, **request_options)
-            response = type(response).to_dict(response)
-            return response
+        updates = self._parse_chunk_updates(chunks)
+        to_read = [
+            update[0]
+            for update in updates
+            if isinstance(update, tuple) and not set(update[1]) <= {"data.string_value"}
+        ]
+        current = {}
+        async for index, chunk in utils.concurrent_aiter(
+            lambda name: self.get_chunk_async(name=name, client=client),
+            to_read,
+            max_concurrency=max_concurrency,
+        ):
+            current[to_read[index]] = chunk
+
+        _requests = [
+            (
+                update
+                if isinstance(update, protos.UpdateChunkRequest)
+                else self._make_update_chunk_request(*update, current.get(update[0]))
+            )
+            for update in updates
+        ]
+        request = protos.BatchUpdateChunksRequest(parent=self.name, requests=_requests)
+        response = await client.batch_update_chunks(request, **request_options)
+        _invalidate_queries(self.name)
+        response = type(response).to_dict(response)
+        return response
 
     def delete_chunk(
         self,
@@ -1438,6 +1767,7 @@ class Document(abc.ABC):
 
         request = protos.DeleteChunkRequest(name=name)
         client.delete_chunk(request, **request_options)
+        _invalidate_queries(self.name)
 
     async def delete_chunk_async(
         self,
@@ -1457,6 +1787,7 @@ class Document(abc.ABC):
 
         request = protos.DeleteChunkRequest(name=name)
         await client.delete_chunk(request, **request_options)
+        _invalidate_queries(self.name)
 
     def batch_delete_chunks(
         self,
@@ -1480,12 +1811,14 @@ class Document(abc.ABC):
         if all(isinstance(x, protos.DeleteChunkRequest) for x in chunks):
             request = protos.BatchDeleteChunksRequest(parent=self.name, requests=chunks)
             client.batch_delete_chunks(request, **request_options)
+            _invalidate_queries(self.name)
         elif isinstance(chunks, Iterable):
             _request_list = []
             for chunk_name in chunks:
                 _request_list.append(protos.DeleteChunkRequest(name=chunk_name))
             request = protos.BatchDeleteChunksRequest(parent=self.name, requests=_request_list)
             client.batch_delete_chunks(request, **request_options)
+            _invalidate_queries(self.name)
         else:
             raise ValueError(
                 "Invalid operation: To delete chunks, you must pass in either the names of the chunks as an iterable, "
@@ -1508,12 +1841,14 @@ class Document(abc.ABC):
         if all(isinstance(x, protos.DeleteChunkRequest) for x in chunks):
             request = protos.BatchDeleteChunksRequest(parent=self.name, requests=chunks)
             await client.batch_delete_chunks(request, **request_options)
+            _invalidate_queries(self.name)
         elif isinstance(chunks, Iterable):
             _request_list = []
             for chunk_name in chunks:
                 _request_list.append(protos.DeleteChunkRequest(name=chunk_name))
             request = protos.BatchDeleteChunksRequest(parent=self.name, requests=_request_list)
             await client.batch_delete_chunks(request, **request_options)
+            _invalidate_queries(self.name)
         else:
             raise ValueError(
                 "Invalid operation: To delete chunks, you must pass in either the names of the chunks as an iterable, "
@@ -1646,6 +1981,7 @@ class Chunk(abc.ABC):
         request = protos.UpdateChunkRequest(chunk=self.to_dict(), update_mask=field_mask)
 
         client.update_chunk(request, **request_options)
+        _invalidate_queries(self.name)
         return self
 
     async def update_async(
@@ -1686,6 +2022,7 @@ class Chunk(abc.ABC):
         request = protos.UpdateChunkRequest(chunk=self.to_dict(), update_mask=field_mask)
 
         await client.update_chunk(request, **request_options)
+        _invalidate_queries(self.name)
         return self
 
     def to_dict(self) -> dict[str, Any]:
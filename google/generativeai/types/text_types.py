@@ -17,9 +17,13 @@ from __future__ import annotations
 import sys
 import abc
 import dataclasses
+import typing
 from typing import Any, Dict, List
 from typing_extensions import TypedDict
 
+if typing.TYPE_CHECKING:
+    import numpy as np
+
 from google.generativeai import string_utils
 from google.generativeai.types import citation_types
 
@@ -30,3 +34,9 @@ class EmbeddingDict(TypedDict):
 
 class BatchEmbeddingDict(TypedDict):
     embedding: list[list[float]]
+
+
+class ArrayEmbeddingDict(TypedDict):
+    """An embedding, or a batch of them, returned with `output_format="numpy"`."""
+
+    embedding: np.ndarray
@@ -14,6 +14,31 @@
 # limitations under the License.
 from __future__ import annotations
 
+import asyncio
+import collections
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+)
+import concurrent.futures
+import copy
+import functools
+import inspect
+import itertools
+import threading
+import weakref
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+FUNCTION_SCHEMA_CACHE_SIZE = 1024
+
 
 def flatten_update_paths(updates):
     """Flattens a nested dictionary into a single level dictionary, with keys representing the original path."""
@@ -27,3 +52,348 @@ def flatten_update_paths(updates):
             new_updates[key] = value
 
     return new_updates
+
+
+def concurrent_iter(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    max_concurrency: int,
+    ordered: bool = True,
+) -> Iterator[tuple[int, R]]:
+    """Calls `fn` on each of `items` from a thread pool, yielding `(index, result)` pairs.
+
+    At most `max_concurrency` calls are in flight at once, and `items` is consumed lazily, so it
+    can be an unbounded iterator; with `max_concurrency=1` the calls run in the caller's thread.
+    With `ordered=False` results are yielded as they complete. With `ordered=True` they are yielded
+    in input order: while the oldest call is still running, new calls keep starting as the others
+    complete, until `2 * max_concurrency` calls, running or finished, are waiting to be yielded. An
+    exception raised by `fn` is re-raised here, after the calls that are still in flight have
+    finished.
+    """
+    if max_concurrency < 1:
+        raise ValueError(
+            f"Invalid input: `max_concurrency` must be a positive integer. Received: {max_concurrency}."
+        )
+
+    items = enumerate(items)
+    if max_concurrency == 1:
+        # Nothing to overlap, call `fn` in the caller's thread.
+        for index, item in items:
+            yield index, fn(item)
+        return
+
+    # Calls that are running, and (with `ordered`) the finished ones waiting for an older call.
+    pending: dict[concurrent.futures.Future, int] = {}
+    finished: dict[int, concurrent.futures.Future] = {}
+    next_index = 0
+
+    def submit(executor):
+        # At most `max_concurrency` running calls, and `2 * max_concurrency` with the finished ones.
+        idle = max_concurrency - len(pending)
+        count = min(idle, idle + max_concurrency - len(finished))
+        for index, item in itertools.islice(items, max(count, 0)):
+            pending[executor.submit(fn, item)] = index
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        try:
+            submit(executor)
+            while pending or finished:
+                if next_index in finished:
+                    index = next_index
+                    next_index += 1
+                    yield index, finished.pop(index).result()
+                    submit(executor)
+                    continue
+
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    index = pending.pop(future)
+                    if ordered:
+                        finished[index] = future
+                    else:
+                        yield index, future.result()
+                    submit(executor)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def concurrent_aiter(
+    fn: Callable[[T], Awaitable[R]],
+    items: Iterable[T],
+    *,
+    max_concurrency: int,
+    ordered: bool = True,
+) -> AsyncIterator[tuple[int, R]]:
+    """The async version of `concurrent_iter`, running the calls as `asyncio` tasks."""
+    if max_concurrency < 1:
+        raise ValueError(
+            f"Invalid input: `max_concurrency` must be a positive integer. Received: {max_concurrency}."
+        )
+
+    items = enumerate(items)
+    if max_concurrency == 1:
+        for index, item in items:
+            yield index, await fn(item)
+        return
+
+    pending: dict[asyncio.Future, int] = {}
+    finished: dict[int, asyncio.Future] = {}
+    next_index = 0
+
+    def start_tasks():
+        idle = max_concurrency - len(pending)
+        count = min(idle, idle + max_concurrency - len(finished))
+        for index, item in itertools.islice(items, max(count, 0)):
+            pending[asyncio.ensure_future(fn(item))] = index
+
+    try:
+        start_tasks()
+        while pending or finished:
+            if next_index in finished:
+                index = next_index
+                next_index += 1
+                yield index, finished.pop(index).result()
+                start_tasks()
+                continue
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                if ordered:
+                    finished[index] = future
+                else:
+                    yield index, future.result()
+                start_tasks()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+_EXHAUSTED = object()
+
+
+def prefetch_iter(items: Iterable[T]) -> Iterator[T]:
+    """Iterates over `items`, producing the next item in a background thread.
+
+    While the caller handles an item, the next one is already being produced, so this overlaps slow
+    producers, like the pages of a list API, with the work done on each item. Closing the iterator
+    doesn't wait for the item being produced.
+    """
+    iterator = iter(items)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(next, iterator, _EXHAUSTED)
+        while (item := future.result()) is not _EXHAUSTED:
+            future = executor.submit(next, iterator, _EXHAUSTED)
+            yield item
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def prefetch_aiter(items: AsyncIterable[T]) -> AsyncIterator[T]:
+    """The async version of `prefetch_iter`, producing the next item in an `asyncio` task."""
+    iterator = items.__aiter__()
+
+    async def next_item():
+        try:
+            return await iterator.__anext__()
+        except StopAsyncIteration:
+            return _EXHAUSTED
+
+    future = asyncio.ensure_future(next_item())
+    try:
+        while (item := await future) is not _EXHAUSTED:
+            future = asyncio.ensure_future(next_item())
+            yield item
+    finally:
+        future.cancel()
+
+
+def iter_pager(pager: Iterable[T], field: str, *, prefetch: bool = True) -> Iterator[T]:
+    """Yields the items of a paginated list response, fetching the next page in the background.
+
+    The next page is requested once the caller asks for the second item of the current one. So
+    taking only the first item costs a single request, but stopping after that can leave one page
+    fetched for nothing.
+
+    Args:
+        pager: A pager returned by a list method of a client, like
+            `ModelServiceClient.list_models`. Other iterables are iterated over as they are.
+        field: The repeated field holding the items of each page, like `"models"`.
+        prefetch: Whether to fetch the next page while the current one is consumed.
+    """
+    pages = getattr(pager, "pages", None)
+    if pages is None:
+        yield from pager
+        return
+
+    pages = iter(pages)
+    first_page = next(pages, None)
+    if first_page is None:
+        return
+    items = iter(getattr(first_page, field))
+    yield from itertools.islice(items, 1)
+
+    if prefetch:
+        # Returns `first_page` right away, and starts fetching the next one.
+        pages = prefetch_iter(itertools.chain([first_page], pages))
+        next(pages)
+    yield from items
+    for page in pages:
+        yield from getattr(page, field)
+
+
+async def _prepend(first: T, rest: AsyncIterator[T]) -> AsyncIterator[T]:
+    yield first
+    async for item in rest:
+        yield item
+
+
+async def aiter_pager(
+    pager: AsyncIterable[T], field: str, *, prefetch: bool = True
+) -> AsyncIterator[T]:
+    """The async version of `iter_pager`, for the pagers of async clients."""
+    pages = getattr(pager, "pages", None)
+    if pages is None:
+        async for item in pager:
+            yield item
+        return
+
+    pages = pages.__aiter__()
+    try:
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        return
+    items = iter(getattr(first_page, field))
+    for item in itertools.islice(items, 1):
+        yield item
+
+    if prefetch:
+        # Returns `first_page` right away, and starts fetching the next one.
+        pages = prefetch_aiter(_prepend(first_page, pages))
+        await pages.__anext__()
+    for item in items:
+        yield item
+    async for page in pages:
+        for item in getattr(page, field):
+            yield item
+
+
+class LRUCache:
+    """A thread safe mapping that holds at most `maxsize` entries.
+
+    When full, adding an entry evicts the least recently used one.
+    """
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError(
+                f"Invalid input: `maxsize` must be a positive integer. Received: {maxsize}."
+            )
+        self.maxsize = maxsize
+        self._data: collections.OrderedDict[Hashable, Any] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def keys(self) -> list[Hashable]:
+        with self._lock:
+            return list(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+
+_function_schema_cache = LRUCache(maxsize=FUNCTION_SCHEMA_CACHE_SIZE)
+
+
+def _function_ref(f: Callable[..., Any]) -> tuple[weakref.ref, bool]:
+    """Returns a weak reference to `f` for the cache keys, and whether `f` is a bound method.
+
+    A bound method's schema only depends on the function it wraps, so the key refers to that
+    function instead of keeping the instance alive. Raises `TypeError` if `f` can't be weakly
+    referenced.
+    """
+    if inspect.ismethod(f):
+        return weakref.ref(f.__func__), True
+    return weakref.ref(f), False
+
+
+def cache_function_schema(generate_schema):
+    """Memoizes a function-schema generator in a process-wide LRU cache.
+
+    Generating the schema for a python function builds a throwaway `pydantic` model, this is
+    slow enough to matter when many tools are passed with each request. The cache is keyed on a
+    weak reference to the function (to the wrapped function, for bound methods), and the
+    `descriptions` and `required` overrides, so it doesn't keep functions, the state of closures,
+    or the instances of bound methods alive. The entries of functions that were garbage collected
+    are never hit again, and age out of the cache. Each call returns a copy of the cached schema,
+    so callers can modify it.
+
+    Use `clear_function_schema_cache` if a function's signature or docstring is changed after its
+    schema was generated.
+    """
+
+    @functools.wraps(generate_schema)
+    def wrapper(f, *, descriptions=None, required=None):
+        try:
+            key = (
+                generate_schema,
+                *_function_ref(f),
+                None if descriptions is None else frozenset(descriptions.items()),
+                None if required is None else tuple(required),
+            )
+            schema = _function_schema_cache.get(key)
+        except TypeError:
+            # Unhashable descriptions, and callables that can't be weakly referenced, are not
+            # cached.
+            return generate_schema(f, descriptions=descriptions, required=required)
+
+        if schema is None:
+            schema = generate_schema(f, descriptions=descriptions, required=required)
+            _function_schema_cache.put(key, schema)
+        return copy.deepcopy(schema)
+
+    return wrapper
+
+
+def clear_function_schema_cache(f: Callable[..., Any] | None = None):
+    """Removes the cached schemas for the function `f`, or all cached schemas if `f` is None."""
+    if f is None:
+        _function_schema_cache.clear()
+        return
+
+    if inspect.ismethod(f):
+        f = f.__func__
+    for key in _function_schema_cache.keys():
+        # The keys are `(generate_schema, function_ref, is_bound_method, descriptions, required)`.
+        if isinstance(key, tuple) and key[1]() is f:
+            _function_schema_cache.pop(key)
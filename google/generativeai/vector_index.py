@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Local vector indexes, for retrieval over `embed_content` results.
+
+>>> result = genai.embed_content(
+...     'models/text-embedding-004', texts, task_type='retrieval_document', output_format='numpy')
+>>> index = genai.vector_index.VectorIndex()
+>>> index.add(result['embedding'], contents=texts)
+>>> query = genai.embed_content(
+...     'models/text-embedding-004', question, task_type='retrieval_query', output_format='numpy')
+>>> hits = index.search(query['embedding'], k=5)
+
+The hits can be passed directly as the `inline_passages` of `answer.generate_answer`:
+
+>>> answer.generate_answer(contents=question, inline_passages=hits)
+
+By default an index scores every vector. With `nlist` set, the vectors are clustered and each
+query is only scored against the clusters closest to it, which is much faster for large indexes at
+a small cost in recall. Use `index.save` to write an index to a directory, and `load` to read it
+back: the vectors are memory mapped, so loading is fast and several processes share the pages.
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import pathlib
+import typing
+from typing import Iterable, Literal, Sequence, overload
+
+from google.generativeai import protos
+from google.generativeai.types import content_types
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+else:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+MetricOptions = Literal["cosine", "dot"]
+
+# Bounds the size of the score matrices computed at once, to (QUERY_BLOCK_SIZE, DATA_BLOCK_SIZE).
+QUERY_BLOCK_SIZE = 256
+DATA_BLOCK_SIZE = 65536
+
+_FORMAT_VERSION = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class Hit:
+    """A search result: the `id` of a stored vector, its `score`, and its `content` if any."""
+
+    id: str
+    score: float
+    content: protos.Content | None = None
+
+    def to_grounding_passage(self) -> protos.GroundingPassage:
+        if self.content is None:
+            raise ValueError(
+                f"Invalid operation: Hit '{self.id}' has no content. Pass `contents` to "
+                "`add` to use hits as grounding passages."
+            )
+        return protos.GroundingPassage(id=self.id, content=self.content)
+
+
+def _best_k(rows: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Keeps the `k` best scores of each row of `scores`, sorted best first."""
+    if k < scores.shape[1]:
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        rows = np.take_along_axis(rows, best, axis=1)
+        scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(rows, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Returns the index of the closest centroid to each vector."""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), DATA_BLOCK_SIZE):
+        block = vectors[start : start + DATA_BLOCK_SIZE]
+        assignments[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+class VectorIndex:
+    """An in-memory vector index.
+
+    By default the index is exact: queries are scored against every stored vector, in blocks,
+    with matrix products. Searching for many queries at once is much faster than one at a time.
+
+    With `nlist` set the index is an inverted file (IVF) index: the vectors are clustered into
+    `nlist` clusters with k-means, and each query is only scored against the vectors of its
+    `nprobe` closest clusters. The clusters are trained on the vectors in the index at the first
+    search, or by calling `train`. Vectors added later are assigned to the existing clusters, call
+    `train` again if the data changes a lot.
+
+    Args:
+        metric: `"cosine"` normalizes the vectors and queries, `"dot"` uses the raw dot product.
+        nlist: The number of clusters of an IVF index, around `sqrt(len(index))` is a good
+            start. `None` for an exact index.
+        nprobe: The number of clusters searched for each query by an IVF index. Higher is
+            slower, with better recall; `nprobe=nlist` is an exact search.
+    """
+
+    def __init__(
+        self, metric: MetricOptions = "cosine", nlist: int | None = None, nprobe: int = 16
+    ):
+        if np is None:
+            raise ImportError(
+                "`vector_index` requires `numpy`, install it with `pip install numpy`."
+            )
+        if metric not in ("cosine", "dot"):
+            raise ValueError(
+                f"Invalid input: `metric` must be one of 'cosine' or 'dot'. Received: {metric}."
+            )
+        if (nlist is not None and nlist < 1) or nprobe < 1:
+            raise ValueError(
+                f"Invalid input: `nlist` and `nprobe` must be positive integers. Received: "
+                f"nlist={nlist}, nprobe={nprobe}."
+            )
+        self.metric = metric
+        self.nlist = nlist
+        self.nprobe = nprobe
+
+        self._vectors: np.ndarray | None = None
+        self._count = 0
+        self._ids: list[str] = []
+        self._contents: list[protos.Content | None] = []
+
+        self.centroids: np.ndarray | None = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        # The rows sorted by cluster, and the start of each cluster in them.
+        self._order: np.ndarray | None = None
+        self._offsets: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def dim(self) -> int | None:
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The stored vectors, normalized if the metric is `"cosine"`."""
+        if self._vectors is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._vectors[: self._count]
+
+    def add(
+        self,
+        vectors: Sequence[Sequence[float]] | np.ndarray,
+        contents: Iterable[content_types.ContentType | None] | None = None,
+        ids: Iterable[str] | None = None,
+    ):
+        """Adds vectors to the index.
+
+        Args:
+            vectors: A 2D array of vectors, or a single vector.
+            contents: The content each vector was embedded from, returned with the hits so they
+                can be used as grounding passages.
+            ids: An id for each vector, defaults to its position in the index.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if vectors.ndim != 2:
+            raise ValueError(
+                f"Invalid input: `vectors` must be a 2D array. Received shape: {vectors.shape}."
+            )
+        if self.dim is not None and vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Invalid input: The index stores vectors of dimension {self.dim}. Received "
+                f"vectors of dimension {vectors.shape[1]}."
+            )
+
+        n = len(vectors)
+        if contents is None:
+            contents = [None] * n
+        else:
+            contents = [None if c is None else content_types.to_content(c) for c in contents]
+        if ids is None:
+            ids = [str(i) for i in range(self._count, self._count + n)]
+        else:
+            ids = [str(i) for i in ids]
+        if len(contents) != n or len(ids) != n:
+            raise ValueError(
+                f"Invalid input: `contents` and `ids` must have one item per vector. Received "
+                f"{n} vectors, {len(contents)} contents and {len(ids)} ids."
+            )
+
+        if self.metric == "cosine":
+            vectors = _normalize(vectors)
+
+        start = self._count
+        self._reserve(start + n, vectors.shape[1])
+        self._vectors[start : start + n] = vectors
+        self._count += n
+        self._ids.extend(ids)
+        self._contents.extend(contents)
+
+        if self.centroids is not None:
+            new = _assign(vectors, self.centroids)
+            self._assignments = np.concatenate([self._assignments, new])
+            self._order = None
+
+    def _reserve(self, size: int, dim: int):
+        if self._vectors is None:
+            self._vectors = np.empty((size, dim), dtype=np.float32)
+        elif size > len(self._vectors) or not self._vectors.flags.writeable:
+            # Grow by doubling. A loaded index is memory mapped read-only, it's copied on the
+            # first `add`.
+            grown = np.empty((max(size, 2 * len(self._vectors)), dim), dtype=np.float32)
+            grown[: self._count] = self._vectors[: self._count]
+            self._vectors = grown
+
+    def train(self, iterations: int = 10, sample_size: int | None = None, seed: int = 0):
+        """Clusters the vectors of an IVF index with k-means, and assigns them to the clusters.
+
+        Args:
+            iterations: The number of k-means iterations.
+            sample_size: The number of vectors the clusters are trained on, defaults to
+                `256 * nlist`.
+            seed: Seeds the random sampling and initialization.
+        """
+        if self.nlist is None:
+            raise ValueError("Invalid operation: Only an index with `nlist` set can be trained.")
+        if not self._count:
+            raise ValueError("Invalid operation: Add vectors to the index before training it.")
+
+        rng = np.random.default_rng(seed)
+        vectors = self.vectors
+        sample_size = sample_size or 256 * self.nlist
+        if sample_size < len(vectors):
+            sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        else:
+            sample = np.asarray(vectors)
+
+        nlist = min(self.nlist, len(sample))
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = _assign(sample, centroids)
+            counts = np.bincount(assignments, minlength=nlist)
+            # Empty clusters keep their previous centroid.
+            filled = counts > 0
+            order = np.argsort(assignments, kind="stable")
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            centroids[filled] = sums / counts[filled, None]
+            if self.metric == "cosine":
+                centroids = _normalize(centroids)
+
+        self.centroids = centroids
+        self._assignments = _assign(vectors, centroids)
+        self._order = None
+
+    @overload
+    def search(self, queries: Sequence[float], k: int = 5) -> list[Hit]: ...
+
+    @overload
+    def search(self, queries: Sequence[Sequence[float]], k: int = 5) -> list[list[Hit]]: ...
+
+    @overload
+    def search(self, queries: np.ndarray, k: int = 5) -> list: ...
+
+    def search(
+        self, queries: Sequence[float] | Sequence[Sequence[float]] | np.ndarray, k: int = 5
+    ) -> list[Hit] | list[list[Hit]]:
+        """Returns the `k` best hits for a query, or a list of them for a 2D array of queries.
+
+        An IVF index can return fewer than `k` hits, if the probed clusters hold fewer vectors.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        rows, scores = self.top_k(queries, k)
+        hits = [
+            [
+                Hit(id=self._ids[row], score=float(score), content=self._contents[row])
+                for row, score in zip(query_rows, query_scores)
+                if row >= 0
+            ]
+            for query_rows, query_scores in zip(rows, scores)
+        ]
+        return hits[0] if queries.ndim == 1 else hits
+
+    def top_k(self, queries: np.ndarray, k: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the rows and scores of the `k` best vectors for each query.
+
+        Both are arrays of shape `(len(queries), min(k, len(self)))`, best first. An IVF index
+        pads them with rows of -1 and scores of -inf if the probed clusters hold fewer vectors.
+        """
+        if k < 1:
+            raise ValueError(f"Invalid input: `k` must be a positive integer. Received: {k}.")
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if self._count and queries.shape[1] != self.dim:
+            raise ValueError(
+                f"Invalid input: The index stores vectors of dimension {self.dim}. Received "
+                f"queries of dimension {queries.shape[1]}."
+            )
+        if self.metric == "cosine":
+            queries = _normalize(queries)
+
+        k = min(k, self._count)
+        if self.nlist is None or not k:
+            return self._exact_top_k(queries, k)
+        return self._ivf_top_k(queries, k)
+
+    def _exact_top_k(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        all_rows = np.empty((len(queries), k), dtype=np.int64)
+        all_scores = np.empty((len(queries), k), dtype=np.float32)
+        vectors = self.vectors
+        for q_start in range(0, len(queries), QUERY_BLOCK_SIZE):
+            block = queries[q_start : q_start + QUERY_BLOCK_SIZE]
+            rows = np.empty((len(block), 0), dtype=np.int64)
+            scores = np.empty((len(block), 0), dtype=np.float32)
+            for v_start in range(0, len(vectors), DATA_BLOCK_SIZE):
+                data = vectors[v_start : v_start + DATA_BLOCK_SIZE]
+                block_rows = np.broadcast_to(
+                    np.arange(v_start, v_start + len(data)), (len(block), len(data))
+                )
+                rows, scores = _best_k(
+                    np.concatenate([rows, block_rows], axis=1),
+                    np.concatenate([scores, block @ data.T], axis=1),
+                    k,
+                )
+            all_rows[q_start : q_start + len(block)] = rows
+            all_scores[q_start : q_start + len(block)] = scores
+        return all_rows, all_scores
+
+    def _ivf_top_k(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        if self.centroids is None:
+            self.train()
+        if self._order is None:
+            self._order = np.argsort(self._assignments, kind="stable")
+            counts = np.bincount(self._assignments, minlength=len(self.centroids))
+            self._offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        nprobe = min(self.nprobe, len(self.centroids))
+        centroid_rows = np.broadcast_to(
+            np.arange(len(self.centroids)), (len(queries), len(self.centroids))
+        )
+        probes, _ = _best_k(centroid_rows, queries @ self.centroids.T, nprobe)
+
+        # Score each probed cluster against all the queries that probe it at once.
+        probing = np.repeat(np.arange(len(queries)), nprobe)[np.argsort(probes, axis=None)]
+        probe_counts = np.bincount(probes.ravel(), minlength=len(self.centroids))
+        probe_offsets = np.concatenate([[0], np.cumsum(probe_counts)])
+
+        all_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        vectors = self.vectors
+        for cluster in np.nonzero(probe_counts)[0]:
+            members = self._order[self._offsets[cluster] : self._offsets[cluster + 1]]
+            if not len(members):
+                continue
+            query_ids = probing[probe_offsets[cluster] : probe_offsets[cluster + 1]]
+            member_rows = np.broadcast_to(members, (len(query_ids), len(members)))
+            rows, scores = _best_k(
+                np.concatenate([all_rows[query_ids], member_rows], axis=1),
+                np.concatenate(
+                    [all_scores[query_ids], queries[query_ids] @ vectors[members].T], axis=1
+                ),
+                k,
+            )
+            all_rows[query_ids] = rows
+            all_scores[query_ids] = scores
+        return all_rows, all_scores
+
+    def save(self, directory: str | os.PathLike):
+        """Writes the index to `directory`, read it back with `vector_index.load`."""
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "vectors.npy", self.vectors)
+        passages = protos.GroundingPassages(
+            passages=[
+                protos.GroundingPassage(id=id, content=content)
+                for id, content in zip(self._ids, self._contents)
+            ]
+        )
+        (directory / "passages.pb").write_bytes(type(passages).serialize(passages))
+        if self.centroids is not None:
+            np.save(directory / "centroids.npy", self.centroids)
+            np.save(directory / "assignments.npy", self._assignments)
+
+        meta = {
+            "version": _FORMAT_VERSION,
+            "metric": self.metric,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+        }
+        (directory / "index.json").write_text(json.dumps(meta))
+
+
+def load(directory: str | os.PathLike, mmap: bool = True) -> VectorIndex:
+    """Reads an index written by `VectorIndex.save`.
+
+    Args:
+        directory: The directory the index was saved to.
+        mmap: If True, the vectors are memory mapped read-only instead of read into memory. They
+            are copied into memory if more vectors are added.
+    """
+    directory = pathlib.Path(directory)
+    meta = json.loads((directory / "index.json").read_text())
+    if meta.get("version") != _FORMAT_VERSION:
+        raise ValueError(
+            f"Invalid input: '{directory}' doesn't contain a supported index. Found: {meta}."
+        )
+    index = VectorIndex(metric=meta["metric"], nlist=meta["nlist"], nprobe=meta["nprobe"])
+
+    mmap_mode = "r" if mmap else None
+    vectors = np.load(directory / "vectors.npy", mmap_mode=mmap_mode)
+    if len(vectors):
+        index._vectors = vectors
+        index._count = len(vectors)
+
+    passages = protos.GroundingPassages.deserialize((directory / "passages.pb").read_bytes())
+    for passage in type(passages).pb(passages).passages:
+        index._ids.append(passage.id)
+        index._contents.append(
+            protos.Content(passage.content) if passage.HasField("content") else None
+        )
+
+    if (directory / "centroids.npy").exists():
+        index.centroids = np.load(directory / "centroids.npy")
+        index._assignments = np.load(directory / "assignments.npy", mmap_mode=mmap_mode)
+    return index
@@ -53,7 +53,18 @@ dependencies = [
 ]
 
 extras_require = {
-    "dev": ["absl-py", "black", "nose2", "pandas", "pytype", "pyyaml", "Pillow", "ipython"],
+    "dev": [
+        "absl-py",
+        "aiohttp",
+        "black",
+        "nose2",
+        "numpy",
+        "pandas",
+        "pytype",
+        "pyyaml",
+        "Pillow",
+        "ipython",
+    ],
 }
 
 url = "https://github.com/google/generative-ai-python"
@@ -1,4 +1,7 @@
 import os
+import pathlib
+import tempfile
+import threading
 from unittest import mock
 
 from absl.testing import absltest
@@ -136,6 +139,98 @@ class ClientTests(parameterized.TestCase):
         )
         self.assertEqual(cm1.default_metadata, cm2.default_metadata)
 
+    def test_discovery_api_is_cached(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.enter_context(
+            mock.patch.object(client, "DISCOVERY_CACHE_DIR", pathlib.Path(tempdir.name))
+        )
+        self.enter_context(mock.patch.dict(client._discovery_apis, clear=True))
+
+        fetches = []
+
+        def fetch_discovery_doc(self, api_key, metadata):
+            fetches.append(api_key)
+            discovery_doc = '{"fake": "discovery"}'
+            client._write_cached_discovery_doc(discovery_doc)
+            return discovery_doc
+
+        self.enter_context(
+            mock.patch.object(client.FileServiceClient, "_fetch_discovery_doc", fetch_discovery_doc)
+        )
+        build = self.enter_context(
+            mock.patch.object(client.googleapiclient.discovery, "build_from_document")
+        )
+
+        def setup():
+            file_client = client.FileServiceClient(client_options={"api_key": "AIzA_file"})
+            file_client._setup_discovery_api()
+            return file_client
+
+        threads = [threading.Thread(target=setup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        file_client = setup()
+
+        # One fetch and one build, shared by every client of the process.
+        self.assertEqual(["AIzA_file"], fetches)
+        build.assert_called_once_with('{"fake": "discovery"}', developerKey="AIzA_file")
+        self.assertIs(build.return_value, file_client._discovery_api)
+
+        # A new process reads the document from the disk.
+        client._discovery_apis.clear()
+        setup()
+        self.assertLen(fetches, 1)
+        self.assertEqual(2, build.call_count)
+
+        # Until it expires.
+        client._discovery_apis.clear()
+        with mock.patch.object(client, "DISCOVERY_CACHE_TTL", client.datetime.timedelta(0)):
+            setup()
+        self.assertLen(fetches, 2)
+
+        # A corrupt cache is ignored.
+        path = client._discovery_cache_path()
+        assert path is not None
+        path.write_text("{not json")
+        self.assertIsNone(client._read_cached_discovery_doc())
+
+    def test_discovery_fetch_only_blocks_its_api_key(self):
+        self.enter_context(mock.patch.object(client, "DISCOVERY_CACHE_DIR", None))
+        self.enter_context(mock.patch.dict(client._discovery_apis, clear=True))
+
+        fetching = threading.Event()
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def fetch_discovery_doc(self, api_key, metadata):
+            if api_key == "AIzA_slow":
+                fetching.set()
+                release.wait(timeout=5)
+            return "{}"
+
+        self.enter_context(
+            mock.patch.object(client.FileServiceClient, "_fetch_discovery_doc", fetch_discovery_doc)
+        )
+        self.enter_context(
+            mock.patch.object(client.googleapiclient.discovery, "build_from_document")
+        )
+
+        def setup(api_key):
+            client.FileServiceClient(client_options={"api_key": api_key})._setup_discovery_api()
+
+        slow = threading.Thread(target=setup, args=["AIzA_slow"])
+        slow.start()
+        self.assertTrue(fetching.wait(timeout=5))
+
+        setup("AIzA_fast")
+        self.assertTrue(slow.is_alive())
+        release.set()
+        slow.join()
+        self.assertCountEqual(["AIzA_slow", "AIzA_fast"], client._discovery_apis)
+
 
 if __name__ == "__main__":
     absltest.main()
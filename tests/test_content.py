@@ -13,19 +13,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import dataclasses
+import gc
 import enum
 import pathlib
 import typing_extensions
 from typing import Any, Union, Iterable
+import unittest.mock as mock
+import weakref
 
 from absl.testing import absltest
 from absl.testing import parameterized
 from google.generativeai import protos
+from google.generativeai import utils
 from google.generativeai.types import content_types
 import IPython.display
 import PIL.Image
 
 import numpy as np
+import pydantic
 
 HERE = pathlib.Path(__file__).parent
 TEST_PNG_PATH = HERE / "test_img.png"
@@ -523,6 +528,90 @@ class UnitTests(parameterized.TestCase):
         self.assertLen(tools, 1)
         self.assertLen(tools[0].function_declarations, 2)
 
+    def test_function_schema_is_cached(self):
+        def fun(a: int, b: str = "b"):
+            """Does something."""
+
+        with mock.patch.object(
+            pydantic, "create_model", side_effect=pydantic.create_model
+        ) as create_model:
+            fd1 = content_types.FunctionDeclaration.from_function(fun)
+            fd2 = content_types.FunctionDeclaration.from_function(fun)
+            self.assertEqual(create_model.call_count, 1)
+            self.assertEqual(fd1.to_proto(), fd2.to_proto())
+
+            # Different overrides are cached separately.
+            fd3 = content_types.FunctionDeclaration.from_function(fun, descriptions={"a": "An a."})
+            self.assertEqual(create_model.call_count, 2)
+            self.assertEqual(fd3.parameters.properties["a"].description, "An a.")
+
+            # Invalidated entries are regenerated.
+            fun.__doc__ = "Does something else."
+            content_types.clear_function_schema_cache(fun)
+            fd4 = content_types.FunctionDeclaration.from_function(fun)
+            self.assertEqual(create_model.call_count, 3)
+            self.assertEqual(fd4.description, "Does something else.")
+
+    def test_function_schema_cache_doesnt_keep_functions_alive(self):
+        class Tools:
+            def lookup(self, key: str):
+                """Looks up a key."""
+
+        class State(dict):
+            pass
+
+        def make_closure(state):
+            def closure(key: str):
+                """Looks up a key in the state."""
+                return state[key]
+
+            return closure
+
+        tools = Tools()
+        state = State(a=1)
+        content_types.FunctionDeclaration.from_function(tools.lookup)
+        content_types.FunctionDeclaration.from_function(make_closure(state))
+
+        tools_ref = weakref.ref(tools)
+        state_ref = weakref.ref(state)
+        del tools, state
+        gc.collect()
+        self.assertIsNone(tools_ref())
+        self.assertIsNone(state_ref())
+
+    def test_function_schema_cache_shares_bound_methods(self):
+        class Tools:
+            def lookup(self, key: str):
+                """Looks up a key."""
+
+        with mock.patch.object(
+            pydantic, "create_model", side_effect=pydantic.create_model
+        ) as create_model:
+            fd1 = content_types.FunctionDeclaration.from_function(Tools().lookup)
+            fd2 = content_types.FunctionDeclaration.from_function(Tools().lookup)
+            self.assertEqual(create_model.call_count, 1)
+            self.assertEqual(fd1.to_proto(), fd2.to_proto())
+            self.assertEqual(list(fd1.parameters.properties), ["key"])
+
+            # The unbound function takes `self`, it has its own entry.
+            fd3 = content_types.FunctionDeclaration.from_function(Tools.lookup)
+            self.assertEqual(create_model.call_count, 2)
+            self.assertCountEqual(fd3.parameters.properties, ["self", "key"])
+
+            content_types.clear_function_schema_cache(Tools().lookup)
+            content_types.FunctionDeclaration.from_function(Tools().lookup)
+            self.assertEqual(create_model.call_count, 3)
+
+    def test_function_schema_cache_is_bounded(self):
+        cache = utils.LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+
+        self.assertEqual(cache.keys(), ["a", "c"])
+        self.assertIsNone(cache.get("b"))
+
     @parameterized.named_parameters(
         ["int", int, protos.Schema(type=protos.Type.INTEGER)],
         ["float", float, protos.Schema(type=protos.Type.NUMBER)],
@@ -13,18 +13,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import copy
+import itertools
 import math
+import threading
+import time
 from typing import Any
 import unittest
 import unittest.mock as mock
 
+from google.api_core import exceptions
 from google.generativeai import protos
 
 from google.generativeai import embedding
+from google.generativeai import embedding_cache
 
 from google.generativeai import client
 from absl.testing import absltest
 from absl.testing import parameterized
+import numpy as np
 
 DEFAULT_EMB_MODEL = "models/embedding-001"
 
@@ -91,7 +97,7 @@ class UnitTests(parameterized.TestCase):
     def test_batch_embed_contents(self, batch_size):
         text = ["What are you?"]
         texts = text * batch_size
-        emb = embedding.embed_content(model=DEFAULT_EMB_MODEL, content=texts)
+        emb = embedding.embed_content(model=DEFAULT_EMB_MODEL, content=texts, deduplicate=False)
 
         self.assertIsInstance(emb, dict)
 
@@ -105,6 +111,274 @@ class UnitTests(parameterized.TestCase):
             math.ceil(len(texts) / embedding.EMBEDDING_MAX_BATCH_SIZE),
         )
 
+    def test_batch_embed_contents_concurrent(self):
+        lock = threading.Lock()
+        in_flight = 0
+        max_in_flight = 0
+
+        def batch_embed_contents(request, **kwargs):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            # Later batches finish first.
+            time.sleep(0.02 + 0.05 / (1 + int(request.requests[0].content.parts[0].text)))
+            with lock:
+                self.observed_requests.append(request)
+                in_flight -= 1
+            return protos.BatchEmbedContentsResponse(
+                embeddings=[
+                    protos.ContentEmbedding(values=[float(r.content.parts[0].text)])
+                    for r in request.requests
+                ]
+            )
+
+        self.client.batch_embed_contents = batch_embed_contents
+
+        texts = [str(i) for i in range(450)]
+        emb = embedding.embed_content(model=DEFAULT_EMB_MODEL, content=texts, max_concurrency=3)
+
+        self.assertEqual([[float(i)] for i in range(450)], emb["embedding"])
+        self.assertLen(self.observed_requests, 5)
+        self.assertEqual(3, max_in_flight)
+
+    def test_batch_embed_contents_invalid_max_concurrency(self):
+        with self.assertRaises(ValueError):
+            embedding.embed_content(model=DEFAULT_EMB_MODEL, content=["a", "b"], max_concurrency=0)
+
+    def test_embed_content_numpy(self):
+        emb = embedding.embed_content(
+            model=DEFAULT_EMB_MODEL, content="What are you?", output_format="numpy"
+        )
+
+        self.assertIsInstance(emb["embedding"], np.ndarray)
+        self.assertEqual(np.float32, emb["embedding"].dtype)
+        np.testing.assert_array_equal([1, 2, 3], emb["embedding"])
+
+    @parameterized.named_parameters(
+        ["list", list],
+        ["generator", lambda texts: (t for t in texts)],
+    )
+    def test_batch_embed_contents_numpy(self, make_content):
+        def batch_embed_contents(request, **kwargs):
+            self.observed_requests.append(request)
+            return protos.BatchEmbedContentsResponse(
+                embeddings=[
+                    protos.ContentEmbedding(values=[float(r.content.parts[0].text), 0.5])
+                    for r in request.requests
+                ]
+            )
+
+        self.client.batch_embed_contents = batch_embed_contents
+
+        texts = [str(i) for i in range(237)]
+        emb = embedding.embed_content(
+            model=DEFAULT_EMB_MODEL, content=make_content(texts), output_format="numpy"
+        )
+
+        self.assertEqual(np.float32, emb["embedding"].dtype)
+        self.assertTrue(emb["embedding"].flags.c_contiguous)
+        np.testing.assert_array_equal([[i, 0.5] for i in range(237)], emb["embedding"])
+        self.assertLen(self.observed_requests, 3)
+
+    def test_embed_content_invalid_output_format(self):
+        with self.assertRaises(ValueError):
+            embedding.embed_content(  # pytype: disable=wrong-arg-types
+                model=DEFAULT_EMB_MODEL, content="a", output_format="list"
+            )
+
+    def _echo_batch_embed_contents(self, request, **kwargs):
+        self.observed_requests.append(request)
+        return protos.BatchEmbedContentsResponse(
+            embeddings=[
+                protos.ContentEmbedding(values=[float(r.content.parts[0].text)])
+                for r in request.requests
+            ]
+        )
+
+    def test_iter_embed_content_is_lazy(self):
+        self.client.batch_embed_contents = self._echo_batch_embed_contents
+
+        # An unbounded corpus.
+        texts = (str(i) for i in itertools.count())
+        results = embedding.iter_embed_content(
+            model=DEFAULT_EMB_MODEL, content=texts, max_concurrency=2
+        )
+        first = list(itertools.islice(results, 250))
+
+        self.assertEqual([(i, [float(i)]) for i in range(250)], first)
+        # 3 batches were needed, at most one more was started.
+        self.assertLessEqual(len(self.observed_requests), 4)
+        results.close()  # pytype: disable=attribute-error
+
+    def test_iter_embed_content_batched_numpy(self):
+        self.client.batch_embed_contents = self._echo_batch_embed_contents
+
+        texts = [str(i) for i in range(237)]
+        results = list(
+            embedding.iter_embed_content(
+                model=DEFAULT_EMB_MODEL,
+                content=texts,
+                output_format="numpy",
+                batched=True,
+                max_concurrency=3,
+                ordered=False,
+            )
+        )
+
+        self.assertCountEqual([0, 100, 200], [start for start, _ in results])
+        for start, embeddings in results:
+            self.assertEqual(np.float32, embeddings.dtype)
+            np.testing.assert_array_equal(
+                np.arange(start, start + len(embeddings))[:, None], embeddings
+            )
+
+    def test_budget_batcher(self):
+        texts = ["a" * 600, "b" * 4, "c" * 4, "d" * 800, "e" * 4]
+        requests = [
+            protos.EmbedContentRequest(content=protos.Content(parts=[protos.Part(text=t)]))
+            for t in texts
+        ]
+
+        batcher = embedding.BudgetBatcher(max_requests=2, max_tokens=150)
+        batches = [[r.content.parts[0].text[0] for r in batch] for batch in batcher(requests)]
+
+        # "a" and "d" are over budget on their own.
+        self.assertEqual([["a"], ["b", "c"], ["d"], ["e"]], batches)
+
+        batcher = embedding.BudgetBatcher(max_bytes=500)
+        batches = [[r.content.parts[0].text[0] for r in batch] for batch in batcher(requests)]
+        self.assertEqual([["a"], ["b", "c"], ["d"], ["e"]], batches)
+
+    def test_batch_embed_contents_custom_batching(self):
+        texts = ["x" * 4000] * 3 + ["y"] * 10
+        emb = embedding.embed_content(
+            model=DEFAULT_EMB_MODEL,
+            content=texts,
+            batching=embedding.BudgetBatcher(max_tokens=2000),
+            deduplicate=False,
+        )
+
+        self.assertLen(emb["embedding"], 13)
+        self.assertEqual([1, 1, 11], [len(r.requests) for r in self.observed_requests])
+
+    def test_batch_embed_contents_splits_oversized_batches(self):
+        def batch_embed_contents(request, **kwargs):
+            if len(request.requests) > 30:
+                raise exceptions.InvalidArgument("Request payload size exceeds the limit.")
+            return self._echo_batch_embed_contents(request)
+
+        self.client.batch_embed_contents = batch_embed_contents
+
+        texts = [str(i) for i in range(150)]
+        emb = embedding.embed_content(model=DEFAULT_EMB_MODEL, content=texts)
+
+        self.assertEqual([[float(i)] for i in range(150)], emb["embedding"])
+        self.assertEqual(
+            [25, 25, 25, 25, 25, 25], [len(r.requests) for r in self.observed_requests]
+        )
+
+    def test_batch_embed_contents_does_not_split_other_errors(self):
+        calls = 0
+
+        def batch_embed_contents(request, **kwargs):
+            nonlocal calls
+            calls += 1
+            raise exceptions.InvalidArgument("API key not valid.")
+
+        self.client.batch_embed_contents = batch_embed_contents
+
+        with self.assertRaises(exceptions.InvalidArgument):
+            embedding.embed_content(model=DEFAULT_EMB_MODEL, content=["a", "b"])
+        self.assertEqual(1, calls)
+
+    @parameterized.named_parameters(["dict", "dict"], ["numpy", "numpy"])
+    def test_batch_embed_contents_cache(self, output_format):
+        self.client.batch_embed_contents = self._echo_batch_embed_contents
+        cache = embedding_cache.InMemoryEmbeddingCache()
+
+        embedding.embed_content(
+            model=DEFAULT_EMB_MODEL, content=["1", "3"], cache=cache, output_format=output_format
+        )
+        self.assertLen(cache, 2)
+
+        self.observed_requests.clear()
+        emb = embedding.embed_content(
+            model=DEFAULT_EMB_MODEL,
+            content=[str(i) for i in range(5)],
+            cache=cache,
+            output_format=output_format,
+        )
+
+        # Only the misses are sent.
+        self.assertLen(self.observed_requests, 1)
+        self.assertEqual(
+            ["0", "2", "4"],
+            [r.content.parts[0].text for r in self.observed_requests[0].requests],
+        )
+        self.assertEqual([[float(i)] for i in range(5)], np.asarray(emb["embedding"]).tolist())
+        self.assertLen(cache, 5)
+
+        self.observed_requests.clear()
+        embedding.embed_content(
+            model=DEFAULT_EMB_MODEL, content=["4", "2"], cache=cache, output_format=output_format
+        )
+        self.assertEmpty(self.observed_requests)
+
+    def test_embed_content_cache(self):
+        cache = embedding_cache.InMemoryEmbeddingCache()
+
+        first = embedding.embed_content(model=DEFAULT_EMB_MODEL, content="hello", cache=cache)
+        second = embedding.embed_content(model=DEFAULT_EMB_MODEL, content="hello", cache=cache)
+        # A different task type is a different key.
+        embedding.embed_content(
+            model=DEFAULT_EMB_MODEL, content="hello", task_type="clustering", cache=cache
+        )
+
+        self.assertEqual(first["embedding"], second["embedding"])
+        self.assertLen(self.observed_requests, 2)
+        self.assertLen(cache, 2)
+
+    @parameterized.named_parameters(["dict", "dict"], ["numpy", "numpy"])
+    def test_embed_content_cache_is_not_shared(self, output_format):
+        cache = {}
+
+        first = embedding.embed_content(
+            model=DEFAULT_EMB_MODEL, content="hello", cache=cache, output_format=output_format
+        )
+        expected = list(first["embedding"])
+        first["embedding"][0] = 99.0
+        second = embedding.embed_content(
+            model=DEFAULT_EMB_MODEL, content="hello", cache=cache, output_format=output_format
+        )
+
+        self.assertLen(self.observed_requests, 1)
+        self.assertEqual(expected, list(second["embedding"]))
+
+    @parameterized.named_parameters(["dict", "dict"], ["numpy", "numpy"])
+    def test_batch_embed_contents_deduplicates(self, output_format):
+        self.client.batch_embed_contents = self._echo_batch_embed_contents
+        embedding.clear_deduplication_info()
+
+        texts = ["1", "2", "1", {"parts": [{"text": "2"}]}, "3", "1"]
+        emb = embedding.embed_content(
+            model=DEFAULT_EMB_MODEL, content=texts, output_format=output_format
+        )
+
+        self.assertEqual(
+            ["1", "2", "3"], [r.content.parts[0].text for r in self.observed_requests[0].requests]
+        )
+        self.assertEqual(
+            [[1.0], [2.0], [1.0], [2.0], [3.0], [1.0]], np.asarray(emb["embedding"]).tolist()
+        )
+        self.assertEqual(
+            embedding.DeduplicationInfo(inputs=6, saved=3), embedding.deduplication_info()
+        )
+
+        if output_format == "dict":
+            # Duplicates don't share a list.
+            self.assertIsNot(emb["embedding"][0], emb["embedding"][2])
+
     def test_embed_content_title_and_task_1(self):
         text = "What are you?"
         emb = embedding.embed_content(
@@ -12,19 +12,24 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import copy
+import itertools
 import math
 from typing import Any
 import unittest
 import unittest.mock as mock
 
+from google.api_core import exceptions
 from google.generativeai import protos
 
 from google.generativeai import embedding
+from google.generativeai import embedding_cache
 
 from google.generativeai import client as client_lib
 from absl.testing import absltest
 from absl.testing import parameterized
+import numpy as np
 
 DEFAULT_EMB_MODEL = "models/embedding-001"
 
@@ -90,7 +95,9 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
     async def test_batch_embed_contents_async(self, batch_size):
         text = ["What are you?"]
         texts = text * batch_size
-        emb = await embedding.embed_content_async(model=DEFAULT_EMB_MODEL, content=texts)
+        emb = await embedding.embed_content_async(
+            model=DEFAULT_EMB_MODEL, content=texts, deduplicate=False
+        )
 
         self.assertIsInstance(emb, dict)
 
@@ -104,6 +111,133 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
             math.ceil(len(texts) / embedding.EMBEDDING_MAX_BATCH_SIZE),
         )
 
+    async def test_batch_embed_contents_async_concurrent(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def batch_embed_contents(request, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            # Later batches finish first.
+            await asyncio.sleep(0.02 + 0.05 / (1 + int(request.requests[0].content.parts[0].text)))
+            self.observed_requests.append(request)
+            in_flight -= 1
+            return protos.BatchEmbedContentsResponse(
+                embeddings=[
+                    protos.ContentEmbedding(values=[float(r.content.parts[0].text)])
+                    for r in request.requests
+                ]
+            )
+
+        self.client.batch_embed_contents = batch_embed_contents
+
+        texts = [str(i) for i in range(450)]
+        emb = await embedding.embed_content_async(
+            model=DEFAULT_EMB_MODEL, content=texts, max_concurrency=3
+        )
+
+        self.assertEqual([[float(i)] for i in range(450)], emb["embedding"])
+        self.assertLen(self.observed_requests, 5)
+        self.assertEqual(3, max_in_flight)
+
+    async def test_embed_content_async_numpy(self):
+        emb = await embedding.embed_content_async(
+            model=DEFAULT_EMB_MODEL, content="What are you?", output_format="numpy"
+        )
+
+        self.assertEqual(np.float32, emb["embedding"].dtype)
+        np.testing.assert_array_equal([1, 2, 3], emb["embedding"])
+
+    async def test_batch_embed_contents_async_numpy(self):
+        texts = ["What are you?"] * 237
+        emb = await embedding.embed_content_async(
+            model=DEFAULT_EMB_MODEL, content=texts, output_format="numpy"
+        )
+
+        self.assertEqual(np.float32, emb["embedding"].dtype)
+        np.testing.assert_array_equal(np.tile([1, 2, 3], (237, 1)), emb["embedding"])
+
+    async def test_iter_embed_content_async_is_lazy(self):
+        async def batch_embed_contents(request, **kwargs):
+            self.observed_requests.append(request)
+            return protos.BatchEmbedContentsResponse(
+                embeddings=[
+                    protos.ContentEmbedding(values=[float(r.content.parts[0].text)])
+                    for r in request.requests
+                ]
+            )
+
+        self.client.batch_embed_contents = batch_embed_contents
+
+        # An unbounded corpus.
+        texts = (str(i) for i in itertools.count())
+        results = embedding.iter_embed_content_async(
+            model=DEFAULT_EMB_MODEL, content=texts, max_concurrency=2
+        )
+        first = []
+        async for index, vector in results:
+            first.append((index, vector))
+            if len(first) == 250:
+                break
+        await results.aclose()  # pytype: disable=attribute-error
+
+        self.assertEqual([(i, [float(i)]) for i in range(250)], first)
+        self.assertLessEqual(len(self.observed_requests), 4)
+
+    async def test_batch_embed_contents_async_splits_oversized_batches(self):
+        sizes = []
+
+        async def batch_embed_contents(request, **kwargs):
+            sizes.append(len(request.requests))
+            if len(request.requests) > 30:
+                raise exceptions.InvalidArgument("Request payload size exceeds the limit.")
+            return protos.BatchEmbedContentsResponse(
+                embeddings=[
+                    protos.ContentEmbedding(values=[float(r.content.parts[0].text)])
+                    for r in request.requests
+                ]
+            )
+
+        self.client.batch_embed_contents = batch_embed_contents
+
+        texts = [str(i) for i in range(100)]
+        emb = await embedding.embed_content_async(model=DEFAULT_EMB_MODEL, content=texts)
+
+        self.assertEqual([[float(i)] for i in range(100)], emb["embedding"])
+        self.assertEqual([100, 50, 25, 25, 50, 25, 25], sizes)
+
+    async def test_batch_embed_contents_async_cache(self):
+        cache = embedding_cache.InMemoryEmbeddingCache()
+        await embedding.embed_content_async(
+            model=DEFAULT_EMB_MODEL, content=["a", "b"], cache=cache
+        )
+        self.observed_requests.clear()
+
+        emb = await embedding.embed_content_async(
+            model=DEFAULT_EMB_MODEL, content=["a", "c", "b"], cache=cache
+        )
+
+        self.assertEqual([[1, 2, 3]] * 3, emb["embedding"])
+        self.assertLen(self.observed_requests, 1)
+        self.assertEqual(
+            ["c"], [r.content.parts[0].text for r in self.observed_requests[0].requests]
+        )
+
+    async def test_batch_embed_contents_async_deduplicates(self):
+        embedding.clear_deduplication_info()
+        emb = await embedding.embed_content_async(
+            model=DEFAULT_EMB_MODEL, content=["a", "b", "a", "a"]
+        )
+
+        self.assertLen(emb["embedding"], 4)
+        self.assertEqual(
+            ["a", "b"], [r.content.parts[0].text for r in self.observed_requests[0].requests]
+        )
+        self.assertEqual(
+            embedding.DeduplicationInfo(inputs=4, saved=2), embedding.deduplication_info()
+        )
+
     async def test_embed_content_async_title_and_task_1(self):
         text = "What are you?"
         emb = await embedding.embed_content_async(
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pathlib
+import tempfile
+
+from google.generativeai import embedding_cache
+from google.generativeai import protos
+
+from absl.testing import absltest
+from absl.testing import parameterized
+import numpy as np
+
+
+class UnitTests(parameterized.TestCase):
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.tempdir = pathlib.Path(tempdir.name)
+
+    def _memmap_cache(self, **kwargs):
+        cache = embedding_cache.MemmapEmbeddingCache(self.tempdir / "cache", **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    @parameterized.named_parameters(
+        ["in-memory", lambda self: embedding_cache.InMemoryEmbeddingCache()],
+        ["memmap", lambda self: self._memmap_cache()],
+        ["memmap-no-memory", lambda self: self._memmap_cache(memory_cache_size=0)],
+    )
+    def test_mapping(self, make_cache):
+        cache = make_cache(self)
+
+        self.assertNotIn("a", cache)
+        cache["a"] = [1.0, 2.0]
+        cache["b"] = [3.0, 4.0]
+        np.testing.assert_array_equal(cache["a"], [1.0, 2.0])
+        self.assertLen(cache, 2)
+
+        del cache["a"]
+        with self.assertRaises(KeyError):
+            cache["a"]
+        self.assertEqual(list(cache), ["b"])
+
+    def test_in_memory_lru(self):
+        cache = embedding_cache.InMemoryEmbeddingCache(maxsize=2)
+        cache["a"] = [1.0]
+        cache["b"] = [2.0]
+        cache["a"]
+        cache["c"] = [3.0]
+
+        self.assertEqual(sorted(cache), ["a", "c"])
+
+    def test_embedding_key(self):
+        def request(**kwargs):
+            return protos.EmbedContentRequest(
+                model="models/text-embedding-004",
+                content=protos.Content(parts=[protos.Part(text="hello")]),
+                **kwargs,
+            )
+
+        key = embedding_cache.embedding_key(request())
+        self.assertEqual(key, embedding_cache.embedding_key(request()))
+        self.assertLen(key, 64)
+
+        for other in [
+            request(task_type="RETRIEVAL_DOCUMENT"),
+            request(task_type="RETRIEVAL_DOCUMENT", title="a title"),
+            request(output_dimensionality=256),
+            protos.EmbedContentRequest(
+                model="models/text-embedding-004",
+                content=protos.Content(parts=[protos.Part(text="hello!")]),
+            ),
+        ]:
+            self.assertNotEqual(key, embedding_cache.embedding_key(other))
+
+    def test_memmap_shared(self):
+        writer = self._memmap_cache()
+        reader = self._memmap_cache()
+
+        writer["a"] = [1.0, 2.0, 3.0]
+        # The reader maps the vectors file after it was written.
+        np.testing.assert_array_equal(reader["a"], [1.0, 2.0, 3.0])
+
+        writer["b"] = [4.0, 5.0, 6.0]
+        # The file grew, the reader remaps it.
+        np.testing.assert_array_equal(reader["b"], [4.0, 5.0, 6.0])
+
+        value = reader["a"]
+        self.assertEqual(np.float32, value.dtype)
+        self.assertIsInstance(value.base, np.memmap)
+        self.assertFalse(value.flags.writeable)
+
+        self.assertEqual(2 * 3 * 4, (self.tempdir / "cache" / "vectors.f32").stat().st_size)
+
+    def test_memmap_persistent(self):
+        cache = self._memmap_cache()
+        cache["a"] = [1.0, 2.0]
+        cache["a"] = [1.0, 2.0]
+        cache.close()
+
+        cache = self._memmap_cache()
+        np.testing.assert_array_equal(cache["a"], [1.0, 2.0])
+        self.assertEqual(2, cache.dim)
+        self.assertEqual(2 * 4, (self.tempdir / "cache" / "vectors.f32").stat().st_size)
+
+    def test_memmap_dimension_mismatch(self):
+        cache = self._memmap_cache()
+        cache["a"] = [1.0, 2.0]
+
+        with self.assertRaises(ValueError):
+            cache["b"] = [1.0, 2.0, 3.0]
+        self.assertNotIn("b", cache)
+
+
+if __name__ == "__main__":
+    absltest.main()
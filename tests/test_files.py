@@ -16,14 +16,22 @@ from __future__ import annotations
 
 from google.generativeai.types import file_types
 
+import asyncio
 import collections
 import datetime
+import hashlib
 import io
 import os
+import tempfile
 from typing import Iterable, Sequence
 import pathlib
+import unittest
+from unittest import mock
 
+import aiohttp.test_utils
+import aiohttp.web
 import google
+from google.api_core import exceptions
 
 import google.generativeai as genai
 from google.generativeai import client as client_lib
@@ -116,6 +124,97 @@ class UnitTests(parameterized.TestCase):
             f.video_metadata,
         )
 
+    def test_upload_files(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        paths = []
+        for i in range(5):
+            path = pathlib.Path(tempdir.name) / f"frame{i}.txt"
+            path.write_text(f"frame {i}")
+            paths.append(path)
+        paths.append(pathlib.Path(tempdir.name) / "missing.txt")
+
+        self.responses["list_files"].append(
+            [
+                protos.File(
+                    name="files/existing",
+                    sha256_hash=hashlib.sha256(b"frame 1").hexdigest().encode(),
+                    state="ACTIVE",
+                ),
+                protos.File(
+                    name="files/failed",
+                    sha256_hash=hashlib.sha256(b"frame 2").hexdigest().encode(),
+                    state="FAILED",
+                ),
+            ]
+        )
+
+        def create_file(path, *, display_name, **kwargs):
+            self.observed_requests.append(dict(path=path, display_name=display_name))
+            return protos.File(name=f"files/{path.stem}", display_name=display_name)
+
+        self.client.create_file = create_file
+
+        progress = []
+        results = genai.upload_files(paths, max_concurrency=3, progress=progress.append)
+
+        self.assertEqual(
+            ["files/frame0", "files/existing", "files/frame2", "files/frame3", "files/frame4"],
+            [f.name for f in results[:5]],  # pytype: disable=attribute-error
+        )
+        self.assertIsInstance(results[5], FileNotFoundError)
+        self.assertEqual(
+            {f"frame{i}.txt" for i in [0, 2, 3, 4]},
+            {r["display_name"] for r in self.observed_requests if isinstance(r, dict)},
+        )
+
+        self.assertLen(progress, 6)
+        self.assertEqual(6, progress[-1].files_done)
+        self.assertEqual(5 * len("frame 0"), progress[-1].bytes_done)
+        self.assertEqual([paths[1]], [p.path for p in progress if p.skipped])
+        self.assertEqual([paths[5]], [p.path for p in progress if p.error is not None])
+        self.assertEqual({len("frame 0"), 0}, {p.size for p in progress})
+
+    def test_upload_files_removed_after_upload(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        paths = []
+        for i in range(3):
+            path = pathlib.Path(tempdir.name) / f"frame{i}.txt"
+            path.write_text(f"frame {i}")
+            paths.append(path)
+
+        def create_file(path, **kwargs):
+            # For example a temporary file, cleaned up by another thread.
+            path.unlink()
+            return protos.File(name=f"files/{path.stem}")
+
+        self.client.create_file = create_file
+
+        progress = []
+        results = genai.upload_files(paths, skip_existing=False, progress=progress.append)
+
+        self.assertEqual(
+            [f"files/frame{i}" for i in range(3)],
+            [f.name for f in results],  # pytype: disable=attribute-error
+        )
+        self.assertEqual(3 * len("frame 0"), progress[-1].bytes_done)
+
+    def test_upload_files_without_skipping(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        path = pathlib.Path(tempdir.name) / "frame.txt"
+        path.write_text("frame")
+        self.responses["create_file"].append(protos.File(name="files/frame"))
+
+        results = genai.upload_files([path], skip_existing=False)
+
+        self.assertEqual(
+            ["files/frame"],
+            [f.name for f in results],  # pytype: disable=attribute-error
+        )
+        self.assertNotIn(protos.ListFilesRequest, [type(r) for r in self.observed_requests])
+
     @parameterized.named_parameters(
         [
             dict(
@@ -150,3 +249,180 @@ class UnitTests(parameterized.TestCase):
         response = genai.upload_file("test.webp")
 
         self.assertEqual("image/webp", self.observed_requests[0]["mime_type"])
+
+
+class FakeUploadServer:
+    """Implements the File API's resumable upload protocol."""
+
+    def __init__(self):
+        self.uploads = {}
+        self.requests = []
+        self.interrupt_at = set()
+        self.always_fail = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        app = aiohttp.web.Application()
+        app.router.add_post("/upload/v1beta/files", self.start)
+        app.router.add_post("/session/{id}", self.session)
+        self.server = aiohttp.test_utils.TestServer(app)
+
+    async def start(self, request):
+        self.requests.append(("start", dict(request.headers), await request.json()))
+        if request.query.get("key") != "test-key":
+            return aiohttp.web.Response(status=400, text="Bad key.")
+        upload_id = str(len(self.uploads))
+        self.uploads[upload_id] = dict(
+            data=bytearray(),
+            size=int(request.headers["X-Goog-Upload-Header-Content-Length"]),
+            file=(await request.json())["file"],
+        )
+        return aiohttp.web.Response(
+            headers={"X-Goog-Upload-URL": str(self.server.make_url(f"/session/{upload_id}"))}
+        )
+
+    async def session(self, request):
+        upload = self.uploads[request.match_info["id"]]
+        command = request.headers["X-Goog-Upload-Command"]
+        self.requests.append((command, dict(request.headers), None))
+        if command == "query":
+            return aiohttp.web.Response(
+                headers={
+                    "X-Goog-Upload-Status": "active",
+                    "X-Goog-Upload-Size-Received": str(len(upload["data"])),
+                }
+            )
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            offset = int(request.headers["X-Goog-Upload-Offset"])
+            assert offset == len(upload["data"]), (offset, len(upload["data"]))
+            body = await request.read()
+            assert len(body) == int(request.headers["Content-Length"])
+            await asyncio.sleep(0.01)
+            if self.always_fail:
+                return aiohttp.web.Response(status=503, text="Unavailable.")
+            if offset in self.interrupt_at:
+                # Only part of the chunk made it.
+                self.interrupt_at.remove(offset)
+                upload["data"] += body[: len(body) // 2]
+                return aiohttp.web.Response(status=503, text="Try again.")
+            upload["data"] += body
+        finally:
+            self.in_flight -= 1
+
+        if command == "upload, finalize":
+            assert len(upload["data"]) == upload["size"]
+            name = upload["file"].get("name", f"files/{request.match_info['id']}")
+            return aiohttp.web.json_response({"file": {"name": name}})
+        return aiohttp.web.Response()
+
+
+class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeUploadServer()
+        await self.server.server.start_server()
+        self.addAsyncCleanup(self.server.server.close)
+
+        self.enter_context(
+            mock.patch.object(
+                client_lib,
+                "GENAI_API_UPLOAD_URL",
+                str(self.server.server.make_url("/upload/v1beta/files")),
+            )
+        )
+        self.enter_context(mock.patch.object(client_lib, "UPLOAD_CHUNK_SIZE", 256 * 1024))
+        self.enter_context(mock.patch.object(client_lib, "_UPLOAD_BLOCK_SIZE", 64 * 1024))
+        self.enter_context(mock.patch.object(client_lib, "UPLOAD_RETRY_DELAY", 0))
+
+        self.client = client_lib.FileServiceAsyncClient(client_options={"api_key": "test-key"})
+
+        async def get_file(request, **kwargs):
+            return protos.File(name=request["name"], state="ACTIVE")
+
+        self.client.get_file = get_file
+        client_lib._client_manager.clients["file_async"] = self.client
+
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.tempdir = pathlib.Path(tempdir.name)
+
+    def make_file(self, name, size):
+        path = self.tempdir / name
+        path.write_bytes(os.urandom(size))
+        return path
+
+    async def test_upload_file_async(self):
+        path = self.make_file("video.mp4", 600 * 1024)
+
+        f = await genai.upload_file_async(path)
+
+        self.assertEqual("files/0", f.name)
+        self.assertEqual(path.read_bytes(), bytes(self.server.uploads["0"]["data"]))
+        self.assertEqual({"displayName": "video.mp4"}, self.server.uploads["0"]["file"])
+        start = self.server.requests[0][1]
+        self.assertEqual("video/mp4", start["X-Goog-Upload-Header-Content-Type"])
+        self.assertEqual(
+            ["start", "upload", "upload", "upload, finalize"],
+            [command for command, _, _ in self.server.requests],
+        )
+
+    async def test_upload_file_async_resumes(self):
+        path = self.make_file("video.mp4", 600 * 1024)
+        self.server.interrupt_at = {256 * 1024}
+
+        f = await genai.upload_file_async(path, name="my-video")
+
+        self.assertEqual("files/my-video", f.name)
+        self.assertEqual(path.read_bytes(), bytes(self.server.uploads["0"]["data"]))
+        self.assertEqual(
+            ["start", "upload", "upload", "query", "upload, finalize"],
+            [command for command, _, _ in self.server.requests],
+        )
+        # The upload resumed from the bytes the server received.
+        resumed = self.server.requests[4][1]
+        self.assertEqual(str(256 * 1024 + 128 * 1024), resumed["X-Goog-Upload-Offset"])
+
+    async def test_upload_file_async_gives_up(self):
+        path = self.make_file("video.mp4", 600 * 1024)
+        self.server.always_fail = True
+
+        with self.assertRaises(exceptions.ServiceUnavailable):
+            await genai.upload_file_async(path)
+
+        commands = [command for command, _, _ in self.server.requests]
+        self.assertEqual(client_lib.UPLOAD_MAX_RETRIES + 1, commands.count("upload"))
+        self.assertEqual(client_lib.UPLOAD_MAX_RETRIES, commands.count("query"))
+
+    async def test_upload_file_async_not_resumable(self):
+        path = self.make_file("video.mp4", 600 * 1024)
+
+        await genai.upload_file_async(path, resumable=False)
+        self.assertEqual(
+            ["start", "upload, finalize"], [command for command, _, _ in self.server.requests]
+        )
+
+        self.server.interrupt_at = {0}
+        with self.assertRaises(exceptions.ServiceUnavailable):
+            await genai.upload_file_async(path, resumable=False)
+
+    async def test_concurrent_uploads(self):
+        paths = [self.make_file(f"frame{i}.jpg", 300 * 1024 + i) for i in range(4)]
+
+        files = await asyncio.gather(*[genai.upload_file_async(path) for path in paths])
+
+        self.assertLen(files, 4)
+        for f, path in zip(files, paths):
+            upload = self.server.uploads[f.name.removeprefix("files/")]
+            self.assertEqual(path.read_bytes(), bytes(upload["data"]))
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    async def test_upload_file_async_errors(self):
+        self.client._client._client_options.api_key = "bad-key"
+        with self.assertRaises(exceptions.BadRequest):
+            await genai.upload_file_async(self.make_file("video.mp4", 10))
+
+        self.client._client._client_options.api_key = "test-key"
+        f = await genai.upload_file_async(io.BytesIO(b""), mime_type="text/plain")
+        self.assertEqual("files/0", f.name)
+        self.assertEqual(b"", bytes(self.server.uploads["0"]["data"]))
@@ -17,6 +17,7 @@ import inspect
 import json
 import string
 import textwrap
+from unittest import mock
 from typing_extensions import TypedDict
 
 from absl.testing import absltest
@@ -545,6 +546,114 @@ class UnitTests(parameterized.TestCase):
             type(response._result).to_dict(response._result),
         )
 
+    def test_stream_accumulator_matches_join_chunks(self):
+        chunks = [protos.GenerateContentResponse(candidates=cl) for cl in self.CANDIDATE_LISTS]
+        chunks.extend(
+            [
+                protos.GenerateContentResponse(
+                    {
+                        "candidates": [
+                            {
+                                "index": 0,
+                                "content": {
+                                    "parts": [
+                                        {"executable_code": {"language": "PYTHON", "code": "a = 1"}}
+                                    ]
+                                },
+                                "safety_ratings": [
+                                    {"category": "HARM_CATEGORY_DANGEROUS", "blocked": True}
+                                ],
+                            }
+                        ]
+                    }
+                ),
+                protos.GenerateContentResponse(
+                    {
+                        "candidates": [
+                            {
+                                "index": 0,
+                                "content": {
+                                    "parts": [
+                                        {"executable_code": {"code": "\nprint(a)"}},
+                                        {"code_execution_result": {"output": "1"}},
+                                    ]
+                                },
+                                "safety_ratings": [
+                                    {"category": "HARM_CATEGORY_DANGEROUS", "probability": "LOW"}
+                                ],
+                            }
+                        ]
+                    }
+                ),
+                protos.GenerateContentResponse(
+                    {
+                        "candidates": [
+                            {
+                                "index": 0,
+                                "content": {
+                                    "parts": [
+                                        {
+                                            "code_execution_result": {
+                                                "outcome": "OUTCOME_OK",
+                                                "output": "\n",
+                                            }
+                                        },
+                                        {"text": "Done."},
+                                    ]
+                                },
+                                "finish_reason": "STOP",
+                            }
+                        ],
+                        "usage_metadata": {"prompt_token_count": 5},
+                        "model_version": "gemini-1.5-flash-002",
+                    }
+                ),
+            ]
+        )
+
+        expected = chunks[0]
+        accumulator = generation_types._StreamAccumulator(chunks[0])
+        for chunk in chunks[1:]:
+            expected = generation_types._join_chunks([expected, chunk])
+            accumulator.add_chunk(chunk)
+            result = accumulator.result
+            self.assertEqual(type(expected).to_dict(expected), type(result).to_dict(result))
+
+    def test_stream_accumulation_doesnt_remerge(self):
+        # Re-merging the whole response for every chunk is quadratic in the length of the stream,
+        # see `benchmarks/stream_accumulation.py`.
+        num_chunks = 1000
+        chunks = (
+            protos.GenerateContentResponse(
+                {"candidates": [{"content": {"parts": [{"text": "x" * 200}]}}]}
+            )
+            for _ in range(num_chunks)
+        )
+        response = generation_types.GenerateContentResponse.from_iterator(chunks)
+
+        patch_to_proto = mock.patch.object(
+            generation_types._CandidateAccumulator,
+            "to_proto",
+            autospec=True,
+            side_effect=generation_types._CandidateAccumulator.to_proto,
+        )
+        with mock.patch.object(generation_types, "_join_chunks") as join_chunks:
+            with patch_to_proto as to_proto:
+                for _ in response:
+                    pass
+                to_proto.assert_not_called()
+
+                self.assertEqual(response.text, "x" * 200 * num_chunks)
+                self.assertEqual(response.text, "x" * 200 * num_chunks)
+
+        join_chunks.assert_not_called()
+        # Built once, when the result was first read.
+        to_proto.assert_called_once()
+        # The text was collected in a single part.
+        (candidate,) = response._accumulator._candidates.values()
+        self.assertLen(candidate.parts, 1)
+        self.assertLen(candidate.parts[0].fragments, num_chunks)
+
     def test_generate_content_response_multiple_iterators(self):
         chunks = [
             protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
@@ -575,6 +684,61 @@ class UnitTests(parameterized.TestCase):
         self.assertLen(parts, 1)
         self.assertEqual(parts[0].text, string.ascii_lowercase)
 
+    def test_generate_content_response_without_keeping_chunks(self):
+        chunks = [
+            protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
+            for a in string.ascii_lowercase
+        ]
+        response = generation_types.GenerateContentResponse.from_iterator(
+            iter(chunks), keep_chunks=False
+        )
+
+        # Only the lookahead chunk is held.
+        it1 = iter(response)
+        for i, chunk, a in zip(range(5), it1, string.ascii_lowercase):
+            self.assertEqual(a, chunk.text)
+            self.assertLen(response._chunks, 1)
+
+        # A new iterator continues where the last one stopped.
+        for i, chunk, a in zip(range(5), response, string.ascii_lowercase[5:]):
+            self.assertEqual(a, chunk.text)
+
+        # The old iterator can't go back to the dropped chunks.
+        with self.assertRaises(ValueError):
+            next(it1)
+
+        response.resolve()
+        self.assertEmpty(response._chunks)
+        self.assertEqual(response.text, string.ascii_lowercase)
+
+        # Once all the chunks are dropped they can't be iterated over again.
+        with self.assertRaises(ValueError):
+            list(response)
+
+    def test_generate_content_response_iter_text(self):
+        chunks = [
+            protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
+            for a in "abcd"
+        ]
+        chunks.append(protos.GenerateContentResponse({"usage_metadata": {"prompt_token_count": 5}}))
+        response = generation_types.GenerateContentResponse.from_iterator(iter(chunks))
+
+        self.assertEqual(list(response.iter_text()), ["a", "b", "c", "d"])
+
+        # The accumulated result is updated, and the chunks can be iterated again.
+        self.assertEqual(response.text, "abcd")
+        self.assertEqual(response.usage_metadata.prompt_token_count, 5)
+        self.assertEqual(list(response.iter_text()), ["a", "b", "c", "d"])
+
+    def test_generate_content_response_iter_text_multiple_candidates(self):
+        chunk = protos.GenerateContentResponse(
+            {"candidates": [{"index": 0}, {"index": 1}]},
+        )
+        response = generation_types.GenerateContentResponse.from_iterator(iter([chunk]))
+
+        with self.assertRaises(ValueError):
+            list(response.iter_text())
+
     def test_generate_content_response_resolve(self):
         chunks = [
             protos.GenerateContentResponse({"candidates": [{"content": {"parts": [{"text": a}]}}]})
@@ -4,12 +4,16 @@ import copy
 import datetime
 import pathlib
 import textwrap
+import threading
+import unittest.mock as mock
 from absl.testing import absltest
+import google.api_core.exceptions
 from absl.testing import parameterized
 from google.generativeai import protos
 from google.generativeai import client as client_lib
 from google.generativeai import generative_models
 from google.generativeai import caching
+from google.generativeai import response_cache
 from google.generativeai.types import content_types
 from google.generativeai.types import generation_types
 from google.generativeai.types import helper_types
@@ -44,6 +48,9 @@ class MockGenerativeServiceClient:
         self.observed_requests = []
         self.observed_kwargs = []
         self.responses = collections.defaultdict(list)
+        self.cache_expire_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+            hours=1
+        )
 
     def generate_content(
         self,
@@ -92,6 +99,32 @@ class MockGenerativeServiceClient:
             expire_time="2000-01-01T01:01:01.123456Z",
         )
 
+    def create_cached_content(
+        self,
+        request: protos.CreateCachedContentRequest,
+        **kwargs,
+    ) -> protos.CachedContent:
+        self.observed_requests.append(request)
+        cached_content = protos.CachedContent(request.cached_content)
+        cached_content.name = "cachedContents/auto-cached-content"
+        cached_content.expire_time = self.cache_expire_time
+        return cached_content
+
+    def update_cached_content(
+        self,
+        request: protos.UpdateCachedContentRequest,
+        **kwargs,
+    ) -> protos.CachedContent:
+        self.observed_requests.append(request)
+        return request.cached_content
+
+    def delete_cached_content(
+        self,
+        request: protos.DeleteCachedContentRequest,
+        **kwargs,
+    ) -> None:
+        self.observed_requests.append(request)
+
 
 class CUJTests(parameterized.TestCase):
     """Tests are in order with the design doc."""
@@ -453,6 +486,24 @@ class CUJTests(parameterized.TestCase):
 
         self.assertEqual("".join(chunk.text for chunk in response), "xyz")
 
+    def test_chat_streaming_without_keeping_chunks(self):
+        self.responses["stream_generate_content"] = [
+            iter([simple_response("a"), simple_response("b"), simple_response("c")]),
+        ]
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+        chat = model.start_chat()
+
+        response = chat.send_message("letters?", stream=True, keep_chunks=False)
+
+        self.assertEqual("".join(chunk.text for chunk in response), "abc")
+        self.assertEmpty(response._chunks)
+        self.assertEqual(response.text, "abc")
+        self.assertEqual(chat.history[1].parts[0].text, "abc")
+
+        with self.assertRaises(ValueError):
+            list(response)
+
     def test_chat_incomplete_streaming_errors(self):
         # Chat streaming
         self.responses["stream_generate_content"] = [
@@ -707,6 +758,422 @@ class CUJTests(parameterized.TestCase):
             self.assertLen(obr.tools, 1)
             self.assertEqual(type(obr.tools[0]).to_dict(obr.tools[0]), tools)
 
+    def test_chat_parallel_function_calls(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def add(a: int, b: int):
+            barrier.wait()
+            return a + b
+
+        def mul(a: int, b: int):
+            barrier.wait()
+            return a * b
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[add, mul])
+        self.responses["generate_content"] = [
+            protos.GenerateContentResponse(
+                {
+                    "candidates": [
+                        {
+                            "content": {
+                                "role": "model",
+                                "parts": [
+                                    {"function_call": {"name": "mul", "args": {"a": 2, "b": 3}}},
+                                    {"function_call": {"name": "add", "args": {"a": 2, "b": 3}}},
+                                ],
+                            }
+                        }
+                    ]
+                }
+            ),
+            simple_response("done"),
+        ]
+
+        chat = model.start_chat(
+            enable_automatic_function_calling=True, parallel_function_calls=True
+        )
+        response = chat.send_message("Hello")
+
+        self.assertEqual(response.text, "done")
+        function_responses = chat.history[2].parts
+        self.assertEqual([fr.function_response.name for fr in function_responses], ["mul", "add"])
+        self.assertEqual(
+            [fr.function_response.response["result"] for fr in function_responses], [6, 5]
+        )
+
+    def test_chat_streaming_automatic_function_calling(self):
+        def add(a: int, b: int):
+            return a + b
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[add])
+        self.responses["stream_generate_content"] = [
+            iter(
+                [
+                    simple_response("Let me add. "),
+                    protos.GenerateContentResponse(
+                        {
+                            "candidates": [
+                                {
+                                    "content": {
+                                        "role": "model",
+                                        "parts": [
+                                            {
+                                                "function_call": {
+                                                    "name": "add",
+                                                    "args": {"a": 2, "b": 3},
+                                                }
+                                            }
+                                        ],
+                                    }
+                                }
+                            ]
+                        }
+                    ),
+                ]
+            ),
+            iter([simple_response("It is "), simple_response("5.")]),
+        ]
+
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        response = chat.send_message("What is 2 + 3?", stream=True)
+        texts = [chunk.text for chunk in response]
+
+        self.assertEqual(texts, ["Let me add. ", "It is ", "5."])
+        self.assertEqual(response.text, "Let me add. It is 5.")
+        self.assertEqual(len(self.observed_requests), 2)
+        self.assertLen(self.observed_requests[1].contents, 3)
+
+        history = chat.history
+        self.assertEqual([c.role for c in history], ["user", "model", "user", "model"])
+        self.assertEqual(history[1].parts[0].text, "Let me add. ")
+        self.assertEqual(history[1].parts[1].function_call.name, "add")
+        self.assertEqual(history[2].parts[0].function_response.response["result"], 5)
+        self.assertEqual(history[3].parts[0].text, "It is 5.")
+
+    def test_chat_streaming_function_calls_first(self):
+        calls = []
+
+        def add(a: int, b: int):
+            calls.append((a, b))
+            return a + b
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[add])
+        self.responses["stream_generate_content"] = [
+            iter(
+                [
+                    protos.GenerateContentResponse(
+                        {
+                            "candidates": [
+                                {
+                                    "content": {
+                                        "role": "model",
+                                        "parts": [
+                                            {
+                                                "function_call": {
+                                                    "name": "add",
+                                                    "args": {"a": 2, "b": 3},
+                                                }
+                                            }
+                                        ],
+                                    }
+                                }
+                            ]
+                        }
+                    ),
+                ]
+            ),
+            iter([simple_response("It is "), simple_response("5.")]),
+        ]
+
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        response = chat.send_message("What is 2 + 3?", stream=True)
+
+        # The function is only called once the caller iterates.
+        self.assertEmpty(calls)
+        self.assertLen(self.observed_requests, 1)
+
+        texts = [chunk.text for chunk in response]
+        self.assertEqual(texts, ["It is ", "5."])
+        self.assertEqual([(2, 3)], calls)
+        self.assertEqual(response.text, "It is 5.")
+        self.assertEqual([c.role for c in chat.history], ["user", "model", "user", "model"])
+
+    def test_chat_streaming_afc_empty_response(self):
+        def add(a: int, b: int):
+            return a + b
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[add])
+        self.responses["stream_generate_content"] = [iter([])]
+
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        response = chat.send_message("Hello", stream=True)
+
+        self.assertEmpty(list(response))
+        self.assertEmpty(response.candidates)
+        with self.assertRaises(generation_types.BrokenResponseError):
+            chat.history
+        chat.rewind()
+        self.assertEmpty(chat.history)
+
+    def test_chat_streaming_uncallable_function_call(self):
+        tools = dict(function_declarations=[dict(name="add", description="Adds two numbers.")])
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=tools)
+        self.responses["stream_generate_content"] = [
+            iter(
+                [
+                    simple_response("Let me add. "),
+                    protos.GenerateContentResponse(
+                        {
+                            "candidates": [
+                                {
+                                    "content": {
+                                        "role": "model",
+                                        "parts": [
+                                            {
+                                                "function_call": {
+                                                    "name": "add",
+                                                    "args": {"a": 2, "b": 3},
+                                                }
+                                            }
+                                        ],
+                                    }
+                                }
+                            ]
+                        }
+                    ),
+                ]
+            ),
+        ]
+
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        response = chat.send_message("What is 2 + 3?", stream=True)
+        response.resolve()
+
+        self.assertEqual(len(self.observed_requests), 1)
+        self.assertEqual(response.parts[-1].function_call.name, "add")
+        self.assertLen(chat.history, 2)
+
+    def test_prepare_request_copies_contents(self):
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+        history = [
+            content_types.to_content("hello"),
+            content_types.to_content({"role": "model", "parts": ["hi"]}),
+            content_types.to_content(["look", PIL.Image.new("RGB", (4, 4))]),
+        ]
+
+        request = model._prepare_request(contents=history, tools=None, tool_config=None)
+        self.assertEqual(history, list(request.contents))
+
+        history[0].parts[0].text = "bye"
+        self.assertEqual("hello", request.contents[0].parts[0].text)
+
+    def test_chat_history_edited_in_place(self):
+        self.responses["generate_content"] = [
+            simple_response("first"),
+            simple_response("second"),
+            simple_response("third"),
+        ]
+        chat = generative_models.GenerativeModel("gemini-1.5-flash").start_chat()
+
+        chat.send_message("yes")
+        chat.history[0].parts[0].text = "no!"
+        chat.send_message("again")
+        self.assertEqual("no!", self.observed_requests[-1].contents[0].parts[0].text)
+
+        # Reading the history doesn't change what's sent.
+        self.assertEqual("again", chat.history[2].parts[0].text)
+        chat.send_message("and again")
+        self.assertEqual(
+            ["no!", "first", "again", "second", "and again"],
+            [c.parts[0].text for c in self.observed_requests[-1].contents],
+        )
+
+    def _response_with_usage(self, text, total_token_count):
+        response = simple_response(text)
+        response.usage_metadata.total_token_count = total_token_count
+        return response
+
+    def test_chat_auto_cache(self):
+        model = generative_models.GenerativeModel(
+            "gemini-1.5-flash-002", system_instruction="Be brief."
+        )
+        chat = generative_models.ChatSession(model, auto_cache=True, auto_cache_min_tokens=100)
+        self.responses["generate_content"] = [
+            self._response_with_usage("1", 60),
+            self._response_with_usage("2", 150),
+            self._response_with_usage("3", 200),
+            self._response_with_usage("4", 240),
+            self._response_with_usage("5", 260),
+        ]
+
+        chat.send_message("a")
+        chat.send_message("b")
+        self.assertLen(self.observed_requests, 2)
+        self.assertLen(self.observed_requests[-1].contents, 3)
+
+        # The history reached 150 tokens: it's cached, only the new message is sent.
+        chat.send_message("c")
+        create, request = self.observed_requests[-2:]
+        self.assertIsInstance(create, protos.CreateCachedContentRequest)
+        self.assertLen(create.cached_content.contents, 4)
+        self.assertEqual(create.cached_content.system_instruction.parts[0].text, "Be brief.")
+        self.assertEqual(request.cached_content, "cachedContents/auto-cached-content")
+        self.assertEqual([c.parts[0].text for c in request.contents], ["c"])
+        self.assertFalse(request.system_instruction.parts)
+
+        # The turns added after the cache are sent along.
+        chat.send_message("d")
+        request = self.observed_requests[-1]
+        self.assertEqual([c.parts[0].text for c in request.contents], ["c", "3", "d"])
+
+        # Once the cache expires, the whole history is sent.
+        generate_content = self.client.generate_content
+
+        def expired_cache_generate_content(request, **kwargs):
+            if request.cached_content:
+                raise google.api_core.exceptions.PermissionDenied("CachedContent not found")
+            return generate_content(request, **kwargs)
+
+        self.client.generate_content = expired_cache_generate_content
+        response = chat.send_message("e")
+        self.assertEqual(response.text, "5")
+        request = self.observed_requests[-1]
+        self.assertLen(request.contents, 9)
+        self.assertEqual(request.system_instruction.parts[0].text, "Be brief.")
+        self.assertLen(chat.history, 10)
+
+    @parameterized.named_parameters(
+        ["unsupported", google.api_core.exceptions.InvalidArgument("Not supported."), 1],
+        ["not_found", google.api_core.exceptions.NotFound("Model not found."), 1],
+        ["transient", google.api_core.exceptions.ServiceUnavailable("Try again."), 3],
+    )
+    def test_chat_auto_cache_create_fails(self, error, attempts):
+        def create_cached_content(request, **kwargs):
+            self.observed_requests.append(request)
+            raise error
+
+        self.client.create_cached_content = create_cached_content
+        model = generative_models.GenerativeModel("gemini-1.5-flash-002")
+        chat = generative_models.ChatSession(model, auto_cache=True, auto_cache_min_tokens=100)
+        self.responses["generate_content"] = [
+            self._response_with_usage(str(i), 150 + i) for i in range(4)
+        ]
+
+        with mock.patch.object(generative_models._logger, "warning") as warning:
+            for message in "abcd":
+                chat.send_message(message)
+
+        creates = [
+            r for r in self.observed_requests if isinstance(r, protos.CreateCachedContentRequest)
+        ]
+        self.assertLen(creates, attempts)
+        # Disabling the cache is logged once.
+        self.assertEqual(1 if attempts == 1 else 0, warning.call_count)
+        # The whole history is sent.
+        self.assertLen(self.observed_requests[-1].contents, 7)
+        self.assertFalse(self.observed_requests[-1].cached_content)
+
+    def test_chat_auto_cache_refreshes_ttl(self):
+        self.client.cache_expire_time = datetime.datetime.now(
+            datetime.timezone.utc
+        ) + datetime.timedelta(minutes=10)
+        model = generative_models.GenerativeModel("gemini-1.5-flash-002")
+        chat = generative_models.ChatSession(
+            model,
+            history=[{"role": "user", "parts": ["a"]}, {"role": "model", "parts": ["b"]}],
+            auto_cache=True,
+            auto_cache_min_tokens=100,
+        )
+        self.responses["count_tokens"] = [protos.CountTokensResponse(total_tokens=150)]
+        self.responses["generate_content"] = [
+            self._response_with_usage("1", 160),
+            self._response_with_usage("2", 170),
+        ]
+
+        chat.send_message("c")
+        self.assertIsInstance(self.observed_requests[0], protos.CountTokensRequest)
+        self.assertIsInstance(self.observed_requests[1], protos.CreateCachedContentRequest)
+
+        chat.send_message("d")
+        update = self.observed_requests[-2]
+        self.assertIsInstance(update, protos.UpdateCachedContentRequest)
+        self.assertEqual(update.update_mask.paths, ["ttl"])
+        self.assertEqual(self.observed_requests[-1].cached_content, update.cached_content.name)
+
+        # Editing the cached turns replaces the cache.
+        chat.history[0] = content_types.to_content("edited")
+        self.responses["generate_content"].append(self._response_with_usage("3", 180))
+        chat.send_message("e")
+        delete, create, request = self.observed_requests[-3:]
+        self.assertIsInstance(delete, protos.DeleteCachedContentRequest)
+        self.assertEqual(create.cached_content.contents[0].parts[0].text, "edited")
+        self.assertEqual([c.parts[0].text for c in request.contents], ["e"])
+
+    def test_response_cache(self):
+        cache = response_cache.InMemoryResponseCache()
+        model = generative_models.GenerativeModel("gemini-1.5-flash", response_cache=cache)
+        self.responses["generate_content"] = [simple_response("first"), simple_response("second")]
+
+        self.assertEqual(model.generate_content("hello").text, "first")
+        self.assertEqual(model.generate_content("hello").text, "first")
+        self.assertEqual(model.generate_content("hello", tools=[noop]).text, "second")
+
+        self.assertLen(self.observed_requests, 2)
+        self.assertEqual(model.response_cache_info(), response_cache.CacheInfo(hits=1, misses=2))
+        self.assertLen(cache, 2)
+
+    def test_response_cache_skips_streaming(self):
+        cache = {}
+        model = generative_models.GenerativeModel("gemini-1.5-flash", response_cache=cache)
+        self.responses["stream_generate_content"] = [iter([simple_response("first")])]
+
+        model.generate_content("hello", stream=True).resolve()
+
+        self.assertEmpty(cache)
+        self.assertEqual(model.response_cache_info(), response_cache.CacheInfo(hits=0, misses=0))
+
+    def test_compile_request(self):
+        model = generative_models.GenerativeModel(
+            "gemini-1.5-flash", generation_config={"temperature": 0.5}
+        )
+        template = model.compile_request(tools=[noop], generation_config={"max_output_tokens": 5})
+
+        self.responses["generate_content"] = [simple_response("a"), simple_response("b")]
+        model.generate_content("Hello", request_template=template)
+        model.generate_content("Hello again", request_template=template)
+
+        for request, text in zip(self.observed_requests, ["Hello", "Hello again"]):
+            self.assertEqual(request.contents[0].parts[0].text, text)
+            self.assertEqual(request.tools[0].function_declarations[0].name, "noop")
+            self.assertEqual(request.generation_config.max_output_tokens, 5)
+            self.assertAlmostEqual(request.generation_config.temperature, 0.5)
+
+        # The template itself is not modified.
+        self.assertEmpty(template.contents)
+
+        with self.assertRaises(ValueError):
+            model.generate_content("Hello", request_template=template, tools=[noop])
+
+    def test_default_request_template_is_reused(self):
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[noop])
+        self.responses["generate_content"] = [simple_response(c) for c in "abc"]
+
+        with mock.patch.object(
+            content_types.FunctionLibrary,
+            "to_proto",
+            autospec=True,
+            side_effect=content_types.FunctionLibrary.to_proto,
+        ) as to_proto:
+            model.generate_content("Hello")
+            chat = model.start_chat()
+            chat.send_message("Hello")
+            chat.send_message("Hello again")
+
+        to_proto.assert_called_once()
+        for request in self.observed_requests:
+            self.assertEqual(request.tools[0].function_declarations[0].name, "noop")
+        self.assertLen(self.observed_requests[-1].contents, 3)
+
     @parameterized.named_parameters(
         dict(
             testcase_name="test_FunctionCallingMode_str",
@@ -853,6 +1320,65 @@ class CUJTests(parameterized.TestCase):
             {"total_tokens": 7},
         )
 
+    def _echo_generate_content(self, request, **kwargs):
+        text = request.contents[-1].parts[0].text
+        if text == "fail":
+            raise ValueError("Failed: " + text)
+        return simple_response(text.upper())
+
+    def test_generate_content_batch(self):
+        self.client.generate_content = self._echo_generate_content
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+
+        prompts = ["a", "b", "fail", "c"]
+        results = list(model.generate_content_batch(iter(prompts), max_concurrency=2))
+
+        self.assertEqual([index for index, _ in results], [0, 1, 2, 3])
+        self.assertEqual(results[0][1].text, "A")
+        self.assertEqual(results[1][1].text, "B")
+        self.assertIsInstance(results[2][1], ValueError)
+        self.assertEqual(results[3][1].text, "C")
+
+    def test_generate_content_batch_keeps_starting_behind_a_slow_request(self):
+        started = []
+        behind_slow = threading.Event()
+        started_before_slow_returned = []
+
+        def generate_content(request, **kwargs):
+            text = request.contents[-1].parts[0].text
+            if text == "slow":
+                behind_slow.wait(timeout=5)
+                started_before_slow_returned.extend(started)
+            else:
+                started.append(text)
+                if len(started) == 3:
+                    behind_slow.set()
+            return simple_response(text.upper())
+
+        self.client.generate_content = generate_content
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+
+        prompts = ["slow", "a", "b", "c", "d"]
+        results = list(model.generate_content_batch(prompts, max_concurrency=2))
+
+        # With 2 in flight, 3 requests can finish behind the slow one before it's yielded.
+        self.assertEqual(started_before_slow_returned, ["a", "b", "c"])
+        self.assertEqual([r.text for _, r in results], ["SLOW", "A", "B", "C", "D"])
+
+    def test_generate_content_batch_unordered(self):
+        self.client.generate_content = self._echo_generate_content
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+
+        prompts = [str(n) for n in range(20)]
+        results = dict(model.generate_content_batch(prompts, max_concurrency=4, ordered=False))
+
+        self.assertEqual({index: r.text for index, r in results.items()}, dict(enumerate(prompts)))
+
+    def test_generate_content_batch_bad_concurrency(self):
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+        with self.assertRaises(ValueError):
+            list(model.generate_content_batch(["a"], max_concurrency=0))
+
     def test_repr_for_unary_non_streamed_response(self):
         model = generative_models.GenerativeModel(model_name="gemini-1.5-flash")
         self.responses["generate_content"].append(simple_response("world!"))
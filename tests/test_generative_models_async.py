@@ -13,8 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import collections
+import datetime
 import sys
+import threading
 from collections.abc import Iterable
 import os
 from typing import Any
@@ -24,6 +27,7 @@ import unittest
 from google.generativeai import client as client_lib
 from google.generativeai import generative_models
 from google.generativeai.types import content_types
+from google.generativeai.types import generation_types
 from google.generativeai import protos
 
 from absl.testing import absltest
@@ -110,6 +114,21 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
 
         self.assertEqual(response.text, "world!")
 
+    async def test_streaming_aiter_text(self):
+        model = generative_models.GenerativeModel(model_name="gemini-1.5-flash")
+
+        async def responses():
+            for c in "world!":
+                yield simple_response(c)
+
+        self.responses["stream_generate_content"] = [responses()]
+
+        response = await model.generate_content_async("Hello", stream=True)
+
+        texts = [text async for text in response.aiter_text()]
+        self.assertEqual(texts, list("world!"))
+        self.assertEqual(response.text, "world!")
+
     @parameterized.named_parameters(
         dict(
             testcase_name="test_FunctionCallingMode_str",
@@ -221,6 +240,308 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
             {"total_tokens": 7},
         )
 
+    async def test_generate_content_batch(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def generate_content(request, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+
+            text = request.contents[-1].parts[0].text
+            if text == "fail":
+                raise ValueError("Failed: " + text)
+            return simple_response(text.upper())
+
+        self.client.generate_content = generate_content
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+
+        prompts = ["a", "b", "fail", "c", "d"]
+        results = [r async for r in model.generate_content_batch_async(prompts, max_concurrency=2)]
+
+        self.assertEqual(max_in_flight, 2)
+        self.assertEqual([index for index, _ in results], [0, 1, 2, 3, 4])
+        self.assertEqual(results[0][1].text, "A")
+        self.assertIsInstance(results[2][1], ValueError)
+        self.assertEqual(results[4][1].text, "D")
+
+    async def test_generate_content_batch_keeps_starting_behind_a_slow_request(self):
+        started = []
+        behind_slow = asyncio.Event()
+        started_before_slow_returned = []
+
+        async def generate_content(request, **kwargs):
+            text = request.contents[-1].parts[0].text
+            if text == "slow":
+                try:
+                    await asyncio.wait_for(behind_slow.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
+                started_before_slow_returned.extend(started)
+            else:
+                started.append(text)
+                if len(started) == 3:
+                    behind_slow.set()
+            return simple_response(text.upper())
+
+        self.client.generate_content = generate_content
+        model = generative_models.GenerativeModel("gemini-1.5-flash")
+
+        prompts = ["slow", "a", "b", "c", "d"]
+        results = [r async for r in model.generate_content_batch_async(prompts, max_concurrency=2)]
+
+        # With 2 in flight, 3 requests can finish behind the slow one before it's yielded.
+        self.assertEqual(started_before_slow_returned, ["a", "b", "c"])
+        self.assertEqual([r.text for _, r in results], ["SLOW", "A", "B", "C", "D"])
+
+    async def test_chat_parallel_function_calls(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def lookup(key: str):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return key.upper()
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[lookup])
+        self.responses["generate_content"] = [
+            protos.GenerateContentResponse(
+                {
+                    "candidates": [
+                        {
+                            "content": {
+                                "role": "model",
+                                "parts": [
+                                    {"function_call": {"name": "lookup", "args": {"key": key}}}
+                                    for key in "abc"
+                                ],
+                            }
+                        }
+                    ]
+                }
+            ),
+            simple_response("done"),
+        ]
+
+        chat = model.start_chat(
+            enable_automatic_function_calling=True, parallel_function_calls=True
+        )
+        response = await chat.send_message_async("Hello")
+
+        self.assertEqual(response.text, "done")
+        self.assertEqual(max_in_flight, 3)
+        function_responses = chat.history[2].parts
+        self.assertEqual(
+            [fr.function_response.response["result"] for fr in function_responses],
+            ["A", "B", "C"],
+        )
+
+    @parameterized.named_parameters(
+        ["sequential", False],
+        ["parallel", True],
+    )
+    async def test_chat_sync_function_calls_thread(self, parallel_function_calls):
+        threads = []
+
+        def lookup(key: str):
+            threads.append(threading.get_ident())
+            return key.upper()
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[lookup])
+        self.responses["generate_content"] = [
+            protos.GenerateContentResponse(
+                {
+                    "candidates": [
+                        {
+                            "content": {
+                                "role": "model",
+                                "parts": [
+                                    {"function_call": {"name": "lookup", "args": {"key": key}}}
+                                    for key in "ab"
+                                ],
+                            }
+                        }
+                    ]
+                }
+            ),
+            simple_response("done"),
+        ]
+
+        chat = model.start_chat(
+            enable_automatic_function_calling=True,
+            parallel_function_calls=parallel_function_calls,
+        )
+        response = await chat.send_message_async("Hello")
+
+        self.assertEqual(response.text, "done")
+        loop_thread = threading.get_ident()
+        self.assertLen(threads, 2)
+        for thread in threads:
+            # Only parallel calls are moved to worker threads.
+            if parallel_function_calls:
+                self.assertNotEqual(thread, loop_thread)
+            else:
+                self.assertEqual(thread, loop_thread)
+
+    async def test_chat_streaming_automatic_function_calling(self):
+        async def add(a: int, b: int):
+            await asyncio.sleep(0)
+            return a + b
+
+        async def stream(*responses):
+            for response in responses:
+                yield response
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[add])
+        self.responses["stream_generate_content"] = [
+            stream(
+                simple_response("Let me add. "),
+                protos.GenerateContentResponse(
+                    {
+                        "candidates": [
+                            {
+                                "content": {
+                                    "role": "model",
+                                    "parts": [
+                                        {"function_call": {"name": "add", "args": {"a": 2, "b": 3}}}
+                                    ],
+                                }
+                            }
+                        ]
+                    }
+                ),
+            ),
+            stream(simple_response("It is "), simple_response("5.")),
+        ]
+
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        response = await chat.send_message_async("What is 2 + 3?", stream=True)
+        texts = [chunk.text async for chunk in response]
+
+        self.assertEqual(texts, ["Let me add. ", "It is ", "5."])
+        history = chat.history
+        self.assertEqual([c.role for c in history], ["user", "model", "user", "model"])
+        self.assertEqual(history[2].parts[0].function_response.response["result"], 5)
+        self.assertEqual(history[3].parts[0].text, "It is 5.")
+
+    async def test_chat_auto_cache(self):
+        cache_client = unittest.mock.MagicMock()
+        client_lib._client_manager.clients["cache_async"] = cache_client
+        create_requests = []
+
+        async def create_cached_content(request, **kwargs):
+            create_requests.append(request)
+            cached_content = protos.CachedContent(request.cached_content)
+            cached_content.name = "cachedContents/auto-cached-content"
+            cached_content.expire_time = datetime.datetime.now(
+                datetime.timezone.utc
+            ) + datetime.timedelta(hours=1)
+            return cached_content
+
+        cache_client.create_cached_content = create_cached_content
+
+        def response_with_usage(text, total_token_count):
+            response = simple_response(text)
+            response.usage_metadata.total_token_count = total_token_count
+            return response
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash-002", auto_cache=True)
+        chat = model.start_chat()
+        chat._context_cache.min_tokens = 100
+        self.responses["generate_content"] = [
+            response_with_usage("1", 150),
+            response_with_usage("2", 160),
+        ]
+
+        await chat.send_message_async("a")
+        await chat.send_message_async("b")
+
+        self.assertLen(create_requests, 1)
+        self.assertLen(create_requests[0].cached_content.contents, 2)
+        request = self.observed_requests[-1]
+        self.assertEqual(request.cached_content, "cachedContents/auto-cached-content")
+        self.assertEqual([c.parts[0].text for c in request.contents], ["b"])
+
+    async def test_response_cache(self):
+        model = generative_models.GenerativeModel("gemini-1.5-flash", response_cache={})
+        self.responses["generate_content"] = [simple_response("first")]
+
+        response1 = await model.generate_content_async("hello")
+        response2 = await model.generate_content_async("hello")
+
+        self.assertEqual(response2.text, response1.text)
+        self.assertLen(self.observed_requests, 1)
+        self.assertEqual(model.response_cache_info(), (1, 1))
+
+    async def test_chat_streaming_function_calls_first(self):
+        calls = []
+
+        async def add(a: int, b: int):
+            calls.append((a, b))
+            return a + b
+
+        async def stream(*responses):
+            for response in responses:
+                yield response
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[add])
+        self.responses["stream_generate_content"] = [
+            stream(
+                protos.GenerateContentResponse(
+                    {
+                        "candidates": [
+                            {
+                                "content": {
+                                    "role": "model",
+                                    "parts": [
+                                        {"function_call": {"name": "add", "args": {"a": 2, "b": 3}}}
+                                    ],
+                                }
+                            }
+                        ]
+                    }
+                ),
+            ),
+            stream(simple_response("It is "), simple_response("5.")),
+        ]
+
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        response = await chat.send_message_async("What is 2 + 3?", stream=True)
+
+        # The function is only called once the caller iterates.
+        self.assertEmpty(calls)
+        texts = [chunk.text async for chunk in response]
+        self.assertEqual(texts, ["It is ", "5."])
+        self.assertEqual([(2, 3)], calls)
+        self.assertEqual([c.role for c in chat.history], ["user", "model", "user", "model"])
+
+    async def test_chat_streaming_afc_empty_response(self):
+        async def add(a: int, b: int):
+            return a + b
+
+        async def stream():
+            return
+            yield
+
+        model = generative_models.GenerativeModel("gemini-1.5-flash", tools=[add])
+        self.responses["stream_generate_content"] = [stream()]
+
+        chat = model.start_chat(enable_automatic_function_calling=True)
+        response = await chat.send_message_async("Hello", stream=True)
+
+        self.assertEmpty([chunk async for chunk in response])
+        self.assertEmpty(response.candidates)
+        with self.assertRaises(generation_types.BrokenResponseError):
+            chat.history
+        chat.rewind()
+        self.assertEmpty(chat.history)
+
     async def test_stream_generate_content_called_with_request_options(self):
         self.client.stream_generate_content = unittest.mock.AsyncMock()
         request = unittest.mock.ANY
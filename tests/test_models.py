@@ -18,6 +18,7 @@ import datetime
 import dataclasses
 import pathlib
 import pytz
+import threading
 from typing import Any, Union
 import unittest
 from unittest import mock
@@ -27,6 +28,7 @@ from absl.testing import parameterized
 
 from google.generativeai import protos
 from google.api_core import operation
+from google.ai.generativelanguage_v1beta.services.model_service import pagers
 
 from google.generativeai import models
 from google.generativeai import client
@@ -184,6 +186,86 @@ class UnitTests(parameterized.TestCase):
         for m in found_models:
             self.assertIsInstance(m, model_types.Model)
 
+    def test_list_models_prefetches_pages(self):
+        pages = [[f"models/page{p}-{i}" for i in range(2)] for p in range(3)]
+        requested = [threading.Event() for _ in pages]
+
+        def list_models_page(request, **kwargs):
+            page = int(request.page_token or 0)
+            requested[page].set()
+            return protos.ListModelsResponse(
+                models=[protos.Model(name=name) for name in pages[page]],
+                next_page_token=str(page + 1) if page + 1 < len(pages) else "",
+            )
+
+        self._paged_list_models(list_models_page)
+
+        found_models = []
+        for model in models.list_models(raw=True):
+            page, index = model.name.removeprefix("models/page").split("-")
+            if index == "1" and int(page) + 1 < len(pages):
+                # The next page is requested while this one is still being consumed.
+                self.assertTrue(requested[int(page) + 1].wait(timeout=5))
+            found_models.append(model)
+
+        self.assertEqual(sum(pages, []), [m.name for m in found_models])
+        for m in found_models:
+            self.assertIsInstance(m, protos.Model)
+
+    def _paged_list_models(self, list_models_page):
+        def list_models(page_size, **kwargs):
+            request = protos.ListModelsRequest(page_size=page_size)
+            return pagers.ListModelsPager(list_models_page, request, list_models_page(request))
+
+        self.client.list_models = list_models
+
+    def test_list_models_first_item_is_a_single_request(self):
+        next_page_requested = threading.Event()
+
+        def list_models_page(request, **kwargs):
+            if request.page_token:
+                next_page_requested.set()
+            return protos.ListModelsResponse(
+                models=[protos.Model(name="models/a"), protos.Model(name="models/b")],
+                next_page_token="next",
+            )
+
+        self._paged_list_models(list_models_page)
+
+        found_models = models.list_models(raw=True)
+        self.assertEqual("models/a", next(found_models).name)
+        self.assertFalse(next_page_requested.wait(timeout=0.1))
+
+        # Prefetching starts with the second item.
+        self.assertEqual("models/b", next(found_models).name)
+        self.assertTrue(next_page_requested.wait(timeout=5))
+
+    def test_list_models_close_doesnt_wait_for_prefetch(self):
+        fetching = threading.Event()
+        release = threading.Event()
+        fetched = threading.Event()
+
+        def list_models_page(request, **kwargs):
+            if request.page_token:
+                fetching.set()
+                release.wait(timeout=5)
+                fetched.set()
+            return protos.ListModelsResponse(
+                models=[protos.Model(name="models/a"), protos.Model(name="models/b")],
+                next_page_token="next",
+            )
+
+        self._paged_list_models(list_models_page)
+        self.addCleanup(release.set)
+
+        found_models = models.list_models(raw=True)
+        next(found_models)
+        next(found_models)
+        self.assertTrue(fetching.wait(timeout=5))
+        found_models.close()
+        # The prefetch is still blocked.
+        self.assertFalse(fetched.is_set())
+
     def test_list_tuned_models(self):
         self.responses = {
             # The low level lib wraps the response in an iterable, so this is a fair test.
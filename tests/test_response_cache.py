@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import datetime
+import pathlib
+import shelve
+import tempfile
+import unittest.mock as mock
+
+from google.generativeai import protos
+from google.generativeai import response_cache
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+
+class UnitTests(parameterized.TestCase):
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        self.tempdir = pathlib.Path(tempdir.name)
+
+    @parameterized.named_parameters(
+        ["in-memory", lambda path: response_cache.InMemoryResponseCache()],
+        ["sqlite", lambda path: response_cache.SQLiteResponseCache(path / "cache.db")],
+        ["shelve", lambda path: shelve.open(str(path / "cache"))],
+    )
+    def test_mapping(self, make_cache):
+        cache = make_cache(self.tempdir)
+
+        self.assertNotIn("a", cache)
+        cache["a"] = b"1"
+        cache["b"] = b"2"
+        self.assertEqual(cache["a"], b"1")
+        self.assertLen(cache, 2)
+
+        del cache["a"]
+        with self.assertRaises(KeyError):
+            cache["a"]
+        self.assertEqual(list(cache), ["b"])
+
+    def test_in_memory_lru(self):
+        cache = response_cache.InMemoryResponseCache(maxsize=2)
+        cache["a"] = b"1"
+        cache["b"] = b"2"
+        cache["a"]
+        cache["c"] = b"3"
+
+        self.assertEqual(sorted(cache), ["a", "c"])
+
+    @parameterized.named_parameters(
+        [
+            "in-memory",
+            lambda path, ttl: response_cache.InMemoryResponseCache(ttl=ttl),
+            "time.monotonic",
+        ],
+        [
+            "sqlite",
+            lambda path, ttl: response_cache.SQLiteResponseCache(path / "cache.db", ttl=ttl),
+            "time.time",
+        ],
+    )
+    def test_ttl(self, make_cache, clock):
+        cache = make_cache(self.tempdir, datetime.timedelta(minutes=1))
+        with mock.patch(clock, return_value=1000.0):
+            cache["a"] = b"1"
+        with mock.patch(clock, return_value=1059.0):
+            self.assertEqual(cache["a"], b"1")
+        with mock.patch(clock, return_value=1061.0):
+            with self.assertRaises(KeyError):
+                cache["a"]
+        self.assertEmpty(cache)
+
+    def test_bad_ttl(self):
+        with self.assertRaises(ValueError):
+            response_cache.InMemoryResponseCache(ttl=0)
+
+    def test_sqlite_persists(self):
+        path = self.tempdir / "cache.db"
+        cache = response_cache.SQLiteResponseCache(path)
+        cache["a"] = b"1"
+        cache.close()
+
+        cache = response_cache.SQLiteResponseCache(path)
+        self.assertEqual(cache["a"], b"1")
+
+    def test_request_key(self):
+        request = protos.GenerateContentRequest(
+            model="models/gemini-1.5-flash",
+            contents=[protos.Content(parts=[protos.Part(text="hello")])],
+        )
+        same = protos.GenerateContentRequest(request)
+        other = protos.GenerateContentRequest(request, model="models/gemini-1.5-pro")
+
+        self.assertEqual(response_cache.request_key(request), response_cache.request_key(same))
+        self.assertNotEqual(response_cache.request_key(request), response_cache.request_key(other))
+
+
+if __name__ == "__main__":
+    absltest.main()
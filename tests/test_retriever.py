@@ -12,10 +12,16 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import datetime
+import threading
+import time
 from typing import Any
 import unittest
 import unittest.mock as mock
 
+from google.api_core import exceptions
+from google.api_core import retry
+
 from google.generativeai import protos
 
 from google.generativeai import retriever
@@ -466,6 +472,67 @@ class UnitTests(parameterized.TestCase):
             ],
         )
 
+    def test_query_cache(self):
+        self.addCleanup(retriever_service.clear_query_cache)
+        demo_corpus = retriever.create_corpus(name="demo-corpus")
+        demo_document = demo_corpus.create_document(name="demo-doc")
+
+        def count_queries():
+            return sum(isinstance(r, protos.QueryDocumentRequest) for r in self.observed_requests)
+
+        with mock.patch.object(retriever_service.time, "monotonic", return_value=100.0):
+            q1 = demo_document.query(query="What kind of chunk is this?", cache_ttl=60)
+            q1[0].chunk.data.string_value = "Modified."
+            q2 = demo_document.query(query="What kind of chunk is this?", cache_ttl=60)
+            self.assertEqual(1, count_queries())
+            self.assertEqual("This is a demo chunk.", q2[0].chunk.data.string_value)
+
+            # Different queries, and queries without a `cache_ttl`, aren't served from the cache.
+            demo_document.query(query="Something else?", cache_ttl=60)
+            demo_document.query(query="What kind of chunk is this?", results_count=5, cache_ttl=60)
+            demo_document.query(query="What kind of chunk is this?")
+            self.assertEqual(4, count_queries())
+
+        with mock.patch.object(retriever_service.time, "monotonic", return_value=161.0):
+            demo_document.query(query="What kind of chunk is this?", cache_ttl=60)
+            self.assertEqual(5, count_queries())
+            demo_document.query(query="What kind of chunk is this?", cache_ttl=60)
+            self.assertEqual(5, count_queries())
+
+    @parameterized.named_parameters(
+        ["create_chunk", lambda doc: doc.create_chunk(data="New chunk.")],
+        ["batch_create_chunks", lambda doc: doc.batch_create_chunks(["New chunk."])],
+        ["delete_chunk", lambda doc: doc.delete_chunk(name="demo-chunk")],
+        ["batch_delete_chunks", lambda doc: doc.batch_delete_chunks(["demo-chunk"])],
+    )
+    def test_query_cache_invalidation(self, mutate):
+        self.addCleanup(retriever_service.clear_query_cache)
+        # The fake `create_corpus` names the corpus differently from the documents' parent.
+        demo_corpus = retriever_service.Corpus(
+            name="corpora/demo-corpus",
+            display_name="demo-corpus",
+            create_time=datetime.datetime(2000, 1, 1),
+            update_time=datetime.datetime(2000, 1, 1),
+        )
+        demo_document = demo_corpus.create_document(name="demo-doc")
+
+        def count_queries():
+            return sum(
+                isinstance(r, (protos.QueryCorpusRequest, protos.QueryDocumentRequest))
+                for r in self.observed_requests
+            )
+
+        demo_corpus.query(query="What kind of chunk is this?", cache_ttl=60)
+        demo_document.query(query="What kind of chunk is this?", cache_ttl=60)
+        self.assertEqual(2, count_queries())
+
+        mutate(demo_document)
+
+        # A change to a document drops both its queries and the queries of its corpus.
+        demo_corpus.query(query="What kind of chunk is this?", cache_ttl=60)
+        demo_document.query(query="What kind of chunk is this?", cache_ttl=60)
+        self.assertEqual(4, count_queries())
+
     def test_create_chunk(self):
         demo_corpus = retriever.create_corpus(name="demo-corpus")
         demo_document = demo_corpus.create_document(name="demo-doc")
@@ -525,6 +592,138 @@ class UnitTests(parameterized.TestCase):
         self.assertEqual("This is a demo chunk.", chunks[0].data.string_value)
         self.assertEqual("This is another demo chunk.", chunks[1].data.string_value)
 
+    def test_bulk_create_chunks(self):
+        demo_corpus = retriever.create_corpus(name="demo-corpus")
+        demo_document = demo_corpus.create_document(name="demo-doc")
+
+        lock = threading.Lock()
+        in_flight = 0
+        max_in_flight = 0
+
+        def batch_create_chunks(request, **kwargs):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                self.observed_requests.append(request)
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            # Later batches finish first.
+            time.sleep(0.02 + 0.05 / (1 + int(request.requests[0].chunk.name.split("/")[-1])))
+            with lock:
+                in_flight -= 1
+            return protos.BatchCreateChunksResponse(chunks=[r.chunk for r in request.requests])
+
+        self.client.batch_create_chunks = batch_create_chunks
+
+        progress = []
+        chunks = demo_document.bulk_create_chunks(
+            (f"chunk {i}" for i in range(250)),
+            batch_size=100,
+            max_concurrency=3,
+            progress=progress.append,
+        )
+
+        self.assertEqual([f"chunk {i}" for i in range(250)], [c.data.string_value for c in chunks])
+        self.assertEqual(f"{demo_document.name}/chunks/249", chunks[-1].name)
+        self.assertEqual([100, 100, 50], [len(r.requests) for r in self.observed_requests[-3:]])
+        self.assertEqual(3, max_in_flight)
+        self.assertEqual([1, 2, 3], [p.batches_created for p in progress])
+        self.assertEqual(250, progress[-1].chunks_created)
+        self.assertGreater(progress[-1].chunks_per_second, 0)
+
+    def test_bulk_create_chunks_retries(self):
+        demo_corpus = retriever.create_corpus(name="demo-corpus")
+        demo_document = demo_corpus.create_document(name="demo-doc")
+
+        failures = {"chunk 2": exceptions.ServiceUnavailable("Try again.")}
+
+        def batch_create_chunks(request, **kwargs):
+            self.observed_requests.append(request)
+            error = failures.pop(request.requests[0].chunk.data.string_value, None)
+            if error is not None:
+                raise error
+            return protos.BatchCreateChunksResponse(chunks=[r.chunk for r in request.requests])
+
+        self.client.batch_create_chunks = batch_create_chunks
+
+        fast_retry = retry.Retry(predicate=retry.if_transient_error, initial=0.001, maximum=0.001)
+        chunks = demo_document.bulk_create_chunks(
+            [f"chunk {i}" for i in range(4)], batch_size=2, retry=fast_retry
+        )
+
+        self.assertLen(chunks, 4)
+        batches = [
+            r for r in self.observed_requests if isinstance(r, protos.BatchCreateChunksRequest)
+        ]
+        self.assertLen(batches, 3)
+
+        # Other errors aren't retried.
+        failures["chunk 0"] = exceptions.InvalidArgument("Bad chunk.")
+        with self.assertRaises(exceptions.InvalidArgument):
+            demo_document.bulk_create_chunks(["chunk 0"], retry=fast_retry)
+
+        with self.assertRaises(ValueError):
+            demo_document.bulk_create_chunks(["chunk 0"], batch_size=101)
+
+    def test_bulk_create_chunks_reconciles_retried_batches(self):
+        demo_corpus = retriever.create_corpus(name="demo-corpus")
+        demo_document = demo_corpus.create_document(name="demo-doc")
+
+        stored = {}
+        lost_responses = {"chunk 2"}
+        created_by_others = {}
+
+        def batch_create_chunks(request, **kwargs):
+            self.observed_requests.append(request)
+            if any(r.chunk.name in stored for r in request.requests):
+                raise exceptions.AlreadyExists("Chunk already exists.")
+            if created_by_others:
+                # The batch failed, and someone else created a chunk with the same name.
+                stored.update(created_by_others)
+                created_by_others.clear()
+                raise exceptions.ServiceUnavailable("Try again.")
+            stored.update((r.chunk.name, r.chunk) for r in request.requests)
+            if request.requests[0].chunk.data.string_value in lost_responses:
+                # The batch was created, but the client didn't get the response.
+                lost_responses.clear()
+                raise exceptions.ServiceUnavailable("Connection reset.")
+            return protos.BatchCreateChunksResponse(chunks=[r.chunk for r in request.requests])
+
+        def get_chunk(request, **kwargs):
+            self.observed_requests.append(request)
+            if request.name not in stored:
+                raise exceptions.NotFound("No chunk.")
+            return stored[request.name]
+
+        self.client.batch_create_chunks = batch_create_chunks
+        self.client.get_chunk = get_chunk
+
+        fast_retry = retriever_service.BULK_CREATE_RETRY.with_delay(initial=0.001, maximum=0.001)
+        chunks = demo_document.bulk_create_chunks(
+            [f"chunk {i}" for i in range(4)], batch_size=2, retry=fast_retry
+        )
+
+        self.assertEqual([f"chunk {i}" for i in range(4)], [c.data.string_value for c in chunks])
+        get_chunk_requests = [
+            r for r in self.observed_requests if isinstance(r, protos.GetChunkRequest)
+        ]
+        self.assertEqual(
+            [f"{demo_document.name}/chunks/{i}" for i in (2, 3)],
+            [r.name for r in get_chunk_requests],
+        )
+
+        # Chunks with other data were created by someone else, that's a conflict.
+        other = protos.Chunk(data={"string_value": "other"})
+        created_by_others[f"{demo_document.name}/chunks/4"] = other
+        with self.assertRaises(exceptions.AlreadyExists):
+            demo_document.bulk_create_chunks({"4": "chunk 4"}, retry=fast_retry)
+        self.assertEqual(f"{demo_document.name}/chunks/4", self.observed_requests[-1].name)
+
+        # So is `AlreadyExists` on the first attempt, it isn't retried.
+        observed = len(self.observed_requests)
+        with self.assertRaises(exceptions.AlreadyExists):
+            demo_document.bulk_create_chunks(["chunk 0"], retry=fast_retry)
+        self.assertLen(self.observed_requests, observed + 1)
+
     def test_get_chunk(self):
         demo_corpus = retriever.create_corpus(name="demo-corpus")
         demo_document = demo_corpus.create_document(name="demo-doc")
@@ -623,6 +822,65 @@ class UnitTests(parameterized.TestCase):
             "This is another updated chunk.", update_request["chunks"][1]["data"]["string_value"]
         )
 
+    def test_batch_update_chunks_reads(self):
+        demo_corpus = retriever.create_corpus(name="demo-corpus")
+        demo_document = demo_corpus.create_document(name="demo-doc")
+        names = [f"{demo_document.name}/chunks/chunk-{i}" for i in range(500)]
+
+        lock = threading.Lock()
+        in_flight = 0
+        max_in_flight = 0
+
+        def get_chunk(request, **kwargs):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                self.observed_requests.append(request)
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.001)
+            with lock:
+                in_flight -= 1
+            return protos.Chunk(
+                name=request.name,
+                data={"string_value": "Old text."},
+                custom_metadata=[protos.CustomMetadata(key="source", string_value="web")],
+            )
+
+        self.client.get_chunk = get_chunk
+
+        def count(request_type):
+            return sum(isinstance(r, request_type) for r in self.observed_requests)
+
+        # Data only updates don't need the current chunks.
+        demo_document.batch_update_chunks(
+            [(name, {"data": {"string_value": "New text."}}) for name in names]
+        )
+        self.assertEqual(0, count(protos.GetChunkRequest))
+        self.assertEqual(1, count(protos.BatchUpdateChunksRequest))
+        request = self.observed_requests[-1]
+        self.assertLen(request.requests, 500)
+        self.assertEqual(names[0], request.requests[0].chunk.name)
+        self.assertEqual("New text.", request.requests[0].chunk.data.string_value)
+        self.assertEqual(["data.string_value"], request.requests[0].update_mask.paths)
+
+        # Other updates read the chunks concurrently.
+        demo_document.batch_update_chunks(
+            [(name, {"custom_metadata": []}) for name in names], max_concurrency=4
+        )
+        self.assertEqual(500, count(protos.GetChunkRequest))
+        self.assertEqual(2, count(protos.BatchUpdateChunksRequest))
+        self.assertEqual(4, max_in_flight)
+        request = self.observed_requests[-1]
+        self.assertEqual(names, [r.chunk.name for r in request.requests])
+        self.assertEqual("Old text.", request.requests[0].chunk.data.string_value)
+
+        # Short names are relative to the document.
+        demo_document.batch_update_chunks({"chunk-0": {"data": {"string_value": "New text."}}})
+        demo_document.batch_update_chunks([("chunk-1", {"custom_metadata": []})])
+        self.assertEqual(names[0], self.observed_requests[-3].requests[0].chunk.name)
+        self.assertEqual(names[1], self.observed_requests[-2].name)
+        self.assertEqual(names[1], self.observed_requests[-1].requests[0].chunk.name)
+
     def test_delete_chunk(self):
         demo_corpus = retriever.create_corpus(name="demo-corpus")
         demo_document = demo_corpus.create_document(name="demo-doc")
@@ -12,6 +12,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import collections
 import copy
 import math
@@ -19,7 +20,11 @@ from typing import Any
 import unittest
 import unittest.mock as mock
 
+from google.api_core import exceptions
+from google.api_core import retry_async
+
 from google.generativeai import protos
+from google.ai.generativelanguage_v1beta.services.retriever_service import pagers
 
 from google.generativeai import retriever
 from google.generativeai import client as client_lib
@@ -458,6 +463,28 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
             ],
         )
 
+    async def test_query_cache(self):
+        self.addCleanup(retriever_service.clear_query_cache)
+        demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
+        demo_document = await demo_corpus.create_document_async(name="demo-doc")
+
+        def count_queries():
+            return sum(
+                isinstance(r, (protos.QueryCorpusRequest, protos.QueryDocumentRequest))
+                for r in self.observed_requests
+            )
+
+        await demo_corpus.query_async(query="What kind of chunk is this?", cache_ttl=60)
+        await demo_document.query_async(query="What kind of chunk is this?", cache_ttl=60)
+        await demo_document.query_async(query="What kind of chunk is this?", cache_ttl=60)
+        self.assertEqual(2, count_queries())
+
+        await demo_document.create_chunk_async(data="New chunk.")
+
+        await demo_corpus.query_async(query="What kind of chunk is this?", cache_ttl=60)
+        await demo_document.query_async(query="What kind of chunk is this?", cache_ttl=60)
+        self.assertEqual(4, count_queries())
+
     async def test_create_chunk(self):
         demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
         demo_document = await demo_corpus.create_document_async(name="demo-doc")
@@ -517,6 +544,85 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
         self.assertEqual("This is a demo chunk.", chunks[0].data.string_value)
         self.assertEqual("This is another demo chunk.", chunks[1].data.string_value)
 
+    async def test_bulk_create_chunks(self):
+        demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
+        demo_document = await demo_corpus.create_document_async(name="demo-doc")
+
+        failures = {"chunk 100": exceptions.ServiceUnavailable("Try again.")}
+
+        async def batch_create_chunks(request, **kwargs):
+            self.observed_requests.append(request)
+            error = failures.pop(request.requests[0].chunk.data.string_value, None)
+            if error is not None:
+                raise error
+            return protos.BatchCreateChunksResponse(chunks=[r.chunk for r in request.requests])
+
+        self.client.batch_create_chunks = batch_create_chunks
+
+        progress = []
+        chunks = await demo_document.bulk_create_chunks_async(
+            (f"chunk {i}" for i in range(250)),
+            max_concurrency=2,
+            retry=retry_async.AsyncRetry(initial=0.001, maximum=0.001),
+            progress=progress.append,
+        )
+
+        self.assertEqual([f"chunk {i}" for i in range(250)], [c.data.string_value for c in chunks])
+        batches = [
+            r for r in self.observed_requests if isinstance(r, protos.BatchCreateChunksRequest)
+        ]
+        self.assertLen(batches, 4)
+        self.assertEqual(250, progress[-1].chunks_created)
+
+    async def test_bulk_create_chunks_reconciles_retried_batches(self):
+        demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
+        demo_document = await demo_corpus.create_document_async(name="demo-doc")
+
+        stored = {}
+        lost_responses = {"chunk 2"}
+
+        async def batch_create_chunks(request, **kwargs):
+            self.observed_requests.append(request)
+            if any(r.chunk.name in stored for r in request.requests):
+                raise exceptions.AlreadyExists("Chunk already exists.")
+            stored.update((r.chunk.name, r.chunk) for r in request.requests)
+            if request.requests[0].chunk.data.string_value in lost_responses:
+                # The batch was created, but the client didn't get the response.
+                lost_responses.clear()
+                raise exceptions.ServiceUnavailable("Connection reset.")
+            return protos.BatchCreateChunksResponse(chunks=[r.chunk for r in request.requests])
+
+        async def get_chunk(request, **kwargs):
+            self.observed_requests.append(request)
+            if request.name not in stored:
+                raise exceptions.NotFound("No chunk.")
+            return stored[request.name]
+
+        self.client.batch_create_chunks = batch_create_chunks
+        self.client.get_chunk = get_chunk
+
+        fast_retry = retriever_service.BULK_CREATE_ASYNC_RETRY.with_delay(
+            initial=0.001, maximum=0.001
+        )
+        chunks = await demo_document.bulk_create_chunks_async(
+            [f"chunk {i}" for i in range(4)], batch_size=2, retry=fast_retry
+        )
+
+        self.assertEqual([f"chunk {i}" for i in range(4)], [c.data.string_value for c in chunks])
+        get_chunk_requests = [
+            r for r in self.observed_requests if isinstance(r, protos.GetChunkRequest)
+        ]
+        self.assertEqual(
+            [f"{demo_document.name}/chunks/{i}" for i in (2, 3)],
+            [r.name for r in get_chunk_requests],
+        )
+
+        # `AlreadyExists` on the first attempt isn't retried.
+        observed = len(self.observed_requests)
+        with self.assertRaises(exceptions.AlreadyExists):
+            await demo_document.bulk_create_chunks_async(["chunk 0"], retry=fast_retry)
+        self.assertLen(self.observed_requests, observed + 1)
+
     async def test_get_chunk(self):
         demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
         demo_document = await demo_corpus.create_document_async(name="demo-doc")
@@ -544,6 +650,68 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(self.observed_requests[-1], protos.ListChunksRequest)
         self.assertLen(chunks, 2)
 
+    async def test_list_chunks_prefetches_pages(self):
+        demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
+        demo_document = await demo_corpus.create_document_async(name="demo-doc")
+        pages = [[f"{demo_document.name}/chunks/page{p}-{i}" for i in range(2)] for p in range(3)]
+        requested = [asyncio.Event() for _ in pages]
+
+        async def list_chunks_page(request, **kwargs):
+            page = int(request.page_token or 0)
+            requested[page].set()
+            return protos.ListChunksResponse(
+                chunks=[protos.Chunk(name=name) for name in pages[page]],
+                next_page_token=str(page + 1) if page + 1 < len(pages) else "",
+            )
+
+        async def list_chunks(request, **kwargs):
+            self.assertEqual(100, request.page_size)
+            response = await list_chunks_page(request)
+            return pagers.ListChunksAsyncPager(list_chunks_page, request, response)
+
+        self.client.list_chunks = list_chunks
+
+        found_chunks = []
+        async for chunk in demo_document.list_chunks_async(raw=True):
+            page, index = chunk.name.split("/page")[-1].split("-")
+            if index == "1" and int(page) + 1 < len(pages):
+                # The next page is requested while this one is still being consumed.
+                await asyncio.wait_for(requested[int(page) + 1].wait(), timeout=5)
+            found_chunks.append(chunk)
+
+        self.assertEqual(sum(pages, []), [c.name for c in found_chunks])
+        self.assertIsInstance(found_chunks[0], protos.Chunk)
+
+    async def test_list_chunks_first_item_is_a_single_request(self):
+        demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
+        demo_document = await demo_corpus.create_document_async(name="demo-doc")
+        requested = []
+
+        async def list_chunks_page(request, **kwargs):
+            requested.append(request.page_token)
+            return protos.ListChunksResponse(
+                chunks=[protos.Chunk(name=f"{demo_document.name}/chunks/{i}") for i in "ab"],
+                next_page_token="next",
+            )
+
+        async def list_chunks(request, **kwargs):
+            response = await list_chunks_page(request)
+            return pagers.ListChunksAsyncPager(list_chunks_page, request, response)
+
+        self.client.list_chunks = list_chunks
+
+        found_chunks = demo_document.list_chunks_async(raw=True).__aiter__()
+        await found_chunks.__anext__()
+        # Give a prefetch task the chance to run.
+        await asyncio.sleep(0)
+        self.assertEqual([""], requested)
+
+        # Prefetching starts with the second item.
+        await found_chunks.__anext__()
+        await asyncio.sleep(0)
+        self.assertEqual(["", "next"], requested)
+        await found_chunks.aclose()
+
     async def test_update_chunk(self):
         demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
         demo_document = await demo_corpus.create_document_async(name="demo-doc")
@@ -605,6 +773,49 @@ class AsyncTests(parameterized.TestCase, unittest.IsolatedAsyncioTestCase):
             "This is another updated chunk.", update_request["chunks"][1]["data"]["string_value"]
         )
 
+    async def test_batch_update_chunks_reads(self):
+        demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
+        demo_document = await demo_corpus.create_document_async(name="demo-doc")
+        names = [f"{demo_document.name}/chunks/chunk-{i}" for i in range(100)]
+
+        in_flight = 0
+        max_in_flight = 0
+
+        async def get_chunk(request, **kwargs):
+            nonlocal in_flight, max_in_flight
+            self.observed_requests.append(request)
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return protos.Chunk(name=request.name, data={"string_value": "Old text."})
+
+        self.client.get_chunk = get_chunk
+
+        def count(request_type):
+            return sum(isinstance(r, request_type) for r in self.observed_requests)
+
+        await demo_document.batch_update_chunks_async(
+            {name: {"data": {"string_value": "New text."}} for name in names}
+        )
+        self.assertEqual(0, count(protos.GetChunkRequest))
+
+        await demo_document.batch_update_chunks_async(
+            [(name, {"custom_metadata": []}) for name in names], max_concurrency=4
+        )
+        self.assertEqual(100, count(protos.GetChunkRequest))
+        self.assertEqual(2, count(protos.BatchUpdateChunksRequest))
+        self.assertEqual(4, max_in_flight)
+
+        # Short names are relative to the document.
+        await demo_document.batch_update_chunks_async(
+            {"chunk-0": {"data": {"string_value": "New text."}}}
+        )
+        await demo_document.batch_update_chunks_async([("chunk-1", {"custom_metadata": []})])
+        self.assertEqual(names[0], self.observed_requests[-3].requests[0].chunk.name)
+        self.assertEqual(names[1], self.observed_requests[-2].name)
+        self.assertEqual(names[1], self.observed_requests[-1].requests[0].chunk.name)
+
     async def test_delete_chunk(self):
         demo_corpus = await retriever.create_corpus_async(name="demo-corpus")
         demo_document = await demo_corpus.create_document_async(name="demo-doc")
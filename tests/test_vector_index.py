@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pathlib
+import tempfile
+import unittest.mock as mock
+
+from google.generativeai import answer
+from google.generativeai import protos
+from google.generativeai import vector_index
+
+from absl.testing import absltest
+from absl.testing import parameterized
+import numpy as np
+
+
+def _brute_force(vectors, queries, k, metric):
+    if metric == "cosine":
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+class UnitTests(parameterized.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    @parameterized.named_parameters(["cosine", "cosine"], ["dot", "dot"])
+    def test_exact_search(self, metric):
+        vectors = self.rng.normal(size=(1000, 16)).astype(np.float32)
+        queries = self.rng.normal(size=(300, 16)).astype(np.float32)
+
+        index = vector_index.VectorIndex(metric=metric)
+        # Added in several calls, to exercise growing the storage.
+        for start in range(0, 1000, 300):
+            index.add(vectors[start : start + 300])
+
+        with mock.patch.object(vector_index, "DATA_BLOCK_SIZE", 128):
+            rows, scores = index.top_k(queries, k=10)
+
+        np.testing.assert_array_equal(_brute_force(vectors, queries, 10, metric), rows)
+        self.assertTrue(np.all(np.diff(scores, axis=1) <= 0))
+
+    def test_search_hits(self):
+        index = vector_index.VectorIndex()
+        index.add([[1, 0], [0, 1], [1, 1]], contents=["x", "y", "xy"], ids=["a", "b", "c"])
+
+        hits = index.search([1, 0.1], k=2)
+
+        self.assertEqual(["a", "c"], [hit.id for hit in hits])
+        self.assertEqual(protos.Content(parts=[protos.Part(text="x")]), hits[0].content)
+        self.assertAlmostEqual(1 / np.sqrt(1.01), hits[0].score, places=5)
+
+        batch = index.search([[1, 0], [0, 1]], k=10)
+        self.assertLen(batch, 2)
+        self.assertLen(batch[0], 3)
+
+    def test_hits_as_grounding_passages(self):
+        index = vector_index.VectorIndex()
+        index.add([[1, 0], [0, 1]], contents=["first", "second"])
+
+        passages = answer._make_grounding_passages(index.search([0, 1], k=2))
+
+        self.assertEqual(
+            protos.GroundingPassages(
+                passages=[
+                    {"id": "1", "content": protos.Content(parts=[protos.Part(text="second")])},
+                    {"id": "0", "content": protos.Content(parts=[protos.Part(text="first")])},
+                ]
+            ),
+            passages,
+        )
+
+        index = vector_index.VectorIndex()
+        index.add([[1, 0]])
+        with self.assertRaises(ValueError):
+            answer._make_grounding_passages(index.search([1, 0]))
+
+    def test_ivf_search(self):
+        # 20 well separated clusters.
+        centers = self.rng.normal(size=(20, 32)).astype(np.float32) * 10
+        vectors = (
+            centers[self.rng.integers(20, size=4000)] + self.rng.normal(size=(4000, 32))
+        ).astype(np.float32)
+        queries = vectors[:100] + 0.1 * self.rng.normal(size=(100, 32)).astype(np.float32)
+
+        index = vector_index.VectorIndex(nlist=20, nprobe=3)
+        index.add(vectors)
+        rows, _ = index.top_k(queries, k=10)
+
+        expected = _brute_force(vectors, queries, 10, "cosine")
+        recall = np.mean([len(set(r) & set(e)) / 10 for r, e in zip(rows, expected)])
+        self.assertGreater(recall, 0.95)
+        self.assertIsNotNone(index.centroids)
+
+        # Probing all the clusters is exact, up to ties.
+        index.nprobe = 20
+        _, scores = index.top_k(queries, k=10)
+        exact = vector_index.VectorIndex()
+        exact.add(vectors)
+        _, exact_scores = exact.top_k(queries, k=10)
+        np.testing.assert_allclose(exact_scores, scores, rtol=1e-6)
+
+    def test_ivf_add_after_train(self):
+        index = vector_index.VectorIndex(nlist=2, nprobe=1)
+        index.add([[1, 0], [0.9, 0.1], [0, 1], [0.1, 0.9]])
+        index.train()
+        index.add([[1, 0.05]], ids=["new"])
+
+        self.assertEqual("new", index.search([1, 0.05], k=1)[0].id)
+
+    @parameterized.named_parameters(["flat", None], ["ivf", 4])
+    def test_save_load(self, nlist):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        path = pathlib.Path(tempdir.name) / "index"
+
+        vectors = self.rng.normal(size=(100, 8)).astype(np.float32)
+        index = vector_index.VectorIndex(nlist=nlist, nprobe=4)
+        index.add(vectors, contents=[f"text {i}" for i in range(100)])
+        expected = index.search(vectors[:5], k=3)
+        index.save(path)
+
+        loaded = vector_index.load(path)
+
+        self.assertIsInstance(loaded.vectors, np.memmap)
+        self.assertEqual(expected, loaded.search(vectors[:5], k=3))
+        self.assertEqual(nlist, loaded.nlist)
+
+        # Adding copies the memory mapped vectors.
+        loaded.add(vectors[0], contents=["again"])
+        self.assertLen(loaded, 101)
+        self.assertEqual({"0", "100"}, {hit.id for hit in loaded.search(vectors[0], k=2)})
+
+    def test_invalid_input(self):
+        index = vector_index.VectorIndex()
+        index.add([[1, 0]])
+        with self.assertRaises(ValueError):
+            index.add([[1, 0, 0]])
+        with self.assertRaises(ValueError):
+            index.add([[1, 0]], contents=["a", "b"])
+        with self.assertRaises(ValueError):
+            index.search([1, 0, 0])
+        with self.assertRaises(ValueError):
+            index.train()
+        with self.assertRaises(ValueError):
+            vector_index.VectorIndex(metric="l2")  # pytype: disable=wrong-arg-types
+
+
+if __name__ == "__main__":
+    absltest.main()